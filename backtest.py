@@ -0,0 +1,339 @@
+"""
+Offline backtester – drives the real strategy code (scan_and_trade: buy
+rules, take-profit / stop-loss / STALE exits, DCA, early jeet) over a
+time-ordered series of market frames, with:
+
+  • an in-memory Portfolio (positions.json is never touched)
+  • a simulated clock, so position ages and STALE exits follow the data
+  • a seeded random generator for the jeet size (same seed = same run)
+
+A frame is one scan's worth of market data:
+    {"ts": 1718000000, "sol_price_usd": 150.0, "tokens": [stats, …]}
+where each token is a stats dict as returned by price_fetcher (symbol,
+contract, price_usd, volume_24h, liquidity_usd, fdv, price_change_*) or a
+raw DexScreener pair. Frames are read from a (gzipped) JSONL file, built
+from a market-data capture (market_data_log.py) by bucketing it per interval,
+or read from a memory-mapped FrameStore (what sweep.py shares between
+worker processes).
+
+    python backtest.py frames.jsonl.gz --seed 42
+    python backtest.py market_data.jsonl.gz --market-log --interval 60
+"""
+
+import gzip
+import json
+import logging
+import mmap
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Optional
+
+import clock
+import strategy
+from candidate_batch import NUMERIC_COLUMNS
+from config import STARTING_BALANCE_SOL
+from market_snapshot import MarketSnapshot
+from portfolio import Portfolio
+from strategy_params import StrategyParams
+from token_universe import TokenUniverse
+
+logger = logging.getLogger(__name__)
+
+TRADE_EVENTS = {"buy", "dca_buy", "partial_sell", "full_sell", "stop_loss", "stale_sell", "early_jeet"}
+
+
+# ─── Frame sources ───────────────────────────────────────────────────────────
+
+def _open(path: str):
+    return gzip.open(path, "rt") if path.endswith(".gz") else open(path, "r")
+
+
+def _token_stats(item: dict) -> Optional[dict]:
+    if "baseToken" in item:
+        from price_fetcher import _pair_to_stats
+        return _pair_to_stats(item)
+    return item
+
+
+def load_frames(path: str) -> Iterator[dict]:
+    """Frames from a JSONL file (one frame per line, in time order)."""
+    with _open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def frames_from_market_log(path: str, interval: float = 60) -> Iterator[dict]:
+    """
+    Turn a record-mode capture into frames: every `interval` seconds of
+    captured responses becomes one frame holding the latest quote per token
+    (most liquid pair) and the latest SOL price.
+    """
+    from price_fetcher import EXCLUDED_SYMBOLS, WSOL_MINT, _pair_to_stats
+
+    sol_price = None
+    bucket_end = None
+    tokens: Dict[str, dict] = {}
+
+    def frame():
+        return {"ts": bucket_end, "sol_price_usd": sol_price, "tokens": list(tokens.values())}
+
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break   # truncated tail after a crash
+            ts = rec["ts"]
+            if bucket_end is None:
+                bucket_end = ts + interval
+            while ts >= bucket_end:
+                if sol_price and tokens:
+                    yield frame()
+                tokens = {}
+                bucket_end += interval
+
+            body = rec.get("body")
+            if rec.get("status", 200) >= 400 or not isinstance(body, dict):
+                continue
+            if "solana" in body:
+                sol_price = float(body["solana"].get("usd") or sol_price or 0) or sol_price
+                continue
+            for pair in body.get("pairs") or []:
+                if pair.get("chainId") != "solana":
+                    continue
+                stats = _pair_to_stats(pair)
+                if not stats or not stats["contract"]:
+                    continue
+                if stats["contract"] == WSOL_MINT:
+                    sol_price = sol_price or stats["price_usd"]
+                    continue
+                if stats["symbol"].upper() in EXCLUDED_SYMBOLS:
+                    continue
+                prev = tokens.get(stats["contract"])
+                if prev is None or stats["liquidity_usd"] >= prev["liquidity_usd"]:
+                    tokens[stats["contract"]] = stats
+    if sol_price and tokens:
+        yield frame()
+
+
+# ─── Memory-mapped frame store ───────────────────────────────────────────────
+# Binary layout, all float64 in native byte order:
+#   header  [magic, n_frames, n_rows]
+#   rows    n_rows   × [token_id, price_usd, volume_24h, liquidity_usd, fdv, ch1h, ch6h, ch24h]
+#   frames  n_frames × [ts, sol_price_usd, first_row, end_row]
+# plus <path>.tokens.json: [[symbol, contract], …] indexed by token_id.
+
+_STORE_MAGIC  = 1397707846.0
+_HEADER_WIDTH = 3
+_ROW_WIDTH    = 1 + len(NUMERIC_COLUMNS)
+_FRAME_WIDTH  = 4
+
+
+def _num(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class FrameStore:
+    """Read-only frames backed by one mmap'd file, shareable across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path + ".tokens.json", "r") as f:
+            self.tokens = [tuple(t) for t in json.load(f)]
+        self._file = open(path, "rb")
+        self._mm   = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = memoryview(self._mm).cast("d")
+        magic, n_frames, n_rows = self._data[:_HEADER_WIDTH]
+        if magic != _STORE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a frame store")
+        self.n_frames   = int(n_frames)
+        self._frames_at = _HEADER_WIDTH + int(n_rows) * _ROW_WIDTH
+
+    def __len__(self) -> int:
+        return self.n_frames
+
+    @staticmethod
+    def write(frames: Iterable[dict], path: str) -> int:
+        """Convert frames (dicts) into a store at `path`. Returns # frames."""
+        token_ids: Dict[str, int] = {}
+        tokens: list = []
+        index = array("d")
+        n_rows = 0
+        with open(path, "wb") as f:
+            array("d", [0.0] * _HEADER_WIDTH).tofile(f)   # rewritten once counts are known
+            for frame in frames:
+                rows  = array("d")
+                first = n_rows
+                for item in frame.get("tokens", []):
+                    stats = _token_stats(item)
+                    if not stats or not stats.get("contract"):
+                        continue
+                    tid = token_ids.get(stats["contract"])
+                    if tid is None:
+                        tid = token_ids[stats["contract"]] = len(tokens)
+                        tokens.append((stats.get("symbol", ""), stats["contract"]))
+                    rows.append(tid)
+                    rows.extend(_num(stats.get(c)) for c in NUMERIC_COLUMNS)
+                    n_rows += 1
+                rows.tofile(f)
+                index.extend((float(frame["ts"]), float(frame["sol_price_usd"]), first, n_rows))
+            index.tofile(f)
+            f.seek(0)
+            array("d", [_STORE_MAGIC, len(index) // _FRAME_WIDTH, n_rows]).tofile(f)
+        with open(path + ".tokens.json", "w") as f:
+            json.dump(tokens, f)
+        return len(index) // _FRAME_WIDTH
+
+    def frames(self) -> Iterator[dict]:
+        data, tokens, width = self._data, self.tokens, _ROW_WIDTH
+        for i in range(self.n_frames):
+            at = self._frames_at + i * _FRAME_WIDTH
+            ts, sol_price, first, end = data[at:at + _FRAME_WIDTH].tolist()
+            flat = data[_HEADER_WIDTH + int(first) * width:_HEADER_WIDTH + int(end) * width].tolist()
+            frame_tokens = []
+            for r in range(0, len(flat), width):
+                stats = dict(zip(NUMERIC_COLUMNS, flat[r + 1:r + width]))
+                stats["symbol"], stats["contract"] = tokens[int(flat[r])]
+                frame_tokens.append(stats)
+            yield {"ts": ts, "sol_price_usd": sol_price, "tokens": frame_tokens}
+
+    def close(self):
+        self._data.release()
+        self._mm.close()
+        self._file.close()
+
+
+# ─── Engine ──────────────────────────────────────────────────────────────────
+
+class Backtest:
+    def __init__(self, balance_sol: float = STARTING_BALANCE_SOL, seed: Optional[int] = 0,
+                 params: Optional[StrategyParams] = None):
+        self.balance_sol = balance_sol
+        self.seed        = seed
+        self.params      = params or StrategyParams()
+
+    def run(self, frames: Iterable[dict]) -> dict:
+        sim       = clock.SimulatedClock()
+        portfolio = Portfolio(persist=False, balance_sol=self.balance_sol)
+        universe  = TokenUniverse()
+        events    = Counter()
+
+        n_frames    = 0
+        first_ts    = last_ts = None
+        peak        = self.balance_sol
+        max_dd      = 0.0
+        max_dd_pct  = 0.0
+        equity      = self.balance_sol
+
+        live_params = strategy.get_params()
+        clock.set_clock(sim)
+        strategy.set_params(self.params)
+        strategy.set_random_seed(self.seed)
+        t0 = time.perf_counter()
+        try:
+            for frame in frames:
+                ts        = float(frame["ts"])
+                sol_price = float(frame["sol_price_usd"])
+                sim.t     = ts
+                if first_ts is None:
+                    first_ts = ts
+                last_ts = ts
+
+                tokens = []
+                for item in frame.get("tokens", []):
+                    stats = _token_stats(item)
+                    if stats:
+                        tokens.append(stats)
+                quotes = {s["contract"]: s for s in tokens}
+
+                # the frame is this scan's discovery result and quote refresh
+                held = {p.contract for p in portfolio.positions.values()}
+                universe.ingest(tokens, ts)
+                universe.prune(ts, keep=held)
+
+                snapshot = MarketSnapshot(
+                    sol_price_usd    = sol_price,
+                    sol_fetched_at   = ts,
+                    quotes           = {c: quotes[c] for c in held if c in quotes},
+                    quote_fetched_at = {c: ts for c in held if c in quotes},
+                    created_at       = ts,
+                )
+                for event in strategy.scan_and_trade(portfolio, snapshot=snapshot, universe=universe):
+                    events[event["type"]] += 1
+                n_frames += 1
+
+                # mark-to-market equity (open positions at their last seen price)
+                equity = portfolio.balance_sol + sum(
+                    p.tokens_bought * p.current_price_usd for p in portfolio.positions.values()
+                ) / sol_price
+                if equity > peak:
+                    peak = equity
+                elif peak > 0:
+                    # tracked separately: the largest SOL drop can be the smaller % drop
+                    max_dd     = max(max_dd, peak - equity)
+                    max_dd_pct = max(max_dd_pct, (peak - equity) / peak * 100)
+        finally:
+            clock.reset()
+            strategy.set_params(live_params)
+        elapsed = time.perf_counter() - t0
+
+        trades = sum(n for kind, n in events.items() if kind in TRADE_EVENTS)
+        return {
+            "frames":           n_frames,
+            "sim_days":         round(((last_ts or 0) - (first_ts or 0)) / 86400, 2),
+            "start_balance":    self.balance_sol,
+            "end_balance":      round(portfolio.balance_sol, 4),
+            "equity":           round(equity, 4),
+            "pnl_sol":          round(equity - self.balance_sol, 4),
+            "closed_pnl_sol":   round(portfolio.total_pnl_sol(), 4),   # as shown on the dashboard
+            "open_positions":   len(portfolio.positions),
+            "closed_trades":    portfolio.stats.count,
+            "win_rate":         round(portfolio.win_rate(), 1),
+            "max_drawdown_sol": round(max_dd, 4),
+            "max_drawdown_pct": round(max_dd_pct, 2),
+            "events":           dict(events),
+            "elapsed_s":        round(elapsed, 3),
+            "frames_per_s":     round(n_frames / elapsed, 1) if elapsed else 0.0,
+            "trades_per_s":     round(trades / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def format_report(r: dict) -> str:
+    events = ", ".join(f"{k} {v}" for k, v in sorted(r["events"].items())) or "none"
+    return "\n".join([
+        f"Frames:        {r['frames']} ({r['sim_days']} days simulated)",
+        f"Balance:       {r['start_balance']:.4f} → {r['end_balance']:.4f} SOL "
+        f"({r['open_positions']} open, equity {r['equity']:.4f} SOL)",
+        f"PnL:           {r['pnl_sol']:+.4f} SOL (closed trades {r['closed_pnl_sol']:+.4f})",
+        f"Trades:        {r['closed_trades']} closed | win rate {r['win_rate']:.1f}%",
+        f"Max drawdown:  {r['max_drawdown_sol']:.4f} SOL ({r['max_drawdown_pct']:.2f}%)",
+        f"Events:        {events}",
+        f"Throughput:    {r['elapsed_s']:.2f}s | {r['frames_per_s']:.0f} frames/s | "
+        f"{r['trades_per_s']:.0f} trades/s",
+    ])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backtest the strategy over recorded market frames")
+    parser.add_argument("path", help="frames JSONL(.gz), or a market-data capture with --market-log")
+    parser.add_argument("--market-log", action="store_true", help="path is a record-mode capture")
+    parser.add_argument("--interval", type=float, default=60, help="seconds per frame for --market-log")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--balance", type=float, default=STARTING_BALANCE_SOL)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    frames = (frames_from_market_log(args.path, args.interval) if args.market_log
+              else load_frames(args.path))
+    report = Backtest(balance_sol=args.balance, seed=args.seed).run(frames)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
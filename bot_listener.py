@@ -1,30 +1,106 @@
 """
 Telegram bot handler – obsługuje /start i weryfikację klucza dostępu.
 Działa równolegle z główną pętlą tradingową.
+
+Two ways to receive updates (TELEGRAM_LISTENER_MODE):
+  • polling – long-poll getUpdates in a thread (default, and the fallback)
+  • webhook – Telegram POSTs updates to /telegram/webhook on the dashboard's
+              Flask app; they are handled in order on one dispatcher thread.
+              If the webhook can't be registered, or Telegram reports it
+              failing, the listener switches to polling.
+The last handled update_id is persisted after every getUpdates batch (with
+the webhook, at most every OFFSET_SAVE_SECONDS), so a restart doesn't answer
+the same messages twice – after a crash at most the last batch is repeated.
 """
 
-import requests
+import hashlib
+import json
 import logging
+import os
+import queue
+import tempfile
 import time
 import threading
 
+import http_client
+from rate_limiter import PRIORITY_HIGH
 from auth import is_authorized, authorize, ACCESS_KEY
-from config import TELEGRAM_BOT_TOKEN
+from config import (
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_LISTENER_MODE,
+    TELEGRAM_WEBHOOK_URL,
+    TELEGRAM_WEBHOOK_SECRET,
+    TELEGRAM_WEBHOOK_CHECK_SECONDS,
+    TELEGRAM_OFFSET_FILE,
+    WEB_SERVER_MODE,
+)
 
 logger = logging.getLogger(__name__)
 
-POLL_INTERVAL = 2  # sekundy między sprawdzaniem nowych wiadomości
+POLL_RETRY_SECONDS = 2    # pause after a failed getUpdates (a successful long poll returns straight to the next)
+WEBHOOK_PATH       = "/telegram/webhook"
+WEBHOOK_QUEUE_MAX  = 1000  # updates waiting for the dispatcher; beyond this Telegram gets a 503 and retries
+OFFSET_SAVE_SECONDS = 5   # webhook: persist the offset at most this often (and once the queue is quiet)
+
+API = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
 
 # Trzyma ID ostatnio przetworzonej wiadomości żeby nie odpowiadać dwa razy
 _last_update_id = 0
+_update_lock    = threading.Lock()   # polling and the webhook dispatcher may overlap during a fallback
+_updates        = queue.Queue(maxsize=WEBHOOK_QUEUE_MAX)
+_mode           = "off"              # polling / webhook, once started
+_saved_update_id = 0                 # what TELEGRAM_OFFSET_FILE holds
+_offset_saved_at = 0.0
+_offset_lock    = threading.Lock()   # one offset write at a time
+
+
+def _load_offset():
+    global _last_update_id, _saved_update_id
+    try:
+        with open(TELEGRAM_OFFSET_FILE, "r") as f:
+            _last_update_id = int(json.load(f).get("last_update_id", 0))
+    except (OSError, ValueError, AttributeError):
+        _last_update_id = 0
+    _saved_update_id = _last_update_id
+
+
+def _write_offset(update_id: int):
+    """Temp file + rename, so a crash never leaves a half-written offset (no fsync: it's only a hint)."""
+    directory = os.path.dirname(os.path.abspath(TELEGRAM_OFFSET_FILE))
+    fd, tmp = tempfile.mkstemp(prefix=".telegram_offset-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"last_update_id": update_id}, f)
+        os.replace(tmp, TELEGRAM_OFFSET_FILE)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _save_offset():
+    """Persist the last handled update_id if it changed since the last save."""
+    global _saved_update_id, _offset_saved_at
+    with _offset_lock:
+        _offset_saved_at = time.monotonic()
+        with _update_lock:
+            update_id = _last_update_id
+        if update_id == _saved_update_id:
+            return
+        try:
+            _write_offset(update_id)
+            _saved_update_id = update_id
+        except OSError as e:
+            logger.error(f"Could not save {TELEGRAM_OFFSET_FILE}: {e}")
 
 
 def _send(chat_id: int, text: str):
     try:
-        requests.post(
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage",
+        http_client.post(
+            f"{API}/sendMessage",
             json={"chat_id": chat_id, "text": text},
             timeout=10,
+            priority=PRIORITY_HIGH,   # replies go ahead of queued broadcasts
         )
     except Exception as e:
         logger.error(f"Send error: {e}")
@@ -33,8 +109,8 @@ def _send(chat_id: int, text: str):
 def _get_updates():
     global _last_update_id
     try:
-        r = requests.get(
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates",
+        r = http_client.get(
+            f"{API}/getUpdates",
             params={"offset": _last_update_id + 1, "timeout": 20},
             timeout=30,
         )
@@ -42,7 +118,7 @@ def _get_updates():
         return r.json().get("result", [])
     except Exception as e:
         logger.error(f"getUpdates error: {e}")
-        return []
+        return None
 
 
 # chat_id → True/False (czeka na klucz)
@@ -53,9 +129,10 @@ def _handle_update(update: dict):
     global _last_update_id
 
     update_id = update.get("update_id", 0)
-    if update_id <= _last_update_id:
-        return
-    _last_update_id = update_id
+    with _update_lock:
+        if update_id <= _last_update_id:
+            return
+        _last_update_id = update_id
 
     msg = update.get("message")
     if not msg:
@@ -80,22 +157,26 @@ def _handle_update(update: dict):
             _send(chat_id, "send /start to get access")
             return
         try:
-            from portfolio import Portfolio
-            from price_fetcher import get_token_stats, get_sol_price_usd
-            portfolio = Portfolio()
-            if not portfolio.positions:
+            import portfolio_state
+            from portfolio import Position
+            from price_fetcher import get_token_stats_many, get_sol_price_usd
+            # the trading loop's latest published state, no disk load
+            view = portfolio_state.read()
+            if not view.positions:
                 _send(chat_id, "📭 no open positions rn")
                 return
+            positions = {sym: Position.from_dict(p) for sym, p in view.positions.items()}
             sol_price = get_sol_price_usd()
+            # served from the shared quote cache (the trading loop keeps it warm)
+            try:
+                all_stats = get_token_stats_many([p.contract for p in positions.values()])
+            except Exception:
+                all_stats = {}
             lines = ["📊 open positions:\n"]
-            for sym, pos in portfolio.positions.items():
-                try:
-                    stats = get_token_stats(pos.contract)
-                    current_price = stats["price_usd"] if stats else pos.entry_price_usd
-                    current_fdv   = stats["fdv"] if stats else 0
-                except Exception:
-                    current_price = pos.entry_price_usd
-                    current_fdv   = 0
+            for sym, pos in positions.items():
+                stats = all_stats.get(pos.contract)
+                current_price = stats["price_usd"] if stats else pos.entry_price_usd
+                current_fdv   = stats["fdv"] if stats else 0
                 mult     = pos.current_multiplier(current_price)
                 pnl_sol  = pos.pnl_sol(current_price, sol_price)
                 gain_pct = (mult - 1) * 100
@@ -120,7 +201,7 @@ def _handle_update(update: dict):
                     f"entry mcap: {entry_mcap_str}\n"
                     f"pnl: {gain_pct:+.1f}% | {pnl_sol:+.3f} SOL\n"
                 )
-            lines.append(f"balance: {portfolio.balance_sol:.3f} SOL free")
+            lines.append(f"balance: {view.balance_sol:.3f} SOL free")
             _send(chat_id, "\n".join(lines))
         except Exception as e:
             logger.error(f"/positions error: {e}")
@@ -146,20 +227,124 @@ def _handle_update(update: dict):
         _send(chat_id, "send /start to get access")
 
 
+# ─── Polling ─────────────────────────────────────────────────────────────────
+
 def run_bot_listener():
     """Uruchamia polling w osobnym wątku."""
-    logger.info("Telegram bot listener started 👂")
-    while True:
-        try:
-            updates = _get_updates()
-            for update in updates:
+    logger.info("Telegram bot listener started 👂 (polling)")
+    while _mode == "polling":
+        updates = _get_updates()
+        if updates is None:
+            time.sleep(POLL_RETRY_SECONDS)
+            continue
+        for update in updates:
+            try:
                 _handle_update(update)
-        except Exception as e:
-            logger.error(f"Listener error: {e}")
-        time.sleep(POLL_INTERVAL)
+            except Exception as e:
+                logger.error(f"Listener error: {e}")
+        _save_offset()
 
 
 def start_listener_thread():
-    t = threading.Thread(target=run_bot_listener, daemon=True)
+    """Start polling (removes a webhook left from an earlier run – getUpdates refuses to work with one)."""
+    global _mode
+    _mode = "polling"
+    _api_call("deleteWebhook")
+    t = threading.Thread(target=run_bot_listener, daemon=True, name="tg-polling")
     t.start()
     return t
+
+
+# ─── Webhook ─────────────────────────────────────────────────────────────────
+
+def webhook_secret() -> str:
+    """Value Telegram echoes in X-Telegram-Bot-Api-Secret-Token (derived from the bot token by default)."""
+    return TELEGRAM_WEBHOOK_SECRET or hashlib.sha256(TELEGRAM_BOT_TOKEN.encode()).hexdigest()[:32]
+
+
+def webhook_enabled() -> bool:
+    return TELEGRAM_LISTENER_MODE == "webhook"
+
+
+def enqueue_update(update: dict) -> bool:
+    """Called by the webhook route; False when the dispatcher is too far behind."""
+    try:
+        _updates.put_nowait(update)
+        return True
+    except queue.Full:
+        return False
+
+
+def _dispatch_updates():
+    while True:
+        try:
+            update = _updates.get(timeout=OFFSET_SAVE_SECONDS)
+        except queue.Empty:
+            _save_offset()                  # quiet: persist whatever was handled
+            continue
+        try:
+            _handle_update(update)
+        except Exception as e:
+            logger.error(f"Listener error: {e}")
+        if time.monotonic() - _offset_saved_at >= OFFSET_SAVE_SECONDS:
+            _save_offset()
+
+
+def _api_call(method: str, **params) -> dict:
+    try:
+        r = http_client.post(f"{API}/{method}", json=params, timeout=10, priority=PRIORITY_HIGH)
+        return r.json()
+    except Exception as e:
+        logger.error(f"Telegram {method} failed: {e}")
+        return {}
+
+
+def _webhook_url() -> str:
+    base = TELEGRAM_WEBHOOK_URL or os.getenv("RENDER_EXTERNAL_URL", "")
+    return base.rstrip("/") + WEBHOOK_PATH if base else ""
+
+
+def _register_webhook() -> bool:
+    url = _webhook_url()
+    if not url:
+        logger.warning("TELEGRAM_WEBHOOK_URL not set")
+        return False
+    if WEB_SERVER_MODE not in ("threaded", "dev"):
+        logger.warning(f"Webhook needs the dashboard in the bot process (WEB_SERVER_MODE={WEB_SERVER_MODE})")
+        return False
+    result = _api_call("setWebhook", url=url, secret_token=webhook_secret(),
+                       allowed_updates=["message"])
+    if not result.get("ok"):
+        logger.warning(f"setWebhook failed: {result.get('description', 'no response')}")
+        return False
+    logger.info(f"Telegram bot listener started 👂 (webhook {url})")
+    return True
+
+
+def _watch_webhook():
+    """Fall back to polling when Telegram can't deliver to the webhook."""
+    while _mode == "webhook":
+        time.sleep(TELEGRAM_WEBHOOK_CHECK_SECONDS)
+        info = _api_call("getWebhookInfo").get("result")
+        if not info:
+            continue
+        failing = (info.get("pending_update_count", 0) > 0
+                   and info.get("last_error_date", 0) > time.time() - TELEGRAM_WEBHOOK_CHECK_SECONDS)
+        if info.get("url") != _webhook_url() or failing:
+            logger.warning(f"Telegram webhook not delivering ({info.get('last_error_message') or 'removed'}) "
+                           f"– switching to polling")
+            start_listener_thread()
+
+
+def start_listener():
+    """Start receiving updates as configured by TELEGRAM_LISTENER_MODE."""
+    global _mode
+    _load_offset()
+    if webhook_enabled():
+        threading.Thread(target=_dispatch_updates, daemon=True, name="tg-dispatch").start()
+        if _register_webhook():
+            _mode = "webhook"
+            threading.Thread(target=_watch_webhook, daemon=True, name="tg-webhook-watch").start()
+            return
+        logger.warning("Telegram webhook unavailable – falling back to polling")
+    start_listener_thread()
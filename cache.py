@@ -0,0 +1,208 @@
+"""
+Bounded, thread-safe TTL + LRU cache with stale-while-revalidate.
+
+Keys are grouped into classes ("sol", "quote", "pair", …), each with its own
+TTL and stale window:
+
+  age < ttl                  → fresh hit, returned as-is
+  ttl ≤ age < ttl + stale    → stale hit, returned instantly while ONE
+                               background refresh runs for that key
+  older / missing            → miss, loaded synchronously
+
+Shared by the trading loop, the Telegram listener thread and the dashboard.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_FRESH = "fresh"
+_STALE = "stale"
+_MISS  = "miss"
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttls: Dict[str, float], stale_windows: Dict[str, float] = None):
+        self.maxsize        = maxsize
+        self.ttls           = dict(ttls)
+        self.stale_windows  = dict(stale_windows or {})
+        self._data: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._lock          = threading.Lock()
+        self._refreshing: set = set()   # keys with a background refresh in flight
+        self.bypass         = False     # True → every read goes to the loader (replay/benchmarks)
+
+        self.hits       = 0
+        self.stale_hits = 0
+        self.misses     = 0
+        self.evictions  = 0
+        self.refreshes  = 0
+        self.refresh_errors = 0
+
+    # ─── Internals ───────────────────────────────────────────────────────────
+    def _state(self, key_class: str, age: float) -> str:
+        ttl = self.ttls.get(key_class, 0)
+        if age < ttl:
+            return _FRESH
+        if age < ttl + self.stale_windows.get(key_class, 0):
+            return _STALE
+        return _MISS
+
+    def _lookup(self, key_class: str, key: str, now: float) -> Tuple[Any, str]:
+        """Caller must hold the lock."""
+        entry = self._data.get((key_class, key))
+        if entry is None:
+            return None, _MISS
+        value, ts = entry
+        state = self._state(key_class, now - ts)
+        if state != _MISS:
+            self._data.move_to_end((key_class, key))
+        return value, state
+
+    def _set_locked(self, key_class: str, key: str, value: Any, ts: float):
+        k = (key_class, key)
+        self._data[k] = (value, ts)
+        self._data.move_to_end(k)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _refresh_async(self, key_class: str, keys: List[str], batch_loader: Callable[[List[str]], Dict[str, Any]]):
+        """Start one background refresh for the keys not already being refreshed."""
+        with self._lock:
+            todo = [k for k in keys if (key_class, k) not in self._refreshing]
+            for k in todo:
+                self._refreshing.add((key_class, k))
+        if not todo:
+            return
+
+        def _run():
+            try:
+                fetched = batch_loader(todo) or {}
+                self.set_many(key_class, fetched)
+                with self._lock:
+                    self.refreshes += 1
+            except Exception as e:
+                with self._lock:
+                    self.refresh_errors += 1
+                logger.warning(f"Cache refresh failed ({key_class}, {len(todo)} keys): {e}")
+            finally:
+                with self._lock:
+                    for k in todo:
+                        self._refreshing.discard((key_class, k))
+
+        threading.Thread(target=_run, daemon=True, name=f"cache-refresh-{key_class}").start()
+
+    # ─── Public API ──────────────────────────────────────────────────────────
+    def peek(self, key_class: str, key: str) -> Optional[Any]:
+        """Last stored value regardless of age (no stats, no LRU bump)."""
+        with self._lock:
+            entry = self._data.get((key_class, key))
+        return entry[0] if entry else None
+
+    def set(self, key_class: str, key: str, value: Any):
+        with self._lock:
+            self._set_locked(key_class, key, value, time.time())
+
+    def set_many(self, key_class: str, values: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            for key, value in values.items():
+                self._set_locked(key_class, key, value, now)
+
+    def get(self, key_class: str, key: str, loader: Callable[[], Any], fresh: bool = False) -> Any:
+        """
+        Return the cached value, loading it on a miss.
+        fresh=True bypasses the read (always calls the loader) but still stores
+        the result. A loader returning None is not cached.
+        """
+        if not (fresh or self.bypass):
+            with self._lock:
+                value, state = self._lookup(key_class, key, time.time())
+                if state == _FRESH:
+                    self.hits += 1
+                    return value
+                if state == _STALE:
+                    self.stale_hits += 1
+                else:
+                    self.misses += 1
+            if state == _STALE:
+                def _reload(_keys):
+                    v = loader()
+                    return {key: v} if v is not None else {}
+                self._refresh_async(key_class, [key], _reload)
+                return value
+
+        value = loader()
+        if value is not None:
+            self.set(key_class, key, value)
+        return value
+
+    def get_many(
+        self,
+        key_class: str,
+        keys: Iterable[str],
+        batch_loader: Callable[[List[str]], Dict[str, Any]],
+        fresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Batched get: fresh and stale hits are served from the cache, all misses
+        are loaded with ONE batch_loader call, stale keys get one background
+        batch refresh. Keys the loader returns nothing for are omitted.
+        """
+        keys = list(dict.fromkeys(keys))
+        if fresh or self.bypass:
+            fetched = batch_loader(keys) or {}
+            self.set_many(key_class, fetched)
+            return fetched
+
+        result: Dict[str, Any] = {}
+        missing: List[str] = []
+        stale: List[str] = []
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                value, state = self._lookup(key_class, key, now)
+                if state == _FRESH:
+                    self.hits += 1
+                    result[key] = value
+                elif state == _STALE:
+                    self.stale_hits += 1
+                    result[key] = value
+                    stale.append(key)
+                else:
+                    self.misses += 1
+                    missing.append(key)
+
+        if stale:
+            self._refresh_async(key_class, stale, batch_loader)
+        if missing:
+            fetched = batch_loader(missing) or {}
+            self.set_many(key_class, fetched)
+            result.update(fetched)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+            refreshing = len(self._refreshing)
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size":           size,
+            "maxsize":        self.maxsize,
+            "hits":           self.hits,
+            "stale_hits":     self.stale_hits,
+            "misses":         self.misses,
+            "hit_rate":       round((self.hits + self.stale_hits) / lookups * 100, 1) if lookups else 0.0,
+            "evictions":      self.evictions,
+            "refreshes":      self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing":     refreshing,
+        }
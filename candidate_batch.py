@@ -0,0 +1,194 @@
+"""
+Columnar candidate batches and a vectorized rule evaluator.
+
+A CandidateBatch holds one column per numeric stat (price, volume, liquidity,
+fdv, 1h/6h/24h change) for many tokens at once. Buy rules are declared as
+data (Rule: column, comparison, threshold) and evaluated a whole column at a
+time, giving a pass mask, the first failing rule per token and a per-rule
+rejection histogram — instead of a Python loop with float() conversions and
+a debug log line per token.
+
+Uses NumPy when installed; otherwise falls back to plain lists with the same
+results (fine for the ~50 pairs of a small scan, slow for thousands).
+"""
+
+import logging
+import operator
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    logger.info("numpy not installed – candidate filtering runs row by row")
+
+NUMERIC_COLUMNS = (
+    "price_usd", "volume_24h", "liquidity_usd", "fdv",
+    "price_change_1h", "price_change_6h", "price_change_24h",
+)
+
+_OPS = {
+    "<":  operator.lt,
+    "<=": operator.le,
+    ">":  operator.gt,
+    ">=": operator.ge,
+}
+
+
+# ─── Rules ───────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Rule:
+    """Rejects a token when `column <op> threshold` holds."""
+    name: str
+    column: str
+    op: str
+    threshold: float
+    label: str          # str.format template for the column value, e.g. "low volume (${:,.0f})"
+
+    def fails(self, values):
+        """Works on a scalar or a whole NumPy column."""
+        return _OPS[self.op](values, self.threshold)
+
+    def reason(self, value: float) -> str:
+        return self.label.format(value)
+
+
+def scan_rules(min_volume: float, min_liquidity: float) -> List[Rule]:
+    """The trending scanner's entry filter."""
+    return [
+        Rule("no_price",          "price_usd",     "<=", 0,             "no price"),
+        Rule("below_min_volume",  "volume_24h",    "<",  min_volume,    "below scan minimums (vol ${:,.0f})"),
+        Rule("below_min_liquidity", "liquidity_usd", "<", min_liquidity, "below scan minimums (liq ${:,.0f})"),
+    ]
+
+
+def first_rejection(stats: dict, rules: Sequence[Rule]) -> Optional[str]:
+    """Scalar path for a single stats dict: reason of the first failing rule."""
+    for rule in rules:
+        value = stats[rule.column]
+        if rule.fails(value):
+            return rule.reason(value)
+    return None
+
+
+# ─── Batch ───────────────────────────────────────────────────────────────────
+
+def _to_float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _column(values: list):
+    if not NUMPY_AVAILABLE:
+        return [_to_float(v) for v in values]
+    try:
+        # DexScreener sends prices as strings; NumPy parses the whole column at once
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.asarray([_to_float(v) for v in values], dtype=float)
+
+
+class CandidateBatch:
+    def __init__(self, symbols: List[str], contracts: List[str], columns: Dict[str, Sequence[float]]):
+        self.symbols   = symbols
+        self.contracts = contracts
+        self.columns   = columns
+
+    def __len__(self) -> int:
+        return len(self.contracts)
+
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[dict]) -> "CandidateBatch":
+        """Raw DexScreener pair dicts → columns (symbols upper-cased)."""
+        symbols, contracts = [], []
+        raw = {c: [] for c in NUMERIC_COLUMNS}
+        for p in pairs:
+            base   = p.get("baseToken") or {}
+            change = p.get("priceChange") or {}
+            symbols.append((base.get("symbol") or "").upper())
+            contracts.append(base.get("address") or "")
+            raw["price_usd"].append(p.get("priceUsd") or 0)
+            raw["volume_24h"].append((p.get("volume") or {}).get("h24") or 0)
+            raw["liquidity_usd"].append((p.get("liquidity") or {}).get("usd") or 0)
+            raw["fdv"].append(p.get("fdv") or 0)
+            raw["price_change_1h"].append(change.get("h1") or 0)
+            raw["price_change_6h"].append(change.get("h6") or 0)
+            raw["price_change_24h"].append(change.get("h24") or 0)
+        return cls(symbols, contracts, {c: _column(v) for c, v in raw.items()})
+
+    @classmethod
+    def from_stats(cls, stats: Sequence[dict]) -> "CandidateBatch":
+        """Already-parsed stats dicts (price_fetcher / token universe) → columns."""
+        return cls(
+            [s.get("symbol", "") for s in stats],
+            [s.get("contract", "") for s in stats],
+            {c: _column([s.get(c, 0) for s in stats]) for c in NUMERIC_COLUMNS},
+        )
+
+    def row(self, i: int) -> dict:
+        stats = {"symbol": self.symbols[i], "contract": self.contracts[i]}
+        for c in NUMERIC_COLUMNS:
+            stats[c] = float(self.columns[c][i])
+        return stats
+
+
+# ─── Evaluation ──────────────────────────────────────────────────────────────
+
+class RuleResult:
+    def __init__(self, rules: Sequence[Rule], failed_rule: Sequence[int]):
+        self.rules       = list(rules)
+        self.failed_rule = failed_rule    # per token: index of first failing rule, -1 = passed
+
+    def passed(self, i: int) -> bool:
+        return self.failed_rule[i] < 0
+
+    def passed_indices(self) -> List[int]:
+        if NUMPY_AVAILABLE:
+            return np.flatnonzero(self.failed_rule < 0).tolist()
+        return [i for i, f in enumerate(self.failed_rule) if f < 0]
+
+    def reason(self, batch: CandidateBatch, i: int) -> Optional[str]:
+        """Human-readable rejection reason for token i (None if it passed)."""
+        f = int(self.failed_rule[i])
+        if f < 0:
+            return None
+        rule = self.rules[f]
+        return rule.reason(float(batch.columns[rule.column][i]))
+
+    def rejections(self) -> Dict[str, int]:
+        """Rule name → number of tokens it rejected first, in rule order."""
+        if NUMPY_AVAILABLE:
+            failed = self.failed_rule[self.failed_rule >= 0]
+            counts = np.bincount(failed, minlength=len(self.rules)).tolist()
+        else:
+            c = Counter(f for f in self.failed_rule if f >= 0)
+            counts = [c[i] for i in range(len(self.rules))]
+        return {rule.name: n for rule, n in zip(self.rules, counts) if n}
+
+
+def evaluate_rules(batch: CandidateBatch, rules: Sequence[Rule]) -> RuleResult:
+    """Apply rules in order; a token's rejection is its first failing rule."""
+    n = len(batch)
+    if NUMPY_AVAILABLE:
+        failed = np.full(n, -1, dtype=np.int64)
+        for i, rule in enumerate(rules):
+            hit = rule.fails(batch.columns[rule.column]) & (failed < 0)
+            failed[hit] = i
+        return RuleResult(rules, failed)
+
+    failed = [-1] * n
+    for i, rule in enumerate(rules):
+        values = batch.columns[rule.column]
+        for j in range(n):
+            if failed[j] < 0 and rule.fails(values[j]):
+                failed[j] = i
+    return RuleResult(rules, failed)
@@ -0,0 +1,35 @@
+"""
+Injectable wall clock for trading logic.
+Live code calls clock.now() (time.time by default); the backtester installs
+a simulated clock so position ages, STALE exits and trade timestamps follow
+the replayed market data instead of the real time.
+"""
+
+import time
+from typing import Callable
+
+_now: Callable[[], float] = time.time
+
+
+def now() -> float:
+    return _now()
+
+
+def set_clock(fn: Callable[[], float]):
+    global _now
+    _now = fn
+
+
+def reset():
+    global _now
+    _now = time.time
+
+
+class SimulatedClock:
+    """Manually advanced clock: set `t` (unix seconds) before each step."""
+
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
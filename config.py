@@ -17,6 +17,7 @@ TAKE_PROFIT_TARGETS   = [2.0, 3.0, 5.0, 10.0]                        # 2x, 3x, 5
 PARTIAL_SELL_PCT      = 0.5                                            # sell 50% at first target
 STOP_LOSS_PCT         = 0.30                                           # stop loss at -30%
 SCAN_INTERVAL_SECONDS = int(os.getenv("SCAN_INTERVAL_SECONDS", "45")) # how often to scan/update
+MONITOR_INTERVAL_SECONDS = int(os.getenv("MONITOR_INTERVAL_SECONDS", "5"))  # open-position SL/TP checks
 
 # ─── Twitter (X) ─────────────────────────────────────────────────────────────
 TWITTER_ENABLED          = os.getenv("TWITTER_ENABLED", "false").lower() == "true"
@@ -25,12 +26,27 @@ TWITTER_API_SECRET       = os.getenv("TWITTER_API_SECRET", "")
 TWITTER_ACCESS_TOKEN     = os.getenv("TWITTER_ACCESS_TOKEN", "")
 TWITTER_ACCESS_SECRET    = os.getenv("TWITTER_ACCESS_SECRET", "")
 TWITTER_BEARER_TOKEN     = os.getenv("TWITTER_BEARER_TOKEN", "")
+TWITTER_OUTBOX_MAX         = 50      # posts waiting for quota; the oldest is dropped beyond this
+TWITTER_RATE_LIMIT_BACKOFF = 900     # seconds to hold posts after a 429 without reset headers
 
 # ─── Telegram ─────────────────────────────────────────────────────────────────
 TELEGRAM_ENABLED    = os.getenv("TELEGRAM_ENABLED", "false").lower() == "true"
 TELEGRAM_BOT_TOKEN  = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID    = os.getenv("TELEGRAM_CHAT_ID", "")
 TELEGRAM_CHANNEL_ID = os.getenv("TELEGRAM_CHANNEL_ID", "")  # kanał np. @solarpbot lub -1001234567890
+# Broadcast engine (telegram_broadcast.py); the global ~30 msg/s limit is in RATE_LIMITS
+TELEGRAM_SEND_WORKERS   = int(os.getenv("TELEGRAM_SEND_WORKERS", "8"))
+TELEGRAM_CHAT_INTERVAL  = 1.0    # seconds between messages to one private chat
+TELEGRAM_GROUP_INTERVAL = 3.0    # … to one group / channel (~20/min)
+TELEGRAM_SEND_RETRIES   = 3      # 429 retries per message before it counts as failed
+# Incoming commands (bot_listener.py): polling = getUpdates long poll; webhook =
+# Telegram POSTs to /telegram/webhook on the dashboard (needs a public https URL
+# and the dashboard in the bot process), polling is the fallback
+TELEGRAM_LISTENER_MODE         = os.getenv("TELEGRAM_LISTENER_MODE", "polling").lower()
+TELEGRAM_WEBHOOK_URL           = os.getenv("TELEGRAM_WEBHOOK_URL", "")     # public base URL; RENDER_EXTERNAL_URL if empty
+TELEGRAM_WEBHOOK_SECRET        = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")  # derived from the bot token if empty
+TELEGRAM_WEBHOOK_CHECK_SECONDS = 300     # getWebhookInfo health check
+TELEGRAM_OFFSET_FILE           = "telegram_offset.json"   # last handled update_id
 
 # ─── Solana / Price Source ────────────────────────────────────────────────────
 # Bot automatically scans DexScreener for ALL trending Solana tokens.
@@ -39,10 +55,99 @@ WATCHLIST_TOKENS = []  # legacy, no longer used
 
 DEXSCREENER_URL  = "https://api.dexscreener.com/latest/dex/tokens/"
 SOL_PRICE_URL    = "https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd"
+DEXSCREENER_BATCH_SIZE = 30  # max addresses per /latest/dex/tokens/{a,b,c} call
+# parallel requests for the trending scanner's discovery endpoints (1 = sequential)
+DISCOVERY_CONCURRENCY  = int(os.getenv("DISCOVERY_CONCURRENCY", "6"))
 LOG_FILE         = "bot.log"
 POSITIONS_FILE   = "positions.json"
 
+# ─── Trade journal (see trade_journal.py) ─────────────────────────────────────
+JOURNAL_FILE              = "positions.journal"   # write-ahead log next to the snapshot
+JOURNAL_FSYNC_SECONDS     = 1.0     # fsync the journal at most this often
+JOURNAL_COMPACT_RECORDS   = 1000    # snapshot + truncate after this many records …
+SNAPSHOT_INTERVAL_SECONDS = 300     # … or at least this often
+
+# ─── Storage backend (see trade_store.py) ─────────────────────────────────────
+# json = positions.json + journal (default); sqlite = SQLITE_FILE (WAL mode),
+# trade history queried with indexes instead of kept in memory
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+SQLITE_FILE     = os.getenv("SQLITE_FILE", "portfolio.db")
+
+# ─── Dashboard feed (see feed_log.py) ─────────────────────────────────────────
+FEED_LOG_FILE        = "feed.jsonl"   # append-only, one post per line
+FEED_MEMORY_ENTRIES  = 1000           # newest posts kept in memory
+FEED_LOG_MAX_ENTRIES = 20000          # history kept in the log (compacted at 2x)
+
+# ─── Event bus (see event_bus.py) ─────────────────────────────────────────────
+# Posts go from the trading loops to each output through its own bounded queue.
+# sink → (queue size, policy when full): drop_oldest | drop_newest | block
+EVENT_BUS_SINKS = {
+    "log":      (1000, "drop_oldest"),
+    "feed":     (1000, "block"),
+    "telegram": (500,  "drop_oldest"),
+    "twitter":  (50,   "drop_oldest"),   # hands posts to TwitterPoster's outbox
+}
+EVENT_BUS_QUEUE_SIZE    = 1000   # sinks not listed above
+EVENT_BUS_BLOCK_SECONDS = 0.5    # longest a "block" sink holds up a trading loop before dropping
+
+# ─── Digest mode (see digest.py) ──────────────────────────────────────────────
+# Merge the posts of one scan into one Telegram message / tweet (split at the
+# 4096 / 280 character limits) instead of one message per event
+DIGEST_MODE           = os.getenv("DIGEST_MODE", "false").lower() == "true"
+DIGEST_WINDOW_SECONDS = float(os.getenv("DIGEST_WINDOW_SECONDS", "3"))  # raise to merge consecutive scans too
+
+# ─── Quote cache ──────────────────────────────────────────────────────────────
+# TTL per key class (seconds); after the TTL a value is still served for the
+# stale window while one background refresh runs (see cache.py)
+CACHE_MAX_ENTRIES   = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTLS          = {"sol": 300, "quote": 15, "pair": 3600}
+CACHE_STALE_WINDOWS = {"sol": 3600, "quote": 120, "pair": 86400}
+
+# ─── Token universe ───────────────────────────────────────────────────────────
+# Discovered tokens are kept between scans; see token_universe.py
+UNIVERSE_MAX_TOKENS           = int(os.getenv("UNIVERSE_MAX_TOKENS", "2000"))
+UNIVERSE_DISCOVERY_INTERVAL   = int(os.getenv("UNIVERSE_DISCOVERY_INTERVAL", "180"))  # full search fan-out
+UNIVERSE_COLD_REFRESH_SECONDS = int(os.getenv("UNIVERSE_COLD_REFRESH_SECONDS", "600"))
+UNIVERSE_TOKEN_TTL_SECONDS    = 6 * 3600   # drop tokens discovery hasn't returned for this long
+UNIVERSE_REJECTION_HISTORY    = 10         # rejection reasons kept per token
+
+# ─── Market data record / replay ──────────────────────────────────────────────
+# live = normal; record = also append every raw response to MARKET_DATA_LOG;
+# replay = serve all market data from MARKET_DATA_LOG, no network (market_data_log.py)
+MARKET_DATA_MODE = os.getenv("MARKET_DATA_MODE", "live").lower()
+MARKET_DATA_LOG  = os.getenv("MARKET_DATA_LOG", "market_data.jsonl.gz")
+
+# ─── HTTP client ──────────────────────────────────────────────────────────────
+# Shared keep-alive pools (one per upstream host), see http_client.py
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE     = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))     # ≥ DISCOVERY_CONCURRENCY
+HTTP_TIMEOUT_SECONDS  = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_RETRIES          = int(os.getenv("HTTP_RETRIES", "2"))           # retries for GETs
+HTTP_BACKOFF_BASE     = 0.5                                            # seconds, doubled per retry
+HTTP_BACKOFF_MAX      = 8.0                                            # cap on a single backoff sleep
+
+# ─── Upstream rate limits ─────────────────────────────────────────────────────
+# host → (requests per second, burst), token bucket per host (rate_limiter.py)
+RATE_LIMITS = {
+    "api.dexscreener.com": (float(os.getenv("DEXSCREENER_RATE", "4")), 10),   # API allows ~300/min
+    "api.coingecko.com":   (float(os.getenv("COINGECKO_RATE", "0.4")), 3),   # free tier ~30/min
+    "api.telegram.org":    (float(os.getenv("TELEGRAM_RATE", "25")), 5),     # bot API ~30 msg/s
+}
+RATE_LIMIT_RESERVE     = 3      # tokens discovery must leave for position refreshes
+RATE_LIMIT_MAX_WAIT    = 15.0   # seconds a low-priority request waits before giving up
+RATE_LIMIT_BACKOFF_MAX = 60.0   # cap on 429 backoff without Retry-After
+
 # ─── Web Dashboard ────────────────────────────────────────────────────────────
 WEB_SERVER_HOST  = os.getenv("WEB_SERVER_HOST", "0.0.0.0")
 # Render sets PORT automatically — fall back to WEB_SERVER_PORT or 8080
 WEB_SERVER_PORT  = int(os.getenv("PORT") or os.getenv("WEB_SERVER_PORT", "8080"))
+# dev      = Flask development server in a thread of the bot (old behaviour)
+# threaded = pooled WSGI server in a thread of the bot (waitress with keep-alive
+#            when installed, otherwise werkzeug with a fixed thread pool)
+# process  = the same server in its own process, reading the persisted state,
+#            so dashboard traffic never competes with the trading loop for the GIL
+# off      = no dashboard
+WEB_SERVER_MODE        = os.getenv("WEB_SERVER_MODE", "threaded").lower()
+WEB_SERVER_THREADS     = int(os.getenv("WEB_SERVER_THREADS", "16"))      # worker pool size
+WEB_KEEPALIVE_SECONDS  = 30      # idle connections are closed after this (keep above the SSE heartbeat)
+WEB_STREAM_MAX_CLIENTS = int(os.getenv("WEB_STREAM_MAX_CLIENTS", "10"))  # SSE streams hold a worker each
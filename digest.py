@@ -0,0 +1,143 @@
+"""
+Digest mode – merge the posts of one scan into as few messages as fit.
+
+With DIGEST_MODE on, the Telegram and Twitter sinks hand strategy posts to a
+Digester instead of sending them one by one. The first post opens a window
+of DIGEST_WINDOW_SECONDS (a scan's posts arrive within milliseconds of each
+other). When it closes, the buffered posts are joined and split into
+messages of at most `limit` characters:
+
+  • Telegram (4096) – whole posts separated by a blank line; a post that
+                      doesn't fit on its own is split between lines
+  • Twitter  (280)  – the same if all posts fit one tweet, otherwise one
+                      headline (first line) per post, packed into tweets
+
+Lengths are counted in UTF-16 code units, as Telegram does (emoji count 2).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, List
+
+from config import DIGEST_WINDOW_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def text_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _cut(line: str, limit: int) -> List[str]:
+    """Split one overlong line at spaces (hard cut if a word is longer than limit)."""
+    pieces = []
+    while text_length(line) > limit:
+        end = limit
+        while text_length(line[:end]) > limit:
+            end -= 1
+        space = line.rfind(" ", 0, end)
+        cut   = space if space > 0 else end
+        pieces.append(line[:cut].rstrip())
+        line = line[cut:].lstrip()
+    if line:
+        pieces.append(line)
+    return pieces
+
+
+def _fit(text: str, limit: int) -> List[str]:
+    """One post as pieces of at most limit, split between lines where possible."""
+    if text_length(text) <= limit:
+        return [text]
+    pieces, current = [], ""
+    for line in text.split("\n"):
+        for part in (_cut(line, limit) if text_length(line) > limit else [line]):
+            candidate = f"{current}\n{part}" if current else part
+            if current and text_length(candidate) > limit:
+                pieces.append(current)
+                candidate = part
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_message(parts: List[str], limit: int, sep: str = "\n\n") -> List[str]:
+    """Pack parts (joined by sep) into as few messages of at most limit as possible."""
+    messages, current = [], ""
+    for part in parts:
+        for piece in _fit(part.strip(), limit):
+            candidate = f"{current}{sep}{piece}" if current else piece
+            if current and text_length(candidate) > limit:
+                messages.append(current)
+                candidate = piece
+            current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+
+def headline_digest(posts: List[str], limit: int) -> List[str]:
+    """The first line of every post under a header, packed into messages (one line per post)."""
+    lines  = [p.strip().splitlines()[0] for p in posts if p.strip()]
+    header = f"📋 {len(lines)} moves"
+    room   = limit - text_length(header) - 3   # an over-long headline is cut to fit next to the header
+    return split_message([header] + [f"• {_cut(line, room)[0]}" for line in lines], limit, sep="\n")
+
+
+class Digester:
+    def __init__(self, name: str, send: Callable[[str], object], limit: int,
+                 window: float = DIGEST_WINDOW_SECONDS, headlines: bool = False):
+        self.name       = name
+        self.send       = send
+        self.limit      = limit
+        self.window     = window
+        self.headlines  = headlines   # fall back to headline_digest when posts don't fit one message
+        self.posts_in   = 0
+        self.messages_out = 0
+        self._posts: List[str] = []
+        self._due       = 0.0
+        self._cond      = threading.Condition()
+        self._send_lock = threading.Lock()   # keeps digests and flushes in order
+        threading.Thread(target=self._work, daemon=True, name=f"digest-{name}").start()
+
+    def add(self, text: str):
+        with self._cond:
+            if not self._posts:
+                self._due = time.monotonic() + self.window
+            self._posts.append(text)
+            self._cond.notify()
+
+    def flush(self):
+        """Send whatever is buffered now (e.g. before a post that bypasses the digest)."""
+        with self._send_lock:
+            with self._cond:
+                posts, self._posts = self._posts, []
+            self._deliver(posts)
+
+    def render(self, posts: List[str]) -> List[str]:
+        messages = split_message(posts, self.limit)
+        if self.headlines and len(posts) > 1 and len(messages) > 1:
+            messages = headline_digest(posts, self.limit)
+        return messages
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._posts or time.monotonic() < self._due:
+                    self._cond.wait(self._due - time.monotonic() if self._posts else None)
+            self.flush()
+
+    def _deliver(self, posts: List[str]):
+        if not posts:
+            return
+        messages = self.render(posts)
+        for message in messages:
+            try:
+                self.send(message)
+            except Exception as e:
+                logger.error(f"{self.name} digest send failed: {e}")
+        self.posts_in     += len(posts)
+        self.messages_out += len(messages)
+        if len(posts) > 1:
+            logger.info(f"{self.name} digest: {len(posts)} posts → {len(messages)} message(s)")
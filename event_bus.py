@@ -0,0 +1,153 @@
+"""
+In-process publish/subscribe between the trading loops and the outputs.
+
+The monitor and discovery loops publish a Post and return at once. Every
+sink (log, dashboard feed, Telegram, Twitter) has its own bounded queue
+and worker thread, so a slow or failing sink only backs up its own queue.
+When a queue is full the sink's policy (EVENT_BUS_SINKS) decides:
+
+  • drop_oldest – discard the oldest queued post (stale posts go first)
+  • drop_newest – discard the new post
+  • block       – wait up to EVENT_BUS_BLOCK_SECONDS for room, then drop it
+
+stats() reports queue depth, peak depth and delivered / dropped / failed
+counts per sink.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from config import EVENT_BUS_SINKS, EVENT_BUS_QUEUE_SIZE, EVENT_BUS_BLOCK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+@dataclass(frozen=True)
+class Post:
+    text: str
+    kind: str = "trade"                 # buy / sell / … event type, "thought", "summary"
+    event: Optional[dict] = None        # the strategy event the post was built from
+    created_at: float = field(default_factory=time.time)
+
+
+class Sink:
+    def __init__(self, name: str, handler: Callable, maxsize: int, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy for sink {name}: {policy}")
+        self.name       = name
+        self.handler    = handler
+        self.maxsize    = maxsize
+        self.policy     = policy
+        self.delivered  = 0
+        self.dropped    = 0
+        self.errors     = 0
+        self.high_water = 0
+        self._queue     = deque()
+        self._busy      = False
+        self._cond      = threading.Condition()
+        threading.Thread(target=self._work, daemon=True, name=f"sink-{name}").start()
+
+    def offer(self, message) -> bool:
+        """Queue a message, applying the sink's policy if full. False if it was dropped."""
+        with self._cond:
+            if len(self._queue) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    self._drop()
+                    return False
+                if self.policy == "drop_oldest":
+                    self._queue.popleft()
+                    self._drop()
+                else:
+                    deadline = time.monotonic() + EVENT_BUS_BLOCK_SECONDS
+                    while len(self._queue) >= self.maxsize:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._drop()
+                            return False
+                        self._cond.wait(remaining)
+            self._queue.append(message)
+            self.high_water = max(self.high_water, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def _drop(self):
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 100 == 0:
+            logger.warning(f"Sink {self.name} is full ({self.maxsize}) – {self.dropped} posts dropped so far")
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                message    = self._queue.popleft()
+                self._busy = True
+                self._cond.notify_all()          # room for a blocked publisher
+            try:
+                self.handler(message)
+                self.delivered += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Sink {self.name} failed: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queue is empty and nothing is being delivered."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "depth":      len(self._queue),
+                "maxsize":    self.maxsize,
+                "high_water": self.high_water,
+                "policy":     self.policy,
+                "delivered":  self.delivered,
+                "dropped":    self.dropped,
+                "errors":     self.errors,
+            }
+
+
+class EventBus:
+    def __init__(self):
+        self._sinks: Dict[str, Sink] = {}
+
+    def subscribe(self, name: str, handler: Callable, maxsize: Optional[int] = None,
+                  policy: Optional[str] = None) -> Sink:
+        """Deliver every published message to handler(message) on the sink's own thread."""
+        default_size, default_policy = EVENT_BUS_SINKS.get(name, (EVENT_BUS_QUEUE_SIZE, "drop_oldest"))
+        sink = Sink(name, handler, maxsize or default_size, policy or default_policy)
+        self._sinks[name] = sink
+        return sink
+
+    def publish(self, message):
+        for sink in list(self._sinks.values()):
+            sink.offer(message)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every sink to empty its queue (on shutdown)."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for sink in list(self._sinks.values()):
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            if not sink.drain(remaining):
+                return False
+        return True
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: sink.stats() for name, sink in self._sinks.items()}
@@ -0,0 +1,178 @@
+"""
+Dashboard feed – every post the bot publishes, newest last.
+
+Entries get monotonically increasing ids and live in a bounded in-memory
+ring buffer (FEED_MEMORY_ENTRIES). They are persisted by appending one JSON
+line to FEED_LOG_FILE, so a post costs O(1) and a cursor read
+(`since(id)`) costs O(new entries). Older history is read from the log on
+demand. The log is compacted to FEED_LOG_MAX_ENTRIES lines when it gets to
+twice that.
+
+A process that doesn't write the feed (standalone web_server.py) tails the
+log: refresh() reads only the lines appended since its last read.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import List, Optional
+
+from config import FEED_LOG_FILE, FEED_MEMORY_ENTRIES, FEED_LOG_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+LEGACY_FEED_FILE = "feed.json"   # newest-first list, imported once
+
+
+class FeedLog:
+    def __init__(self, path: str = FEED_LOG_FILE, memory: int = FEED_MEMORY_ENTRIES,
+                 max_entries: int = FEED_LOG_MAX_ENTRIES):
+        self.path        = path
+        self.max_entries = max_entries
+        self._lock       = threading.Lock()
+        self._entries    = deque(maxlen=memory)   # oldest → newest, consecutive ids
+        self._file       = None                   # append handle (writer only)
+        self._offset     = 0                      # bytes of the log already read
+        self._ino        = None
+        self._lines      = 0                      # lines in the log (compaction trigger)
+        self.last_id     = 0
+        with self._lock:
+            self._reload()
+
+    # ─── Log file ────────────────────────────────────────────────────────────
+    def _reload(self):
+        self._entries.clear()
+        self._offset = self._lines = self.last_id = 0
+        try:
+            self._ino = os.stat(self.path).st_ino
+        except OSError:
+            self._ino = None
+        self._tail()
+
+    def _tail(self):
+        """Read lines appended since the last read (a torn last line is left for later)."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._entries.append(entry)
+            self.last_id = entry["id"]
+            self._lines += 1
+        self._offset += end
+
+    def refresh(self):
+        """Pick up entries another process appended (no-op for the writer)."""
+        if self._file is not None:
+            return
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        with self._lock:
+            if st.st_ino != self._ino or st.st_size < self._offset:   # compacted / replaced
+                self._reload()
+            elif st.st_size > self._offset:
+                self._tail()
+
+    def _compact(self):
+        keep = list(self._read_log())[-self.max_entries:]
+        self._file.close()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp = os.path.join(directory, f".{os.path.basename(self.path)}.tmp")
+        with open(tmp, "w") as f:
+            f.writelines(json.dumps(e, separators=(",", ":")) + "\n" for e in keep)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._file   = open(self.path, "a")
+        self._lines  = len(keep)
+        self._offset = os.path.getsize(self.path)
+        self._ino    = os.stat(self.path).st_ino
+        logger.info(f"Feed log compacted to {len(keep)} entries")
+
+    def _read_log(self):
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError:
+            return
+
+    def import_legacy(self, path: str = LEGACY_FEED_FILE):
+        """Seed an empty log from the old feed.json (newest first)."""
+        if self.last_id or not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return
+        for old in reversed(legacy):
+            self.append(old.get("text", ""), old.get("kind", "trade"), old.get("timestamp"))
+        if legacy:
+            logger.info(f"Imported {len(legacy)} feed entries from {path}")
+
+    # ─── Writes ──────────────────────────────────────────────────────────────
+    def append(self, text: str, kind: str = "trade", timestamp: Optional[int] = None) -> dict:
+        with self._lock:
+            if self._file is None:
+                self._tail()                      # catch up before taking over as writer
+                self._file = open(self.path, "a")
+                if self._file.tell() > self._offset:
+                    self._file.truncate(self._offset)   # torn line from a crashed writer
+            entry = {"id": self.last_id + 1, "text": text, "kind": kind,
+                     "timestamp": int(time.time()) if timestamp is None else timestamp}
+            line = json.dumps(entry, separators=(",", ":")) + "\n"
+            self._file.write(line)
+            self._file.flush()
+            self._entries.append(entry)
+            self.last_id  = entry["id"]
+            self._offset += len(line.encode())
+            self._lines  += 1
+            if self._lines >= 2 * self.max_entries:
+                self._compact()
+            return entry
+
+    # ─── Reads (newest first) ────────────────────────────────────────────────
+    def latest(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            return list(islice(reversed(self._entries), limit))
+
+    def since(self, since_id: int, limit: int = 50) -> List[dict]:
+        """Entries with id > since_id (at most the newest `limit`)."""
+        with self._lock:
+            new = max(0, min(self.last_id - since_id, len(self._entries), limit))
+            return list(islice(reversed(self._entries), new))
+
+    def before(self, before_id: int, limit: int = 50) -> List[dict]:
+        """Entries with id < before_id, for paging back; older than memory → read from the log."""
+        with self._lock:
+            before_id = min(before_id, self.last_id + 1)
+            first_id  = self._entries[0]["id"] if self._entries else self.last_id + 1
+            if before_id - limit >= first_id:
+                start = before_id - first_id
+                return list(islice(reversed(self._entries), len(self._entries) - start,
+                                   len(self._entries) - start + limit))
+        older = deque((e for e in self._read_log() if e["id"] < before_id), maxlen=limit)
+        return list(reversed(older))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,143 @@
+"""
+Shared HTTP client – one keep-alive requests.Session per upstream host
+(api.dexscreener.com, api.coingecko.com, api.telegram.org, …) so repeated
+calls reuse pooled TCP/TLS connections instead of paying a fresh handshake.
+Adds default timeouts, retries with jittered exponential backoff and the
+per-host rate limiter from rate_limiter.py (priorities, Retry-After).
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import rate_limiter
+from rate_limiter import PRIORITY_NORMAL, parse_retry_after
+from config import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying (throttled / transient upstream errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Only idempotent methods are retried by default; a retried POST could
+# e.g. deliver the same Telegram message twice.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections = HTTP_POOL_CONNECTIONS,
+        pool_maxsize     = HTTP_POOL_MAXSIZE,
+        max_retries      = 0,   # retries are handled in request() with jitter
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def session_for(url: str) -> requests.Session:
+    """Return the pooled session for the URL's host, creating it on first use."""
+    host = urlsplit(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _new_session()
+                _sessions[host] = session
+    return session
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(max, base * 2^attempt))."""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(
+    method: str,
+    url: str,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    priority: int = PRIORITY_NORMAL,
+    max_wait: Optional[float] = None,
+    on_response: bool = True,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request through the host's pooled session.
+    Connection errors, timeouts and RETRY_STATUSES are retried `retries` times
+    (default HTTP_RETRIES for idempotent methods, 0 otherwise). The final
+    response is returned as-is — callers still call raise_for_status().
+    Rate-limited hosts take a token per attempt at the given priority; LOW
+    priority requests raise RateLimitedError after `max_wait` seconds.
+    With on_response=False the request still takes a token, but its status
+    isn't fed back to the limiter — for callers whose 429s are not host-wide
+    (Telegram's per-chat limits), so one throttled chat doesn't pause the host.
+    """
+    method = method.upper()
+    if timeout is None:
+        timeout = HTTP_TIMEOUT_SECONDS
+    if retries is None:
+        retries = HTTP_RETRIES if method in IDEMPOTENT_METHODS else 0
+    if max_wait is None:
+        max_wait = rate_limiter.default_max_wait(priority)
+
+    session = session_for(url)
+    limiter = rate_limiter.limiter_for(url)
+    attempt = 0
+    while True:
+        if limiter:
+            limiter.acquire(priority, max_wait)
+        try:
+            r = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.debug(f"{method} {urlsplit(url).netloc} failed ({e}), retry in {delay:.2f}s")
+        else:
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            if limiter and on_response:
+                # a 429 blocks the host inside the limiter; acquire() waits it out
+                limiter.on_response(r.status_code, retry_after)
+            if r.status_code not in RETRY_STATUSES or attempt >= retries:
+                return r
+            delay = backoff_delay(attempt)
+            if retry_after is not None and not (limiter and on_response):
+                delay = max(delay, min(retry_after, HTTP_BACKOFF_MAX))
+            logger.debug(f"{method} {urlsplit(url).netloc} → {r.status_code}, retry in {delay:.2f}s")
+            r.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def close_all():
+    """Close every pooled session (used on shutdown)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
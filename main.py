@@ -3,27 +3,42 @@ Main entry point for the Solana Memecoin Papertrading Bot.
 
 Run:  python main.py
 
-This starts THREE things in parallel:
+This starts these in parallel:
   1. Web dashboard   → http://localhost:5000  (Flask, background thread)
   2. Telegram listener (bot commands /start, /positions …)
-  3. Trading loop    (scans DexScreener, executes paper trades, posts to Telegram/Twitter)
+  3. Position monitor (every MONITOR_INTERVAL_SECONDS: SL / TP / DCA on open positions)
+  4. Discovery loop  (every SCAN_INTERVAL_SECONDS: scans DexScreener, buys)
+Trades are published on the event bus; the log, the dashboard feed,
+Telegram and Twitter each consume them on their own thread.
 """
 
 import logging
 import time
 import sys
 import os
+import threading
 import schedule
-import requests as _requests
 
-from config import WATCHLIST_TOKENS, SCAN_INTERVAL_SECONDS, WEB_SERVER_PORT
+import http_client
+import portfolio_state
+from config import (
+    SCAN_INTERVAL_SECONDS,
+    MONITOR_INTERVAL_SECONDS,
+    WEB_SERVER_PORT,
+    WEB_SERVER_MODE,
+    SNAPSHOT_INTERVAL_SECONDS,
+    DIGEST_MODE,
+)
+from digest import Digester
+from event_bus import EventBus, Post
 from portfolio import Portfolio
-from strategy import scan_and_trade
+from strategy import discover_and_buy, monitor_positions
+from market_snapshot import build_market_snapshot
 from message_generator import build_post, build_daily_summary
-from twitter_poster import TwitterPoster
-from telegram_poster import TelegramPoster
-from bot_listener import start_listener_thread
-from web_server import start_server_thread, append_to_feed
+from twitter_poster import TwitterPoster, TWEET_MAX_CHARS
+from telegram_poster import TelegramPoster, TELEGRAM_MAX_CHARS
+from bot_listener import start_listener
+from web_server import start_dashboard, append_to_feed, feed_log
 from market_thoughts import send_market_thought
 
 # ─── Logging setup ───────────────────────────────────────────────────────────
@@ -39,44 +54,89 @@ logger = logging.getLogger("main")
 
 # ─── Globals ─────────────────────────────────────────────────────────────────
 portfolio = Portfolio()
+portfolio_state.attach(portfolio)   # dashboard + /positions read its published snapshots
 twitter   = TwitterPoster()
 telegram  = TelegramPoster()
+bus       = EventBus()          # posts → log / feed / Telegram / Twitter sinks
 
 _last_activity_time = time.time()  # tracks last buy/sell/thought posted
 SILENCE_THRESHOLD_SECONDS = 10 * 60  # 10 minutes
 
 
-# ─── Core loop ───────────────────────────────────────────────────────────────
+# ─── Core loops ──────────────────────────────────────────────────────────────
 
-def run_scan():
-    global _last_activity_time
-    logger.info("═" * 60)
-    logger.info("Running scan …")
+_LOG_TITLES = {"thought": "MARKET THOUGHT\n", "summary": "DAILY SUMMARY\n"}
+_last_bus_report: dict = {}
+_digesters: list = []        # DIGEST_MODE buffers, flushed on shutdown
 
-    events = scan_and_trade(portfolio, WATCHLIST_TOKENS)
 
-    for event in events:
-        post = build_post(event, portfolio)
-        if not post:
-            continue
+def _log_post(post: Post):
+    logger.info(f"\n{'─'*50}\n{_LOG_TITLES.get(post.kind, '')}{post.text}\n{'─'*50}")
+
 
-        logger.info(f"\n{'─'*50}\n{post}\n{'─'*50}")
+def _digest_handler(digester: Digester, send):
+    """Strategy posts go into the digest; thoughts and summaries go out on their own, after it."""
+    def handle(post: Post):
+        if post.event is not None:
+            digester.add(post.text)
+        else:
+            digester.flush()
+            send(post.text)
+    return handle
 
-        # Post to Twitter
-        twitter.post(post)
 
-        # Post to Telegram
-        telegram.post(post)
+def _subscribe_sinks():
+    """One queue + worker per output; a slow sink never holds up the trading loops."""
+    bus.subscribe("log",  _log_post)
+    bus.subscribe("feed", lambda post: append_to_feed(post.text, kind=post.kind))
+    if DIGEST_MODE:
+        _digesters[:] = [Digester("telegram", telegram.post, TELEGRAM_MAX_CHARS),
+                         Digester("twitter", twitter.post, TWEET_MAX_CHARS, headlines=True)]
+        bus.subscribe("telegram", _digest_handler(_digesters[0], telegram.post))
+        bus.subscribe("twitter",  _digest_handler(_digesters[1], twitter.post))
+    else:
+        bus.subscribe("telegram", lambda post: telegram.post(post.text))
+        bus.subscribe("twitter",  lambda post: twitter.post(post.text))
 
-        # Save to web feed
-        kind = event.get("type", "trade")
-        append_to_feed(post, kind=kind)
 
-        # Update last activity time
+def _publish(events: list, snapshot):
+    """Build posts for the events (under the portfolio lock) and publish them on the bus."""
+    global _last_activity_time
+    with portfolio.lock:
+        posts = [(event, build_post(event, portfolio, snapshot)) for event in events]
+
+    for event, text in posts:
+        if not text:
+            continue
+        bus.publish(Post(text, kind=event.get("type", "trade"), event=event))
         _last_activity_time = time.time()
 
-        # Small delay between posts so we don't spam
-        time.sleep(2)
+
+def _open_contracts() -> list:
+    with portfolio.lock:
+        return [p.contract for p in portfolio.positions.values()]
+
+
+def run_monitor():
+    """Fast loop: one batched quote refresh for open positions, then SL/TP/DCA/jeet."""
+    contracts = _open_contracts()
+    if not contracts:
+        return
+    snapshot = build_market_snapshot(contracts)
+    _publish(monitor_positions(portfolio, snapshot), snapshot)
+
+
+def run_scan():
+    """Slow loop: token discovery + buys."""
+    global _last_activity_time
+    logger.info("═" * 60)
+    logger.info("Running discovery scan …")
+
+    # One consistent set of prices for the buys and their posts
+    snapshot = build_market_snapshot(_open_contracts())
+    logger.info(f"SOL: ${snapshot.sol_price_usd:.2f} | {portfolio.summary()}")
+    events = discover_and_buy(portfolio, snapshot)
+    _publish(events, snapshot)
 
     if not events:
         logger.info("No trades this scan.")
@@ -88,27 +148,54 @@ def run_scan():
             _last_activity_time = time.time()
 
 
+def _run_every(interval: float, job) -> threading.Thread:
+    """Run `job` every `interval` seconds in its own daemon thread; errors are logged, not fatal."""
+    def loop():
+        while True:
+            started = time.monotonic()
+            try:
+                job()
+            except Exception as e:
+                logger.exception(f"{job.__name__} failed: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    thread = threading.Thread(target=loop, name=job.__name__, daemon=True)
+    thread.start()
+    return thread
+
+
 def run_daily_summary():
-    summary = build_daily_summary(portfolio)
-    logger.info(f"\n{'═'*50}\nDAILY SUMMARY\n{summary}\n{'═'*50}")
-    twitter.post(summary)
-    telegram.post(summary)
-    append_to_feed(summary, kind="summary")
+    with portfolio.lock:
+        summary = build_daily_summary(portfolio)
+    bus.publish(Post(summary, kind="summary"))
 
 
 def run_market_thought():
     global _last_activity_time
-    send_market_thought(portfolio, telegram, twitter)
+    send_market_thought(portfolio, bus)
     _last_activity_time = time.time()
 
 
+def log_bus_stats():
+    """Report sink queues when something is backed up or was dropped since the last report."""
+    global _last_bus_report
+    stats  = bus.stats()
+    report = {name: (s["dropped"], s["errors"]) for name, s in stats.items()}
+    if report == _last_bus_report and not any(s["depth"] for s in stats.values()):
+        return
+    _last_bus_report = report
+    logger.info("Event bus: " + " | ".join(
+        f"{name} {s['depth']}/{s['maxsize']} (peak {s['high_water']}, "
+        f"dropped {s['dropped']}, errors {s['errors']})" for name, s in stats.items()))
+
+
 def keep_alive():
     """Ping own web server every 14 min so Render free tier doesn't sleep."""
     render_url = os.getenv("RENDER_EXTERNAL_URL", "")
     if not render_url:
         return
     try:
-        _requests.get(f"{render_url}/api/stats", timeout=10)
+        http_client.get(f"{render_url}/api/stats", timeout=10, retries=0)
         logger.debug("Keep-alive ping sent.")
     except Exception:
         pass
@@ -118,22 +205,25 @@ def keep_alive():
 
 def start():
     logger.info("🚀 Solana Memecoin Papertrading Bot starting …")
-    logger.info(f"   Scan interval: {SCAN_INTERVAL_SECONDS}s")
+    logger.info(f"   Scan interval: {SCAN_INTERVAL_SECONDS}s | position monitor: {MONITOR_INTERVAL_SECONDS}s")
     logger.info(f"   {portfolio.summary()}")
 
-    # Start web dashboard (Flask) in background thread
-    start_server_thread()
-    logger.info(f"   Web dashboard running 🌐  http://localhost:{WEB_SERVER_PORT}")
+    # Start web dashboard (thread or separate process, WEB_SERVER_MODE); an old
+    # feed.json seeds the feed log once
+    feed_log.import_legacy()
+    _subscribe_sinks()
+    if start_dashboard():
+        logger.info(f"   Web dashboard running 🌐  http://localhost:{WEB_SERVER_PORT} ({WEB_SERVER_MODE})")
 
-    # Start Telegram bot listener (handles /start and key verification)
-    start_listener_thread()
+    # Start Telegram bot listener (handles /start and key verification);
+    # polling or webhook, TELEGRAM_LISTENER_MODE
+    start_listener()
     logger.info("   Telegram listener running 👂 (key: SOLAPE2026)")
 
-    # Run immediately on start
-    run_scan()
-
-    # Schedule periodic scans
-    schedule.every(SCAN_INTERVAL_SECONDS).seconds.do(run_scan)
+    # Discovery + buys and the position monitor run on their own threads
+    # (both start immediately), so slow discovery never delays a stop-loss
+    _run_every(SCAN_INTERVAL_SECONDS, run_scan)
+    _run_every(MONITOR_INTERVAL_SECONDS, run_monitor)
 
     # Market thoughts every 1 hour
     schedule.every(1).hours.do(run_market_thought)
@@ -141,6 +231,14 @@ def start():
     # Send first market thought immediately on start
     run_market_thought()
 
+    # Portfolio persistence: fsync pending journal records every second,
+    # full snapshot + journal compaction every SNAPSHOT_INTERVAL_SECONDS
+    schedule.every(1).seconds.do(portfolio.sync)
+    schedule.every(SNAPSHOT_INTERVAL_SECONDS).seconds.do(portfolio.save)
+
+    # Sink queue depths / drops every 5 min (only when there is something to say)
+    schedule.every(5).minutes.do(log_bus_stats)
+
     # Keep-alive ping every 14 min (prevents Render free tier from sleeping)
     schedule.every(14).minutes.do(keep_alive)
 
@@ -155,6 +253,11 @@ def start():
     except KeyboardInterrupt:
         logger.info("Bot stopped by user.")
         portfolio.save()
+        bus.drain(timeout=5)
+        for digester in _digesters:
+            digester.flush()
+        telegram.flush(timeout=10)
+        http_client.close_all()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+"""
+Record / replay of raw upstream market data (DexScreener, CoinGecko).
+
+record – every JSON response fetched by price_fetcher is appended to a
+         gzip-compressed JSONL log: {ts, endpoint, params, url, status, body}
+replay – price_fetcher serves get_token_data, get_sol_price_usd and
+         scan_trending_solana_tokens from such a log with no network. Each URL
+         replays its recorded responses in order (the last one repeats once
+         exhausted); batched token lookups that were recorded with a different
+         address set are assembled per address.
+
+Select with MARKET_DATA_MODE=record|replay and MARKET_DATA_LOG in .env, or
+call start_recording()/start_replay() directly.
+
+Benchmark the whole scan path offline:
+    python market_data_log.py bench market_data.jsonl.gz --scans 200
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+_FLUSH_EVERY = 20   # records between gzip flushes
+
+
+class ReplayMiss(requests.RequestException):
+    """The replay log has no response for this URL."""
+
+
+class Recorder:
+    def __init__(self, path: str):
+        self.path     = path
+        self._lock    = threading.Lock()
+        # "ab" appends a new gzip member — readers see one continuous stream
+        self._file    = gzip.open(path, "ab")
+        self._pending = 0
+        self.records  = 0
+
+    def record(self, url: str, status: int, body: Any):
+        parts = urlsplit(url)
+        line = json.dumps({
+            "ts":       time.time(),
+            "endpoint": f"{parts.scheme}://{parts.netloc}{parts.path}",
+            "params":   {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parts.query).items()},
+            "url":      url,
+            "status":   status,
+            "body":     body,
+        }, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line.encode() + b"\n")
+            self.records  += 1
+            self._pending += 1
+            if self._pending >= _FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class Replayer:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_url: Dict[str, Deque[dict]] = defaultdict(deque)
+        self._last: Dict[str, dict] = {}
+        # per-address pair lists from multi-token responses, in log order
+        self._token_pairs: Dict[str, Deque[List[dict]]] = defaultdict(deque)
+        self._last_token_pairs: Dict[str, List[dict]] = {}
+        self.clock: Optional[float] = None   # ts of the last record served
+        self.records = 0
+        self.served  = 0
+        self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break   # truncated tail after a crash
+                self._by_url[rec["url"]].append(rec)
+                self.records += 1
+                if "/latest/dex/tokens/" in rec["url"] and isinstance(rec.get("body"), dict):
+                    grouped: Dict[str, List[dict]] = defaultdict(list)
+                    for p in rec["body"].get("pairs") or []:
+                        addr = p.get("baseToken", {}).get("address", "")
+                        if addr:
+                            grouped[addr].append(p)
+                    for addr, pairs in grouped.items():
+                        self._token_pairs[addr].append(pairs)
+        logger.info(f"Replay log loaded: {self.records} records, {len(self._by_url)} URLs ({self.path})")
+
+    def _serve_tokens(self, url: str) -> dict:
+        """Assemble a multi-token response from per-address recordings."""
+        addrs = url.rsplit("/", 1)[1].split(",")
+        pairs: List[dict] = []
+        found = False
+        for addr in addrs:
+            queue = self._token_pairs.get(addr)
+            if queue:
+                self._last_token_pairs[addr] = queue.popleft()
+            if addr in self._last_token_pairs:
+                found = True
+                pairs.extend(self._last_token_pairs[addr])
+        if not found:
+            raise ReplayMiss(f"no recorded response for {url}")
+        return {"pairs": pairs}
+
+    def get_json(self, url: str) -> Any:
+        with self._lock:
+            queue = self._by_url.get(url)
+            if queue:
+                rec = queue.popleft()
+                self._last[url] = rec
+            else:
+                rec = self._last.get(url)
+            if rec is None:
+                if "/latest/dex/tokens/" in url:
+                    self.served += 1
+                    return self._serve_tokens(url)
+                raise ReplayMiss(f"no recorded response for {url}")
+            self.served += 1
+            if self.clock is None or rec["ts"] > self.clock:
+                self.clock = rec["ts"]
+        if rec.get("status", 200) >= 400:
+            raise requests.HTTPError(f"{rec['status']} (replayed) for {url}")
+        return rec["body"]
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return not any(self._by_url.values())
+
+
+_recorder: Optional[Recorder] = None
+_replayer: Optional[Replayer] = None
+
+
+def start_recording(path: str) -> Recorder:
+    global _recorder
+    stop()
+    _recorder = Recorder(path)
+    atexit.register(_recorder.close)
+    logger.info(f"Recording market data to {path}")
+    return _recorder
+
+
+def start_replay(path: str) -> Replayer:
+    global _replayer
+    stop()
+    _replayer = Replayer(path)
+    return _replayer
+
+
+def stop():
+    global _recorder, _replayer
+    if _recorder:
+        _recorder.close()
+    _recorder = None
+    _replayer = None
+
+
+def replaying() -> bool:
+    return _replayer is not None
+
+
+def replay_json(url: str) -> Any:
+    return _replayer.get_json(url)
+
+
+def record(url: str, status: int, body: Any):
+    if _recorder:
+        _recorder.record(url, status, body)
+
+
+# ─── Offline benchmark ───────────────────────────────────────────────────────
+
+def _bench(path: str, scans: int):
+    import market_data_log   # the module price_fetcher sees (this file runs as __main__)
+    import price_fetcher
+    from portfolio import Portfolio
+    from market_snapshot import build_market_snapshot
+    from strategy import scan_and_trade
+
+    replayer = market_data_log.start_replay(path)
+    price_fetcher.set_cache_bypass(True)   # every lookup hits the (replayed) log
+
+    pf = Portfolio(persist=False)   # never touch the real positions.json
+
+    events = 0
+    done   = 0
+    t0 = time.perf_counter()
+    for _ in range(scans):
+        snapshot = build_market_snapshot(p.contract for p in pf.positions.values())
+        events += len(scan_and_trade(pf, snapshot=snapshot))
+        done   += 1
+        if replayer.exhausted():
+            break
+    elapsed = time.perf_counter() - t0
+
+    print(f"{done} scans in {elapsed:.2f}s ({done / elapsed:.1f} scans/s, "
+          f"{elapsed / done * 1000:.1f} ms/scan) | {events} events | "
+          f"{replayer.served} replayed responses")
+    print(pf.summary())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded market data through scan_and_trade")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench", help="run scans against a replay log at full speed")
+    bench.add_argument("log")
+    bench.add_argument("--scans", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    _bench(args.log, args.scans)
@@ -0,0 +1,70 @@
+"""
+Scan-scoped market snapshot.
+Built once at the top of a scan (SOL price + a quote for every open position)
+and handed to the strategy, the portfolio valuation and the post builder so
+every decision and message in one scan sees the same prices — and each token
+is fetched only once.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    sol_price_usd: float
+    sol_fetched_at: float
+    quotes: Mapping[str, dict] = field(default_factory=dict)          # contract → stats dict
+    quote_fetched_at: Mapping[str, float] = field(default_factory=dict)  # contract → unix ts
+    created_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        # freeze the mappings so nobody mutates a snapshot mid-scan
+        object.__setattr__(self, "quotes", MappingProxyType(dict(self.quotes)))
+        object.__setattr__(self, "quote_fetched_at", MappingProxyType(dict(self.quote_fetched_at)))
+
+    def stats(self, contract: str) -> Optional[dict]:
+        return self.quotes.get(contract)
+
+    def price(self, contract: str) -> Optional[float]:
+        stats = self.quotes.get(contract)
+        return stats["price_usd"] if stats else None
+
+    def prices_by_symbol(self, positions: Mapping) -> Dict[str, float]:
+        """symbol → current price for every position we have a quote for."""
+        prices = {}
+        for sym, pos in positions.items():
+            price = self.price(pos.contract)
+            if price is not None:
+                prices[sym] = price
+        return prices
+
+
+def build_market_snapshot(contracts: Iterable[str]) -> MarketSnapshot:
+    """Fetch SOL/USD and one batched quote per contract."""
+    from price_fetcher import get_sol_price_usd, get_token_stats_many
+    from rate_limiter import PRIORITY_HIGH
+
+    contracts = list(contracts)
+    sol_price = get_sol_price_usd()
+    sol_ts    = time.time()
+    # trading decisions always use fresh quotes (they refresh the shared cache
+    # too) and jump the rate-limit queue ahead of discovery
+    quotes    = get_token_stats_many(contracts, fresh=True, priority=PRIORITY_HIGH) if contracts else {}
+    quote_ts  = time.time()
+
+    missing = len(set(contracts) - set(quotes))
+    if missing:
+        logger.warning(f"Snapshot: no quote for {missing}/{len(set(contracts))} contracts")
+
+    return MarketSnapshot(
+        sol_price_usd    = sol_price,
+        sol_fetched_at   = sol_ts,
+        quotes           = quotes,
+        quote_fetched_at = {c: quote_ts for c in quotes},
+    )
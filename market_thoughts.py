@@ -115,7 +115,7 @@ def build_market_thought(portfolio=None) -> str:
     # 3. Portfolio context (jeśli dostępny)
     if portfolio:
         open_count = len(portfolio.positions)
-        closed_count = len(portfolio.closed_trades)
+        closed_count = portfolio.stats.count
         balance = portfolio.balance_sol
         win_rate = portfolio.win_rate()
 
@@ -135,18 +135,10 @@ def build_market_thought(portfolio=None) -> str:
     return "\n".join(parts)
 
 
-def send_market_thought(portfolio, telegram_poster, twitter_poster=None):
-    """Generuje i wysyła przemyślenie rynkowe."""
+def send_market_thought(portfolio, bus):
+    """Generuje przemyślenie rynkowe i publikuje je na event busie (log, feed, Telegram, Twitter)."""
     try:
-        from web_server import append_to_feed
-        thought = build_market_thought(portfolio)
-        logger.info(f"\n{'─'*50}\nMARKET THOUGHT\n{thought}\n{'─'*50}")
-
-        telegram_poster.post(thought)
-        append_to_feed(thought, kind="thought")
-
-        if twitter_poster:
-            twitter_poster.post(thought)
-
+        from event_bus import Post
+        bus.publish(Post(build_market_thought(portfolio), kind="thought"))
     except Exception as e:
         logger.error(f"market_thought error: {e}")
@@ -5,7 +5,10 @@ Mimics the tone of a degen CT trader.
 
 import random
 from typing import Optional
+
+import clock
 from portfolio import Portfolio
+from market_snapshot import MarketSnapshot
 
 
 # ─── Copy banks ──────────────────────────────────────────────────────────────
@@ -64,15 +67,18 @@ STATS_FOOTER = "\n\n📊 {open_pos} open | {closed} trades closed"
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
-def _total_balance(portfolio: Portfolio, current_prices: dict = None) -> float:
+def _total_balance(portfolio: Portfolio, current_prices: dict = None, sol_price_usd: float = None) -> float:
     """
     Free balance + estimated value of all open positions in SOL.
     current_prices: dict of symbol → current_price_usd (optional, from event)
+    sol_price_usd: SOL price from the scan snapshot (fetched if not given)
     """
     total = portfolio.balance_sol
     if current_prices:
-        from price_fetcher import get_sol_price_usd
-        sol_price = get_sol_price_usd()
+        sol_price = sol_price_usd
+        if not sol_price:
+            from price_fetcher import get_sol_price_usd
+            sol_price = get_sol_price_usd()
         for sym, pos in portfolio.positions.items():
             price = current_prices.get(sym, pos.entry_price_usd)
             usd_val = pos.tokens_bought * price
@@ -115,23 +121,27 @@ def _fmt_mcap(fdv: float) -> str:
     return f"${fdv:.0f}"
 
 
-def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
+def build_post(event: dict, portfolio: Portfolio, snapshot: Optional[MarketSnapshot] = None) -> Optional[str]:
     """
     Takes an event dict from strategy.py and returns a social media post string.
     Returns None if event type is unknown.
+    snapshot: the scan's MarketSnapshot — when given, "overall balance" values
+    open positions at the snapshot prices instead of at entry.
     """
     etype  = event.get("type")
     symbol = event.get("symbol", "???")
     footer = STATS_FOOTER.format(
         open_pos = len(portfolio.positions),
-        closed   = len(portfolio.closed_trades),
+        closed   = portfolio.stats.count,
     )
+    current_prices = snapshot.prices_by_symbol(portfolio.positions) if snapshot else None
+    sol_price      = snapshot.sol_price_usd if snapshot else None
 
     if etype == "buy":
         sol_amount  = event.get("sol_amount", 0)
         fdv         = event.get("stats", {}).get("fdv", 0)
         mcap_str    = _fmt_mcap(fdv)
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
 
         tmpl = random.choice(BUY_TEMPLATES)
         body = tmpl.replace("${symbol}", f"${symbol}")
@@ -148,7 +158,7 @@ def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
     elif etype == "partial_sell":
         mult        = _fmt_mult(event.get("multiplier", 1))
         pct         = int(event.get("pct", 0.5) * 100)
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
         tmpl = random.choice(PARTIAL_SELL_TEMPLATES)
         body = (tmpl
                 .replace("${symbol}", f"${symbol}")
@@ -161,7 +171,7 @@ def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
         mult        = _fmt_mult(event.get("multiplier", 1))
         pnl_sol     = event.get("pnl_sol", 0)
         pnl_str     = f"{pnl_sol:+.3f}"
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
         tmpl = random.choice(FULL_TP_TEMPLATES)
         body = (tmpl
                 .replace("${symbol}", f"${symbol}")
@@ -173,7 +183,7 @@ def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
     elif etype == "stop_loss":
         pnl_sol     = event.get("pnl_sol", 0)
         pnl_str     = f"{pnl_sol:+.3f}"
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
         tmpl = random.choice(STOP_LOSS_TEMPLATES)
         body = (tmpl
                 .replace("${symbol}", f"${symbol}")
@@ -184,7 +194,7 @@ def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
     elif etype == "stale_sell":
         pnl_sol     = event.get("pnl_sol", 0)
         pnl_str     = f"{pnl_sol:+.3f}"
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
         tmpl = random.choice(STALE_SELL_TEMPLATES)
         body = (tmpl
                 .replace("${symbol}", f"${symbol}")
@@ -197,7 +207,7 @@ def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
         avg_entry   = event.get("avg_entry", 0)
         multiplier  = event.get("multiplier", 1.0)
         down_pct    = int(round((1 - multiplier) * 100))
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
         avg_entry_str = _fmt_price(avg_entry)
         tmpl = random.choice(DCA_TEMPLATES)
         body = (tmpl
@@ -218,7 +228,7 @@ def build_post(event: dict, portfolio: Portfolio) -> Optional[str]:
         pnl_str     = f"{pnl_sol:+.3f}"
         multiplier  = event.get("multiplier", 1.0)
         gain_pct    = int(round((multiplier - 1) * 100))
-        overall_bal = _total_balance(portfolio)
+        overall_bal = _total_balance(portfolio, current_prices, sol_price)
         tmpl = random.choice(EARLY_JEET_TEMPLATES)
         body = (tmpl
                 .replace("${symbol}", f"${symbol}")
@@ -245,7 +255,9 @@ def build_daily_summary(portfolio: Portfolio) -> str:
 
     pnl = portfolio.total_pnl_sol()
     wr  = portfolio.win_rate()
+    day = portfolio.stats.last_24h(clock.now())
     lines.append(f"\nall-time PnL: {pnl:+.4f} SOL")
-    lines.append(f"win rate: {wr:.1f}% ({len(portfolio.closed_trades)} trades)")
+    lines.append(f"win rate: {wr:.1f}% ({portfolio.stats.count} trades)")
+    lines.append(f"last 24h: {day['pnl_sol']:+.4f} SOL over {day['count']} trades")
     lines.append("\n#Solana #memecoin #papertrading")
     return "\n".join(lines)
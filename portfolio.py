@@ -1,16 +1,28 @@
 """
 Portfolio / fake balance manager.
 Keeps track of SOL balance and open positions.
-Persists state to a JSON file so it survives restarts.
+Persists state so it survives restarts: every change goes to an append-only
+journal, with periodic snapshots to positions.json (see trade_journal.py),
+or with STORAGE_BACKEND=sqlite to an SQLite database (see trade_store.py).
 """
 
-import json
+import functools
 import os
-import time
 import logging
-from typing import Dict, Optional
-
-from config import STARTING_BALANCE_SOL, POSITIONS_FILE
+import threading
+from typing import Callable, Dict, List, Optional
+
+import clock
+from config import (
+    STARTING_BALANCE_SOL,
+    POSITIONS_FILE,
+    JOURNAL_FILE,
+    JOURNAL_COMPACT_RECORDS,
+    STORAGE_BACKEND,
+    SQLITE_FILE,
+)
+from trade_journal import TradeJournal, load_state, write_snapshot_atomic
+from trade_store import SQLiteStore, TradeList, TradeStats
 
 logger = logging.getLogger(__name__)
 
@@ -93,41 +105,174 @@ class Position:
         return p
 
 
+def _locked(method):
+    """Run a Portfolio method under the portfolio's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Portfolio:
-    def __init__(self):
-        self.balance_sol: float = STARTING_BALANCE_SOL
+    def __init__(self, persist: bool = True, balance_sol: Optional[float] = None):
+        """
+        persist=False keeps everything in memory (backtests): nothing is read
+        from or written to POSITIONS_FILE / JOURNAL_FILE / SQLITE_FILE. There
+        must be only one persisting Portfolio (the trading bot); readers use
+        from_disk().
+        """
+        self.persist = persist
+        self.balance_sol: float = STARTING_BALANCE_SOL if balance_sol is None else balance_sol
         self.positions: Dict[str, Position] = {}  # keyed by symbol
-        self.closed_trades: list = []
-        self._load()
+        # The position monitor and the discovery loop run in different threads;
+        # every read-modify-write of positions / balance happens under this lock.
+        self.lock = threading.RLock()
+        use_db = persist and STORAGE_BACKEND == "sqlite"
+        self._db      = SQLiteStore(SQLITE_FILE) if use_db else None
+        self._journal = TradeJournal(JOURNAL_FILE) if persist and not use_db else None
+        # closed trades: count() / pnl_sum() / wins() / best() / recent() / since()
+        self.history  = self._db if use_db else TradeList()
+        self.stats    = TradeStats()   # running aggregates of self.history
+        self._listeners: List[Callable] = []   # fn(portfolio, op) after every change, under the lock
+        self._marked: Dict[str, tuple] = {}   # last journaled live fields per symbol
+        self._save_lock = threading.Lock()    # one snapshot write at a time, outside self.lock
+        if persist:
+            self._load()
+
+    @classmethod
+    def from_disk(cls, store: Optional[SQLiteStore] = None) -> "Portfolio":
+        """
+        Read-only copy of the persisted state (snapshot + journal, or the
+        database; pass `store` to reuse a reader connection).
+        """
+        pf = cls(persist=False)
+        if STORAGE_BACKEND == "sqlite":
+            pf.history = store or SQLiteStore(SQLITE_FILE)
+            pf._apply_state(pf.history.load_state(STARTING_BALANCE_SOL))
+        else:
+            pf._apply_state(load_state(POSITIONS_FILE, JOURNAL_FILE))
+        return pf
+
+    @property
+    def closed_trades(self) -> list:
+        """Full trade history, oldest first (prefer the self.history queries)."""
+        return self.history.all()
 
     # ─── Persistence ─────────────────────────────────────────────────────────
+    def _apply_state(self, data: dict):
+        self.balance_sol    = data.get("balance_sol", STARTING_BALANCE_SOL)
+        self.positions      = {
+            sym: Position.from_dict(pos)
+            for sym, pos in data.get("positions", {}).items()
+        }
+        if "closed_trades" in data:
+            self.history    = TradeList(data["closed_trades"])
+        self.stats          = TradeStats.load(data.get("trade_stats"), self.history)
+
     def _load(self):
-        if not os.path.exists(POSITIONS_FILE):
-            return
+        if self._db is not None:
+            return self._load_db()
         try:
-            with open(POSITIONS_FILE, "r") as f:
-                data = json.load(f)
-            self.balance_sol    = data.get("balance_sol", STARTING_BALANCE_SOL)
-            self.positions      = {
-                sym: Position.from_dict(pos)
-                for sym, pos in data.get("positions", {}).items()
-            }
-            self.closed_trades  = data.get("closed_trades", [])
-            logger.info(f"Portfolio loaded – balance: {self.balance_sol:.4f} SOL, "
-                        f"open positions: {list(self.positions.keys())}")
+            data = load_state(POSITIONS_FILE, JOURNAL_FILE)
         except Exception as e:
             logger.warning(f"Could not load portfolio: {e}")
+            return
+        self._apply_state(data)
+        self._journal.seq = data["journal_seq"]
+        logger.info(f"Portfolio loaded – balance: {self.balance_sol:.4f} SOL, "
+                    f"open positions: {list(self.positions.keys())} "
+                    f"({data['replayed']} journal records replayed)")
+        # start from a clean journal (this also drops a torn tail after a crash)
+        if os.path.exists(JOURNAL_FILE) and os.path.getsize(JOURNAL_FILE) > 0:
+            self.save()
+
+    def _load_db(self):
+        if self._db.is_empty() and (os.path.exists(POSITIONS_FILE) or os.path.exists(JOURNAL_FILE)):
+            state = load_state(POSITIONS_FILE, JOURNAL_FILE)
+            self._db.import_state(state)
+            logger.info(f"Imported {POSITIONS_FILE} into {SQLITE_FILE} "
+                        f"({len(state['closed_trades'])} closed trades)")
+        self._apply_state(self._db.load_state(STARTING_BALANCE_SOL))
+        logger.info(f"Portfolio loaded from {SQLITE_FILE} – balance: {self.balance_sol:.4f} SOL, "
+                    f"open positions: {list(self.positions.keys())}, "
+                    f"closed trades: {self.history.count()}")
+
+    def subscribe(self, listener: Callable):
+        """Call listener(portfolio, op) after every change (see portfolio_state.py)."""
+        self._listeners.append(listener)
+
+    def _record(self, op: str, **fields):
+        """Journal one change (O(1)) and notify listeners. sync() compacts a long journal."""
+        if self._db is not None:
+            trade_stats = self.stats.to_dict() if op == "close" else None
+            self._db.apply(op, self.balance_sol, trade_stats, **fields)   # one transaction
+        elif self._journal is not None:
+            self._journal.append(op, balance_sol=self.balance_sol, **fields)
+        for listener in self._listeners:
+            listener(self, op)
 
     def save(self):
-        data = {
-            "balance_sol":   self.balance_sol,
-            "positions":     {sym: p.to_dict() for sym, p in self.positions.items()},
-            "closed_trades": self.closed_trades,
-        }
-        with open(POSITIONS_FILE, "w") as f:
-            json.dump(data, f, indent=2)
+        """
+        Snapshot the full state atomically and truncate the journal (compaction).
+        The state is copied under the lock; serializing and writing it happens
+        outside, so trading isn't blocked by a long trade history. Never call
+        this with self.lock held.
+        """
+        if not self.persist:
+            return
+        if self._db is not None:
+            with self.lock:
+                self._db.checkpoint()
+            return
+        with self._save_lock:
+            with self.lock:
+                self._journal.sync()
+                data = {
+                    "balance_sol":   self.balance_sol,
+                    "positions":     {sym: p.to_dict() for sym, p in self.positions.items()},
+                    "closed_trades": list(self.history),
+                    "trade_stats":   self.stats.to_dict(),
+                    "journal_seq":   self._journal.seq,
+                }
+            write_snapshot_atomic(POSITIONS_FILE, data)
+            with self.lock:
+                # records journaled meanwhile aren't in the snapshot: keep the
+                # journal (replay skips seq <= journal_seq), the next save truncates
+                if self._journal.seq == data["journal_seq"]:
+                    self._journal.truncate()
+
+    def sync(self):
+        """fsync journal records still pending from the last batch; compact a long journal."""
+        if self._journal is None:
+            return
+        with self.lock:
+            self._journal.sync()
+            compact = self._journal.records >= JOURNAL_COMPACT_RECORDS
+        if compact:
+            self.save()
+
+    @_locked
+    def mark_positions(self):
+        """Journal the live fields of open positions that changed since the last mark."""
+        changed = {}
+        for sym, pos in self.positions.items():
+            live = (pos.current_price_usd, pos.highest_mult, pos.next_tp_index, pos.early_jeet_done)
+            if self._marked.get(sym) != live:
+                self._marked[sym] = live
+                changed[sym] = {
+                    "current_price_usd": pos.current_price_usd,
+                    "highest_mult":      pos.highest_mult,
+                    "next_tp_index":     pos.next_tp_index,
+                    "early_jeet_done":   pos.early_jeet_done,
+                }
+        for sym in set(self._marked) - set(self.positions):
+            del self._marked[sym]
+        if changed:
+            self._record("mark", positions=changed)
 
     # ─── Trading Actions ─────────────────────────────────────────────────────
+    @_locked
     def buy(
         self,
         symbol: str,
@@ -135,6 +280,7 @@ class Portfolio:
         token_price_usd: float,
         sol_price_usd: float,
         sol_amount: float,
+        entry_mcap: float = 0.0,
     ) -> Optional[Position]:
         if symbol in self.positions:
             logger.info(f"Already holding {symbol}, skipping buy")
@@ -154,13 +300,15 @@ class Portfolio:
             sol_invested      = sol_amount,
             sol_price_at_entry= sol_price_usd,
             tokens_bought     = tokens_bought,
-            timestamp         = time.time(),
+            timestamp         = clock.now(),
         )
+        pos.entry_mcap = entry_mcap
         self.positions[symbol] = pos
-        self.save()
+        self._record("open", position=pos.to_dict())
         logger.info(f"BUY {symbol}: {tokens_bought:.2f} tokens @ ${token_price_usd:.8f}")
         return pos
 
+    @_locked
     def dca_buy(
         self,
         symbol: str,
@@ -198,7 +346,7 @@ class Portfolio:
         pos.entry_price_usd  = (pos.entry_price_usd * (total_tokens - new_tokens) + token_price_usd * new_tokens) / total_tokens
         pos.dca_done         = True
         self.balance_sol    -= sol_amount
-        self.save()
+        self._record("update", position=pos.to_dict())
 
         logger.info(f"DCA {symbol}: +{new_tokens:.2f} tokens @ ${token_price_usd:.8f} | new avg: ${pos.entry_price_usd:.8f}")
         return {
@@ -208,6 +356,7 @@ class Portfolio:
             "avg_entry":    pos.entry_price_usd,
         }
 
+    @_locked
     def partial_sell(
         self,
         symbol: str,
@@ -227,12 +376,13 @@ class Portfolio:
         pos.partial_sold   = True
         pos.sol_invested  *= (1 - pct)   # reduce cost basis proportionally
         self.balance_sol  += sol_received
-        self.save()
+        self._record("update", position=pos.to_dict())
 
         mult = pos.current_multiplier(current_price_usd)
         logger.info(f"PARTIAL SELL {symbol}: {pct*100:.0f}% @ {mult:.2f}x | +{sol_received:.4f} SOL")
         return {"symbol": symbol, "pct": pct, "multiplier": mult, "sol_received": sol_received}
 
+    @_locked
     def full_sell(
         self,
         symbol: str,
@@ -259,42 +409,46 @@ class Portfolio:
             "pnl_sol":      pnl_sol,
             "sol_received": sol_received,
             "reason":       reason,
-            "timestamp":    time.time(),
+            "timestamp":    clock.now(),
         }
-        self.closed_trades.append(record)
+        if self._db is None:
+            self.history.add_trade(record)   # the database stores it with the "close" record
+        self.stats.add(record)
         del self.positions[symbol]
-        self.save()
+        self._record("close", symbol=symbol, trade=record)
 
         logger.info(f"FULL SELL {symbol}: {mult:.2f}x | reason={reason} | pnl={pnl_sol:+.4f} SOL")
         return record
 
     # ─── Stats ───────────────────────────────────────────────────────────────
-    def total_pnl_sol(self, current_prices: dict = None) -> float:
+    @_locked
+    def total_pnl_sol(self, current_prices: dict = None, sol_price_usd: float = None) -> float:
         """
         Total PnL: closed trades + unrealized open positions.
         current_prices: dict of symbol → current_price_usd (optional).
         If not provided, assumes open positions are at entry (0 unrealized).
+        sol_price_usd: SOL price to value positions with (e.g. from the scan's
+        MarketSnapshot); fetched if not given.
         """
-        closed_pnl = sum(t["pnl_sol"] for t in self.closed_trades)
+        closed_pnl = self.stats.pnl_sol
         if not current_prices:
             return closed_pnl
         # add unrealized
         unrealized = 0.0
-        from price_fetcher import get_sol_price_usd
-        sol_price = get_sol_price_usd()
+        sol_price = sol_price_usd
+        if not sol_price:
+            from price_fetcher import get_sol_price_usd
+            sol_price = get_sol_price_usd()
         for sym, pos in self.positions.items():
             price = current_prices.get(sym, pos.entry_price_usd)
             unrealized += pos.pnl_sol(price, sol_price)
         return closed_pnl + unrealized
 
     def win_rate(self) -> float:
-        if not self.closed_trades:
-            return 0.0
-        wins = sum(1 for t in self.closed_trades if t["pnl_sol"] > 0)
-        return wins / len(self.closed_trades) * 100
+        return self.stats.win_rate()
 
     def summary(self) -> str:
-        trades = len(self.closed_trades)
+        trades = self.stats.count
         pnl    = self.total_pnl_sol()
         wr     = self.win_rate()
         return (f"Balance: {self.balance_sol:.4f} SOL | "
@@ -0,0 +1,144 @@
+"""
+Live, read-only portfolio state for the dashboard and the Telegram bot.
+
+The trading loop owns the only writable Portfolio. attach() subscribes to
+it, and after every change (buy, DCA, partial/full sell, price mark) a new
+immutable PortfolioView is built under the portfolio lock and swapped in
+with one reference assignment. Readers call current() and never see a
+half-applied trade. They don't take the lock and don't touch the disk.
+
+A process without a trading loop (`python web_server.py`) has nothing
+attached; read() then builds a view from the persisted state instead and
+rebuilds it only when those files change.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Tuple
+
+from trade_store import SQLiteStore, TradeStats
+
+logger = logging.getLogger(__name__)
+
+RECENT_TRADES = 20   # closed trades carried in a view, newest first
+
+
+@dataclass(frozen=True)
+class PortfolioView:
+    version: int
+    balance_sol: float
+    positions: Mapping[str, Mapping]            # symbol → Position.to_dict(), read-only
+    trade_count: int
+    wins: int
+    closed_pnl_sol: float
+    best_multiplier: float
+    by_reason: Mapping[str, int]                # exit reason → closed trades
+    recent_trades: Tuple[Mapping, ...]          # newest first
+    window: Tuple[Tuple[float, float], ...]     # (timestamp, pnl_sol) of trades in the last 24h
+    published_at: float = field(default_factory=time.time)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.trade_count * 100 if self.trade_count else 0.0
+
+    def last_24h(self, now: float) -> dict:
+        cutoff = now - TradeStats.WINDOW_SECONDS
+        pnls = [pnl for ts, pnl in self.window if ts >= cutoff]
+        return {"count": len(pnls), "wins": sum(1 for p in pnls if p > 0), "pnl_sol": sum(pnls)}
+
+
+def build_view(portfolio, version: int = 0, recent: Optional[tuple] = None) -> PortfolioView:
+    """Freeze the portfolio's current state (caller holds portfolio.lock)."""
+    stats = portfolio.stats
+    if recent is None:
+        recent = tuple(MappingProxyType(dict(t)) for t in portfolio.history.recent(RECENT_TRADES))
+    return PortfolioView(
+        version         = version,
+        balance_sol     = portfolio.balance_sol,
+        positions       = MappingProxyType({sym: MappingProxyType(p.to_dict())
+                                            for sym, p in portfolio.positions.items()}),
+        trade_count     = stats.count,
+        wins            = stats.wins,
+        closed_pnl_sol  = stats.pnl_sol,
+        best_multiplier = stats.best_multiplier,
+        by_reason       = MappingProxyType({r: v["count"] for r, v in stats.by_reason.items()}),
+        recent_trades   = recent,
+        window          = stats.window(),
+    )
+
+
+# ─── Live state ──────────────────────────────────────────────────────────────
+
+_current: Optional[PortfolioView] = None
+_listeners: List[Callable] = []   # fn(view) after each publish – keep them cheap, the lock is held
+
+# read() without a trading loop
+_disk_lock  = threading.Lock()
+_disk_store: Optional[SQLiteStore] = None
+_disk_view: Optional[PortfolioView] = None
+_disk_sig   = None
+
+
+def publish(portfolio, op: str = "") -> PortfolioView:
+    """Build and swap in a new view. Called by the portfolio after each change."""
+    global _current
+    with portfolio.lock:
+        previous = _current
+        # recent trades only change when a position closes
+        recent  = previous.recent_trades if previous is not None and op not in ("", "close") else None
+        version = previous.version + 1 if previous is not None else 1
+        _current = build_view(portfolio, version, recent)
+        for listener in _listeners:
+            listener(_current)
+    return _current
+
+
+def attach(portfolio):
+    """Make `portfolio` (the trading loop's) the source of current()."""
+    portfolio.subscribe(publish)
+    publish(portfolio)
+
+
+def subscribe(listener: Callable):
+    """Call listener(view) whenever a new view is published (e.g. to wake the SSE stream)."""
+    _listeners.append(listener)
+
+
+def current() -> Optional[PortfolioView]:
+    """Latest published view, or None when no portfolio is attached."""
+    return _current
+
+
+def _disk_signature(paths) -> tuple:
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def read() -> PortfolioView:
+    """current(), or a view of the persisted state in a process without a trading loop."""
+    view = _current
+    if view is not None:
+        return view
+    global _disk_store, _disk_view, _disk_sig
+    from config import STORAGE_BACKEND, SQLITE_FILE, POSITIONS_FILE, JOURNAL_FILE
+    from portfolio import Portfolio
+    sqlite = STORAGE_BACKEND == "sqlite"
+    sig = _disk_signature((SQLITE_FILE, SQLITE_FILE + "-wal") if sqlite else (POSITIONS_FILE, JOURNAL_FILE))
+    with _disk_lock:
+        if _disk_view is None or sig != _disk_sig:
+            if sqlite and _disk_store is None:
+                _disk_store = SQLiteStore(SQLITE_FILE)
+            version    = _disk_view.version + 1 if _disk_view is not None else 1
+            _disk_view = build_view(Portfolio.from_disk(store=_disk_store), version)
+            _disk_sig  = sig
+        return _disk_view
@@ -5,71 +5,182 @@ Falls back to CoinGecko for SOL/USD.
 Also includes a live scanner for trending Solana memecoins.
 """
 
-import requests
 import logging
 import time
-from typing import Optional, List, Dict
-
-from config import DEXSCREENER_URL, SOL_PRICE_URL
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional, List, Dict, Tuple
+
+import http_client
+import market_data_log
+from cache import TTLCache
+from candidate_batch import CandidateBatch, evaluate_rules, scan_rules
+from rate_limiter import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from config import (
+    DEXSCREENER_URL,
+    SOL_PRICE_URL,
+    DEXSCREENER_BATCH_SIZE,
+    DISCOVERY_CONCURRENCY,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTLS,
+    CACHE_STALE_WINDOWS,
+    MARKET_DATA_MODE,
+    MARKET_DATA_LOG,
+)
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache to avoid hammering the API
-_price_cache: dict = {}
-_cache_ttl = 300  # seconds (5 min — avoid CoinGecko rate limits)
+# Shared quote cache: SOL price, token quotes and pair metadata, each with its
+# own TTL. Readers (Telegram commands, dashboard) get stale-while-revalidate;
+# the trading loop passes fresh=True and only writes through it.
+_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTLS, CACHE_STALE_WINDOWS)
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
 
 
-def _cached(key: str) -> Optional[float]:
-    entry = _price_cache.get(key)
-    if entry and time.time() - entry["ts"] < _cache_ttl:
-        return entry["value"]
-    return None
+def set_cache_bypass(bypass: bool):
+    """Make every lookup go to the source (used for deterministic replays)."""
+    _cache.bypass = bypass
 
 
-def _store(key: str, value: float):
-    _price_cache[key] = {"value": value, "ts": time.time()}
+def _get_json(url: str, priority: int = PRIORITY_NORMAL):
+    """
+    GET a market-data URL and return its parsed JSON. All upstream reads in
+    this module go through here, so record/replay (market_data_log) sees them.
+    """
+    if market_data_log.replaying():
+        return market_data_log.replay_json(url)
+    r = http_client.get(url, timeout=10, priority=priority)
+    r.raise_for_status()
+    data = r.json()
+    market_data_log.record(url, r.status_code, data)
+    return data
+
 
+WSOL_MINT = "So11111111111111111111111111111111111111112"
 
-def get_sol_price_usd() -> float:
-    """Fetch current SOL price in USD from CoinGecko."""
-    cached = _cached("SOL")
-    if cached:
-        return cached
+
+def _fetch_sol_price() -> Optional[float]:
     try:
-        r = requests.get(SOL_PRICE_URL, timeout=10)
-        r.raise_for_status()
-        price = r.json()["solana"]["usd"]
-        _store("SOL", price)
+        return _get_json(SOL_PRICE_URL, PRIORITY_HIGH)["solana"]["usd"]
+    except Exception as e:
+        logger.warning(f"CoinGecko SOL price failed ({e}), trying DexScreener")
+
+    # CoinGecko throttles hardest — fall back to the deepest wSOL pair
+    data = _fetch_token_data_many([WSOL_MINT], priority=PRIORITY_HIGH).get(WSOL_MINT)
+    try:
+        return float(data["priceUsd"]) if data else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_sol_price_usd(fresh: bool = False) -> float:
+    """Fetch current SOL price in USD from CoinGecko (cached, DexScreener fallback)."""
+    price = _cache.get("sol", "SOL", _fetch_sol_price, fresh=fresh)
+    if price:
         return price
+    last = _cache.peek("sol", "SOL")  # fallback to last known
+    if last:
+        return last
+    logger.error("No SOL price available from any source — using 85.0 placeholder")
+    return 85.0
+
+
+def _best_pair(pairs: list) -> Optional[dict]:
+    """Pick the highest-liquidity pair, preferring Solana pairs."""
+    if not pairs:
+        return None
+    sol_pairs = [p for p in pairs if p.get("chainId") == "solana"]
+    if not sol_pairs:
+        sol_pairs = pairs
+    return max(sol_pairs, key=lambda p: float(p.get("liquidity", {}).get("usd", 0) or 0))
+
+
+def _pair_metadata(data: dict) -> dict:
+    return {
+        "pair_address": data.get("pairAddress", ""),
+        "dex":          data.get("dexId", ""),
+        "symbol":       data.get("baseToken", {}).get("symbol", ""),
+        "name":         data.get("baseToken", {}).get("name", ""),
+    }
+
+
+def _fetch_token_data_many(addresses: List[str], priority: int = PRIORITY_NORMAL) -> Dict[str, dict]:
+    result: Dict[str, dict] = {}
+
+    for i in range(0, len(addresses), DEXSCREENER_BATCH_SIZE):
+        chunk = addresses[i:i + DEXSCREENER_BATCH_SIZE]
+        try:
+            pairs = _get_json(f"{DEXSCREENER_URL}{','.join(chunk)}", priority).get("pairs", []) or []
+        except Exception as e:
+            logger.error(f"DexScreener batch error ({len(chunk)} tokens): {e}")
+            continue
+
+        by_address: Dict[str, list] = {}
+        wanted = set(chunk)
+        for p in pairs:
+            addr = p.get("baseToken", {}).get("address", "")
+            if addr in wanted:
+                by_address.setdefault(addr, []).append(p)
+
+        for addr, addr_pairs in by_address.items():
+            best = _best_pair(addr_pairs)
+            if best:
+                result[addr] = best
+
+    _cache.set_many("pair", {addr: _pair_metadata(d) for addr, d in result.items()})
+    return result
+
+
+def _fetch_token_data(contract_address: str) -> Optional[dict]:
+    try:
+        pairs = _get_json(f"{DEXSCREENER_URL}{contract_address}").get("pairs", [])
+        best = _best_pair(pairs)
+        if best:
+            _cache.set("pair", contract_address, _pair_metadata(best))
+        return best
+
     except Exception as e:
-        logger.error(f"Failed to fetch SOL price: {e}")
-        return _price_cache.get("SOL", {}).get("value", 85.0)  # fallback to last known
+        logger.error(f"DexScreener error for {contract_address}: {e}")
+        return None
 
 
-def get_token_data(contract_address: str) -> Optional[dict]:
+def get_token_data(contract_address: str, fresh: bool = False) -> Optional[dict]:
     """
     Fetch token data from DexScreener.
     Returns the best (highest liquidity) pair dict or None.
+    fresh=True skips the cache read (the result is still cached).
     """
-    try:
-        url = f"{DEXSCREENER_URL}{contract_address}"
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        pairs = r.json().get("pairs", [])
+    return _cache.get("quote", contract_address, lambda: _fetch_token_data(contract_address), fresh=fresh)
 
-        if not pairs:
-            return None
 
-        sol_pairs = [p for p in pairs if p.get("chainId") == "solana"]
-        if not sol_pairs:
-            sol_pairs = pairs
+def get_token_data_many(
+    contract_addresses: List[str],
+    fresh: bool = False,
+    priority: int = PRIORITY_NORMAL,
+) -> Dict[str, dict]:
+    """
+    Fetch token data for many contracts using DexScreener's comma-separated
+    multi-token endpoint (up to DEXSCREENER_BATCH_SIZE addresses per call).
+    Cached contracts are served from the cache unless fresh=True; only the
+    misses go to the network, at the given rate-limiter priority.
+    Returns {contract: best pair dict}; contracts with no pairs are omitted.
+    """
+    # dedupe, keep order
+    addresses = list(dict.fromkeys(a for a in contract_addresses if a))
+    if not addresses:
+        return {}
+    return _cache.get_many("quote", addresses,
+                           lambda keys: _fetch_token_data_many(keys, priority), fresh=fresh)
 
-        best = max(sol_pairs, key=lambda p: float(p.get("liquidity", {}).get("usd", 0) or 0))
-        return best
 
-    except Exception as e:
-        logger.error(f"DexScreener error for {contract_address}: {e}")
-        return None
+def get_pair_metadata(contract_address: str) -> Optional[dict]:
+    """Pair address / dex / symbol / name — changes rarely, so cached for long."""
+    def _load():
+        data = _fetch_token_data(contract_address)
+        return _pair_metadata(data) if data else None
+    return _cache.get("pair", contract_address, _load)
 
 
 def get_token_price_usd(contract_address: str) -> Optional[float]:
@@ -82,10 +193,7 @@ def get_token_price_usd(contract_address: str) -> Optional[float]:
         return None
 
 
-def get_token_stats(contract_address: str) -> Optional[dict]:
-    data = get_token_data(contract_address)
-    if not data:
-        return None
+def _pair_to_stats(data: dict, contract_address: str = "") -> Optional[dict]:
     try:
         return {
             "price_usd":        float(data.get("priceUsd", 0)),
@@ -106,6 +214,108 @@ def get_token_stats(contract_address: str) -> Optional[dict]:
         return None
 
 
+def get_token_stats(contract_address: str, fresh: bool = False) -> Optional[dict]:
+    data = get_token_data(contract_address, fresh=fresh)
+    if not data:
+        return None
+    return _pair_to_stats(data, contract_address)
+
+
+def get_token_stats_many(
+    contract_addresses: List[str],
+    fresh: bool = False,
+    priority: int = PRIORITY_NORMAL,
+) -> Dict[str, dict]:
+    """Batched get_token_stats: returns {contract: stats} for every contract found."""
+    stats = {}
+    for addr, data in get_token_data_many(contract_addresses, fresh=fresh, priority=priority).items():
+        parsed = _pair_to_stats(data, addr)
+        if parsed:
+            stats[addr] = parsed
+    return stats
+
+
+# ─── Discovery endpoints ─────────────────────────────────────────────────────
+
+BOOSTS_URL      = "https://api.dexscreener.com/token-boosts/latest/v1"
+PROFILES_URL    = "https://api.dexscreener.com/token-profiles/latest/v1"
+SEARCH_URL      = "https://api.dexscreener.com/latest/dex/search?q="
+SEARCH_QUERIES  = ["memecoin", "meme", "pump", "cat", "dog", "pepe", "raydium", "ai", "trump", "gork"]
+# Majors / stables the scanner never returns
+EXCLUDED_SYMBOLS = {"USDC", "USDT", "SOL", "WSOL", "WBTC", "WETH", "RAY", "BONK"}
+
+
+def _fetch_solana_addresses(url: str) -> List[str]:
+    """Boosts / profiles endpoints return a list of {chainId, tokenAddress}."""
+    items = _get_json(url, PRIORITY_LOW)
+    addrs = []
+    if isinstance(items, list):
+        for item in items:
+            if item.get("chainId") == "solana":
+                addr = item.get("tokenAddress", "")
+                if addr:
+                    addrs.append(addr)
+    return addrs
+
+
+def _fetch_search_pairs(query: str) -> List[dict]:
+    pairs = _get_json(f"{SEARCH_URL}{query}", PRIORITY_LOW).get("pairs", [])
+    return [p for p in pairs if p.get("chainId") == "solana"]
+
+
+def _discovery_jobs() -> List[Tuple[str, Callable[[], list]]]:
+    jobs = [("boosts", lambda: _fetch_solana_addresses(BOOSTS_URL))]
+    for query in SEARCH_QUERIES:
+        jobs.append((f"search:{query}", lambda q=query: _fetch_search_pairs(q)))
+    jobs.append(("profiles", lambda: _fetch_solana_addresses(PROFILES_URL)))
+    return jobs
+
+
+def _run_discovery() -> Dict[str, list]:
+    """
+    Run every discovery endpoint and return {endpoint name: result list}.
+    With DISCOVERY_CONCURRENCY > 1 the requests are fanned out over a thread
+    pool, so a scan takes roughly as long as the slowest endpoint instead of
+    the sum of all of them. Failed endpoints are logged and left out.
+    """
+    jobs    = _discovery_jobs()
+    results: Dict[str, list] = {}
+    latency: Dict[str, float] = {}
+
+    def _timed(name: str, fn: Callable[[], list]) -> Tuple[str, list, float]:
+        t0 = time.monotonic()
+        try:
+            return name, fn(), time.monotonic() - t0
+        except Exception as e:
+            logger.warning(f"DexScreener {name} failed: {e}")
+            return name, None, time.monotonic() - t0
+
+    t_start = time.monotonic()
+    if DISCOVERY_CONCURRENCY > 1:
+        with ThreadPoolExecutor(max_workers=min(DISCOVERY_CONCURRENCY, len(jobs)),
+                                thread_name_prefix="discovery") as pool:
+            futures = [pool.submit(_timed, name, fn) for name, fn in jobs]
+            for fut in as_completed(futures):
+                name, data, elapsed = fut.result()
+                latency[name] = elapsed
+                if data is not None:
+                    results[name] = data
+    else:
+        for name, fn in jobs:
+            name, data, elapsed = _timed(name, fn)
+            latency[name] = elapsed
+            if data is not None:
+                results[name] = data
+    total = time.monotonic() - t_start
+
+    slowest = sorted(latency.items(), key=lambda kv: kv[1], reverse=True)
+    logger.info(f"Discovery: {len(results)}/{len(jobs)} endpoints ok in {total:.2f}s "
+                f"(sum {sum(latency.values()):.2f}s, concurrency {DISCOVERY_CONCURRENCY}) | "
+                + ", ".join(f"{n} {t:.2f}s" for n, t in slowest[:3]))
+    logger.debug("Discovery latency: " + ", ".join(f"{n}={t:.3f}s" for n, t in slowest))
+    return results
+
+
 def scan_trending_solana_tokens(min_volume: float = 50_000,
                                  min_liquidity: float = 30_000,
                                  limit: int = 40) -> List[Dict]:
@@ -113,107 +323,52 @@ def scan_trending_solana_tokens(min_volume: float = 50_000,
     Pulls trending Solana token pairs from DexScreener using multiple endpoints.
     Returns a list of stats dicts ready for strategy evaluation.
     """
-    raw_pairs = []  # list of raw DexScreener pair dicts
+    discovered = _run_discovery()
 
-    # ── Endpoint 1: boosted tokens (addresses only → fetch stats separately) ─
-    boosted_addrs = []
-    try:
-        r = requests.get("https://api.dexscreener.com/token-boosts/latest/v1", timeout=10)
-        r.raise_for_status()
-        boosted = r.json()
-        if isinstance(boosted, list):
-            for item in boosted:
-                if item.get("chainId") == "solana":
-                    addr = item.get("tokenAddress", "")
-                    if addr:
-                        boosted_addrs.append(addr)
-    except Exception as e:
-        logger.warning(f"Boosted tokens fetch failed: {e}")
-
-    # ── Endpoint 2: top Solana pairs directly (has full pair data) ───────────
-    for query in ["memecoin", "meme", "pump", "cat", "dog", "pepe", "raydium", "ai", "trump", "gork"]:
-        try:
-            r = requests.get(
-                f"https://api.dexscreener.com/latest/dex/search?q={query}",
-                timeout=10
-            )
-            r.raise_for_status()
-            data = r.json().get("pairs", [])
-            for p in data:
-                if p.get("chainId") == "solana":
-                    raw_pairs.append(p)
-        except Exception as e:
-            logger.warning(f"DexScreener search ({query}) failed: {e}")
+    # Merge in a fixed endpoint order so symbol de-duplication is deterministic
+    # regardless of which request finished first.
+    raw_pairs = []  # list of raw DexScreener pair dicts
+    for query in SEARCH_QUERIES:
+        raw_pairs.extend(discovered.get(f"search:{query}", []))
 
-    # ── Endpoint 3: token profiles ────────────────────────────────────────────
-    try:
-        r = requests.get("https://api.dexscreener.com/token-profiles/latest/v1", timeout=10)
-        r.raise_for_status()
-        profiles = r.json()
-        if isinstance(profiles, list):
-            for item in profiles:
-                if item.get("chainId") == "solana":
-                    addr = item.get("tokenAddress", "")
-                    if addr and addr not in boosted_addrs:
-                        boosted_addrs.append(addr)
-    except Exception as e:
-        logger.warning(f"Token profiles fetch failed: {e}")
+    # boosted first, then profiles not already boosted
+    boosted_addrs = list(dict.fromkeys(discovered.get("boosts", []) + discovered.get("profiles", [])))
 
     # ── Fetch boosted/profile addresses in batch ──────────────────────────────
+    boosted_data = get_token_data_many(boosted_addrs[:30], fresh=True, priority=PRIORITY_LOW)
     for addr in boosted_addrs[:30]:
-        try:
-            data = get_token_data(addr)
-            if data and data.get("chainId") == "solana":
-                raw_pairs.append(data)
-            time.sleep(0.1)
-        except Exception:
-            pass
+        data = boosted_data.get(addr)
+        if data and data.get("chainId") == "solana":
+            raw_pairs.append(data)
 
     logger.info(f"Found {len(raw_pairs)} raw Solana pairs to evaluate")
 
-    # ── Parse + filter ────────────────────────────────────────────────────────
+    # ── Parse + filter (columnar, see candidate_batch.py) ────────────────────
+    batch  = CandidateBatch.from_pairs(raw_pairs)
+    result = evaluate_rules(batch, scan_rules(min_volume, min_liquidity))
+
     results = []
     seen_symbols = set()
     seen_contracts = set()
-
-    for p in raw_pairs:
-        try:
-            sym      = p.get("baseToken", {}).get("symbol", "").upper()
-            contract = p.get("baseToken", {}).get("address", "")
-            if not sym or not contract:
-                continue
-            if sym in seen_symbols or contract in seen_contracts:
-                continue
-            if sym in ("USDC", "USDT", "SOL", "WSOL", "WBTC", "WETH", "RAY", "BONK"):
-                continue
-
-            vol   = float(p.get("volume", {}).get("h24", 0) or 0)
-            liq   = float(p.get("liquidity", {}).get("usd", 0) or 0)
-            fdv   = float(p.get("fdv", 0) or 0)
-            price = float(p.get("priceUsd", 0) or 0)
-            ch1h  = float(p.get("priceChange", {}).get("h1", 0) or 0)
-            ch6h  = float(p.get("priceChange", {}).get("h6", 0) or 0)
-            ch24h = float(p.get("priceChange", {}).get("h24", 0) or 0)
-
-            if vol < min_volume or liq < min_liquidity or price <= 0:
-                continue
-
-            seen_symbols.add(sym)
-            seen_contracts.add(contract)
-            results.append({
-                "symbol":           sym,
-                "contract":         contract,
-                "price_usd":        price,
-                "volume_24h":       vol,
-                "liquidity_usd":    liq,
-                "fdv":              fdv,
-                "price_change_1h":  ch1h,
-                "price_change_6h":  ch6h,
-                "price_change_24h": ch24h,
-            })
-        except Exception as e:
-            logger.debug(f"Parse error: {e}")
-
-    logger.info(f"Qualified tokens after filtering: {len(results)}")
+    for i in result.passed_indices():
+        sym, contract = batch.symbols[i], batch.contracts[i]
+        if not sym or not contract:
+            continue
+        if sym in seen_symbols or contract in seen_contracts:
+            continue
+        if sym in EXCLUDED_SYMBOLS:
+            continue
+        seen_symbols.add(sym)
+        seen_contracts.add(contract)
+        results.append(batch.row(i))
+
+    logger.info(f"Qualified tokens after filtering: {len(results)} | rejected: {result.rejections()}")
     return results[:limit]
 
+
+# ─── Record / replay mode (MARKET_DATA_MODE in .env) ─────────────────────────
+if MARKET_DATA_MODE == "record":
+    market_data_log.start_recording(MARKET_DATA_LOG)
+elif MARKET_DATA_MODE == "replay":
+    market_data_log.start_replay(MARKET_DATA_LOG)
+    set_cache_bypass(True)
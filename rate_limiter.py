@@ -0,0 +1,178 @@
+"""
+Per-host request scheduler for the free market-data APIs (DexScreener,
+CoinGecko). One token bucket per host, shared by every thread:
+
+  • priorities  – HIGH requests (open-position refreshes) may drain the
+                  bucket completely; LOW requests (discovery) must leave
+                  RATE_LIMIT_RESERVE tokens for them and yield to waiting
+                  HIGH requests
+  • Retry-After – a 429 blocks the whole host until the server says so
+  • adaptive    – every 429 halves the effective rate (and backs off
+                  exponentially when no Retry-After is given); successful
+                  responses slowly restore it
+Hosts without a configured limit are not throttled.
+"""
+
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from config import (
+    RATE_LIMITS,
+    RATE_LIMIT_RESERVE,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_BACKOFF_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH   = 0   # open-position price refreshes, SOL price
+PRIORITY_NORMAL = 1
+PRIORITY_LOW    = 2   # trending discovery
+
+
+class RateLimitedError(requests.RequestException):
+    """Raised when a request could not get budget within its max wait."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class HostLimiter:
+    def __init__(self, host: str, rate: float, burst: float):
+        self.host           = host
+        self.base_rate      = rate
+        self.rate           = rate
+        self.burst          = burst
+        self.tokens         = burst
+        self.updated        = time.monotonic()
+        self.blocked_until  = 0.0
+        self.consecutive_429 = 0
+        self.high_waiting   = 0
+        self._cond          = threading.Condition()
+
+        self.requests       = 0
+        self.throttled      = 0     # 429 responses seen
+        self.rejected       = 0     # requests that gave up waiting
+        self.wait_seconds   = 0.0
+
+    def _refill(self, now: float):
+        # `updated` may lie in the future while the host is blocked by a 429
+        if now > self.updated:
+            self.tokens  = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self, priority: int = PRIORITY_NORMAL, max_wait: Optional[float] = None):
+        """Block until a token is available for this priority (or raise RateLimitedError)."""
+        start    = time.monotonic()
+        deadline = start + max_wait if max_wait is not None else None
+        floor    = 0.0 if priority == PRIORITY_HIGH else min(RATE_LIMIT_RESERVE, self.burst - 1)
+
+        with self._cond:
+            if priority == PRIORITY_HIGH:
+                self.high_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self.blocked_until:
+                        yielding = priority != PRIORITY_HIGH and self.high_waiting > 0
+                        if not yielding and self.tokens - 1 >= floor:
+                            self.tokens -= 1
+                            self.requests += 1
+                            self.wait_seconds += now - start
+                            return
+                        wait = max((1 + floor - self.tokens) / self.rate, 0.01)
+                    else:
+                        wait = self.blocked_until - now
+                    if deadline is not None:
+                        if now + wait > deadline:
+                            self.rejected += 1
+                            raise RateLimitedError(f"{self.host}: no request budget within {max_wait:.1f}s")
+                    self._cond.wait(wait)
+            finally:
+                if priority == PRIORITY_HIGH:
+                    self.high_waiting -= 1
+                    self._cond.notify_all()
+
+    def on_response(self, status_code: int, retry_after: Optional[float] = None) -> float:
+        """
+        Feed back the upstream's verdict. Returns how long the host is now
+        blocked for (0 if not throttled).
+        """
+        with self._cond:
+            if status_code == 429:
+                self.throttled       += 1
+                self.consecutive_429 += 1
+                self.rate = max(self.base_rate * 0.1, self.rate * 0.5)
+                if retry_after is None:
+                    retry_after = min(RATE_LIMIT_BACKOFF_MAX, 2 ** self.consecutive_429)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+                # empty bucket, refilling only once the block is over
+                self.tokens  = 0.0
+                self.updated = self.blocked_until
+                logger.warning(f"{self.host} throttled (429) — pausing {retry_after:.1f}s, "
+                               f"rate now {self.rate:.2f}/s")
+                return retry_after
+            if status_code < 500:
+                self.consecutive_429 = 0
+                if self.rate < self.base_rate:
+                    self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+            return 0.0
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rate":         round(self.rate, 3),
+                "base_rate":    self.base_rate,
+                "tokens":       round(self.tokens, 2),
+                "requests":     self.requests,
+                "throttled":    self.throttled,
+                "rejected":     self.rejected,
+                "wait_seconds": round(self.wait_seconds, 2),
+                "blocked_for":  round(max(0.0, self.blocked_until - time.monotonic()), 1),
+            }
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(url: str) -> Optional[HostLimiter]:
+    host = urlsplit(url).netloc
+    limiter = _limiters.get(host)
+    if limiter is None and host in RATE_LIMITS:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                rate, burst = RATE_LIMITS[host]
+                limiter = HostLimiter(host, rate, burst)
+                _limiters[host] = limiter
+    return limiter
+
+
+def default_max_wait(priority: int) -> Optional[float]:
+    """HIGH waits as long as it takes; everything else gives up eventually."""
+    return None if priority == PRIORITY_HIGH else RATE_LIMIT_MAX_WAIT
+
+
+def limiter_stats() -> dict:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {l.host: l.stats() for l in limiters}
@@ -8,7 +8,8 @@
 
     // ─── CONFIG ──────────────────────────────────────────────────────────────
     const API_URL = "/api/stats";
-    const REFRESH_INTERVAL = 30_000; // 30s
+    const STREAM_URL = "/api/stream";
+    const REFRESH_INTERVAL = 30_000; // 30s, polling only while the live stream is down
 
     // ─── PARTICLES ───────────────────────────────────────────────────────────
     const canvas = document.getElementById("particles");
@@ -224,10 +225,11 @@
 
     // ─── DATA FETCHING ──────────────────────────────────────────────────────
     let lastData = null;
+    let feedItems = [];
 
     async function fetchStats() {
         try {
-            const res = await fetch(API_URL);
+            const res = await fetch(API_URL, { cache: "no-cache" });   // revalidate (ETag → 304)
             if (!res.ok) throw new Error("API error");
             const data = await res.json();
             updateDashboard(data);
@@ -243,49 +245,72 @@
 
     async function fetchFeed() {
         try {
-            const res = await fetch("/api/feed");
+            // after the first load only ask for entries newer than the newest one we have
+            const url = feedItems.length ? `/api/feed?since=${feedItems[0].id}` : "/api/feed";
+            const res = await fetch(url, { cache: "no-cache" });
             if (!res.ok) return;
-            const feed = await res.json();
-            renderFeed(feed);
+            const entries = await res.json();
+            prependFeed(entries);
         } catch (e) {
             console.warn("Could not fetch feed:", e);
         }
     }
 
+    const FEED_MAX = 50;
+
     function renderFeed(feed) {
         const container = document.getElementById("tradesFeed");
         if (!container) return;
         if (!feed || feed.length === 0) return;
+        feedItems = feed.slice(0, FEED_MAX);
+        container.innerHTML = feedItems.map(feedCard).join("");
+    }
 
-        const kindIcon = { buy: "🟢", sell: "🔴", partial_sell: "💰", stop_loss: "🛑", dca: "📉", thought: "🧠", summary: "📊", trade: "📊" };
-        const kindLabel = { buy: "BUY", sell: "SELL", partial_sell: "PARTIAL", stop_loss: "STOP", dca: "DCA", thought: "THOUGHT", summary: "SUMMARY", trade: "TRADE" };
-        const kindColor = { buy: "#14F195", sell: "#FF4757", partial_sell: "#FFD700", stop_loss: "#FF4757", dca: "#9945FF", thought: "#64b5f6", summary: "#9945FF", trade: "#14F195" };
-
-        container.innerHTML = feed.map((entry, i) => {
-            const icon = kindIcon[entry.kind] || "📊";
-            const label = kindLabel[entry.kind] || "MSG";
-            const color = kindColor[entry.kind] || "#14F195";
-            const ago = formatTimeAgo(entry.timestamp);
-            // format text: newlines → <br>, preserve as monospace-ish
-            const formatted = entry.text
-                .replace(/&/g, "&amp;")
-                .replace(/</g, "&lt;")
-                .replace(/>/g, "&gt;")
-                .replace(/\n/g, "<br>");
-
-            return `
-                <div class="trade-card feed-card" style="animation-delay:${i * 40}ms; align-items:flex-start;">
-                    <div class="trade-card-icon" style="font-size:1.4rem; min-width:44px; text-align:center;">${icon}</div>
-                    <div class="trade-card-info" style="flex:1; min-width:0;">
-                        <div style="display:flex; align-items:center; gap:8px; margin-bottom:6px;">
-                            <span style="font-size:.65rem; font-weight:700; letter-spacing:.08em; color:${color}; background:${color}18; border:1px solid ${color}40; border-radius:4px; padding:2px 7px;">${label}</span>
-                            <span style="font-size:.72rem; color:var(--text-muted);">${ago}</span>
-                        </div>
-                        <p style="font-size:.82rem; line-height:1.6; color:var(--text-secondary); margin:0; word-break:break-word;">${formatted}</p>
+    // new entries (newest first) go on top; the rest of the list isn't re-rendered
+    function prependFeed(entries) {
+        const container = document.getElementById("tradesFeed");
+        if (!container || !entries || entries.length === 0) return;
+        if (!feedItems.length) return renderFeed(entries);
+        container.insertAdjacentHTML("afterbegin", entries.map(feedCard).join(""));
+        feedItems = entries.concat(feedItems).slice(0, FEED_MAX);
+        while (container.children.length > FEED_MAX) container.lastElementChild.remove();
+    }
+
+    // "time ago" labels of cards that are no longer re-rendered
+    function refreshFeedTimes() {
+        document.querySelectorAll("#tradesFeed [data-ts]").forEach((el) => {
+            el.textContent = formatTimeAgo(Number(el.dataset.ts));
+        });
+    }
+
+    const kindIcon = { buy: "🟢", sell: "🔴", partial_sell: "💰", stop_loss: "🛑", dca: "📉", thought: "🧠", summary: "📊", trade: "📊" };
+    const kindLabel = { buy: "BUY", sell: "SELL", partial_sell: "PARTIAL", stop_loss: "STOP", dca: "DCA", thought: "THOUGHT", summary: "SUMMARY", trade: "TRADE" };
+    const kindColor = { buy: "#14F195", sell: "#FF4757", partial_sell: "#FFD700", stop_loss: "#FF4757", dca: "#9945FF", thought: "#64b5f6", summary: "#9945FF", trade: "#14F195" };
+
+    function feedCard(entry, i) {
+        const icon = kindIcon[entry.kind] || "📊";
+        const label = kindLabel[entry.kind] || "MSG";
+        const color = kindColor[entry.kind] || "#14F195";
+        const ago = formatTimeAgo(entry.timestamp);
+        // format text: newlines → <br>, preserve as monospace-ish
+        const formatted = entry.text
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/\n/g, "<br>");
+
+        return `
+            <div class="trade-card feed-card" style="animation-delay:${i * 40}ms; align-items:flex-start;">
+                <div class="trade-card-icon" style="font-size:1.4rem; min-width:44px; text-align:center;">${icon}</div>
+                <div class="trade-card-info" style="flex:1; min-width:0;">
+                    <div style="display:flex; align-items:center; gap:8px; margin-bottom:6px;">
+                        <span style="font-size:.65rem; font-weight:700; letter-spacing:.08em; color:${color}; background:${color}18; border:1px solid ${color}40; border-radius:4px; padding:2px 7px;">${label}</span>
+                        <span style="font-size:.72rem; color:var(--text-muted);" data-ts="${entry.timestamp}">${ago}</span>
                     </div>
+                    <p style="font-size:.82rem; line-height:1.6; color:var(--text-secondary); margin:0; word-break:break-word;">${formatted}</p>
                 </div>
-            `;
-        }).join("");
+            </div>
+        `;
     }
 
     function getDemoData() {
@@ -493,11 +518,52 @@
         });
     });
 
+    // ─── LIVE STREAM (SSE) ───────────────────────────────────────────────────
+    // The server pushes the full stats on connect, then only changed keys
+    // ("delta") and new feed entries. Polling runs only while it's down.
+    let pollTimers = null;
+
+    function startPolling() {
+        if (pollTimers) return;
+        fetchStats();
+        fetchFeed();
+        pollTimers = [setInterval(fetchStats, REFRESH_INTERVAL), setInterval(fetchFeed, REFRESH_INTERVAL)];
+    }
+
+    function stopPolling() {
+        if (!pollTimers) return;
+        pollTimers.forEach(clearInterval);
+        pollTimers = null;
+    }
+
+    function connectStream() {
+        if (!window.EventSource) {
+            startPolling();
+            return;
+        }
+        const stream = new EventSource(STREAM_URL);
+        stream.addEventListener("stats", (e) => {
+            lastData = JSON.parse(e.data);
+            updateDashboard(lastData);
+        });
+        stream.addEventListener("delta", (e) => {
+            if (!lastData) return;
+            Object.assign(lastData, JSON.parse(e.data));
+            updateDashboard(lastData);
+        });
+        stream.addEventListener("feed", (e) => {
+            const msg = JSON.parse(e.data);
+            if (msg.reset) renderFeed(msg.entries);
+            else prependFeed(msg.entries);
+        });
+        stream.onopen = stopPolling;
+        // EventSource reconnects by itself; poll until it's back
+        stream.onerror = startPolling;
+    }
+
     // ─── INIT ────────────────────────────────────────────────────────────────
-    fetchStats();
-    fetchFeed();
-    setInterval(fetchStats, REFRESH_INTERVAL);
-    setInterval(fetchFeed, REFRESH_INTERVAL);
+    connectStream();
+    setInterval(refreshFeedTimes, 60_000);
 
     // Easter egg: Konami code → rain of apes
     let konamiSeq = [];
@@ -5,79 +5,107 @@ Now scans ALL trending Solana tokens from DexScreener live.
 """
 
 import logging
-import time
 import random
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from config import (
-    TAKE_PROFIT_TARGETS,
-    PARTIAL_SELL_PCT,
-    STOP_LOSS_PCT,
     MAX_POSITIONS,
     POSITION_SIZE_SOL,
+    UNIVERSE_MAX_TOKENS,
 )
+import clock
+from candidate_batch import CandidateBatch, Rule, evaluate_rules, first_rejection, scan_rules
 from portfolio import Portfolio, Position
-from price_fetcher import get_token_stats, get_sol_price_usd, scan_trending_solana_tokens
+from price_fetcher import get_token_stats_many, scan_trending_solana_tokens
+from market_snapshot import MarketSnapshot, build_market_snapshot
+from rate_limiter import PRIORITY_LOW
+from strategy_params import StrategyParams
+from token_universe import TokenUniverse
 
 logger = logging.getLogger(__name__)
 
-# DCA trigger: buy more when position is down this much
-DCA_TRIGGER_PCT   = 0.20   # -20%
-# Early jeet: sell a winner to recover losses when portfolio is in the red
-EARLY_JEET_MIN_GAIN = 0.10  # position must be at least +10% to jeet
-EARLY_JEET_MAX_GAIN = 0.35  # don't jeet positions already above +35% (let them run)
+# Randomness (jeet size) goes through one generator so backtests can seed it
+_rng = random.Random()
+
+
+def set_random_seed(seed: Optional[int]):
+    _rng.seed(seed)
 
 
 # ─── Buy Signal ──────────────────────────────────────────────────────────────
 
-def should_buy(symbol: str, stats: dict, portfolio: Portfolio) -> Tuple[bool, str]:
-    if symbol in portfolio.positions:
-        return False, "already holding"
-    if len(portfolio.positions) >= MAX_POSITIONS:
-        return False, "max positions reached"
-    if portfolio.balance_sol < POSITION_SIZE_SOL:
-        return False, "insufficient balance"
+# Discovery minimums (stricter than the liquidity/volume safety rules below)
+SCAN_MIN_VOLUME    = 150_000
+SCAN_MIN_LIQUIDITY = 80_000
 
-    # ── Bezpieczeństwo ────────────────────────────────────────────────────────
-    if stats["liquidity_usd"] < 50_000:
-        return False, f"low liquidity (${stats['liquidity_usd']:,.0f})"
+# Active thresholds (see strategy_params.py). Rules are evaluated in order;
+# a token's rejection reason is its first failing rule. Universe tokens go
+# through the scanner minimums, then safety, then momentum; tokens that fail
+# only a momentum rule (or pass) stay "hot".
+_params: StrategyParams
+SAFETY_RULES:   List[Rule]
+MOMENTUM_RULES: List[Rule]
+UNIVERSE_RULES: List[Rule]
+_FIRST_MOMENTUM_RULE: int
 
-    if stats["volume_24h"] < 100_000:
-        return False, f"low volume (${stats['volume_24h']:,.0f})"
 
-    # Zbyt mały mcap = rug risk
-    if stats["fdv"] < 150_000:
-        return False, f"mcap too low (${stats['fdv']:,.0f})"
+def set_params(params: StrategyParams):
+    """Swap the active strategy parameters (backtests / parameter sweeps)."""
+    global _params, SAFETY_RULES, MOMENTUM_RULES, UNIVERSE_RULES, _FIRST_MOMENTUM_RULE
+    _params        = params
+    SAFETY_RULES   = params.safety_rules()
+    MOMENTUM_RULES = params.momentum_rules()
+    UNIVERSE_RULES = scan_rules(SCAN_MIN_VOLUME, SCAN_MIN_LIQUIDITY) + SAFETY_RULES + MOMENTUM_RULES
+    _FIRST_MOMENTUM_RULE = len(UNIVERSE_RULES) - len(MOMENTUM_RULES)
 
-    # Zbyt duży mcap = już po pompie
-    if stats["fdv"] > 80_000_000:
-        return False, f"mcap too high (${stats['fdv']:,.0f})"
 
-    # ── Momentum ──────────────────────────────────────────────────────────────
-    change_1h = stats["price_change_1h"]
-    change_6h = stats["price_change_6h"]
+def get_params() -> StrategyParams:
+    return _params
+
+
+set_params(StrategyParams())
+
+
+def _safety_rejection(stats: dict) -> Optional[str]:
+    """Liquidity / volume / mcap rules — slow-moving, decides hot vs cold tokens."""
+    return first_rejection(stats, SAFETY_RULES)
+
+
+def _momentum_rejection(stats: dict) -> Optional[str]:
+    return first_rejection(stats, MOMENTUM_RULES)
+
+
+def _buy_reason(stats: dict) -> str:
+    return (f"1h +{stats['price_change_1h']:.1f}% | "
+            f"6h +{stats['price_change_6h']:.1f}% | "
+            f"vol ${stats['volume_24h']:,.0f} | "
+            f"liq ${stats['liquidity_usd']:,.0f} | "
+            f"mcap ${stats['fdv']:,.0f}")
+
 
-    # Musi rosnąć w 1h, ale nie być już po ogromnej pompie (>300% = prawdopodobnie za późno)
-    if change_1h < 2.0:
-        return False, f"not pumping enough ({change_1h:+.1f}% 1h)"
+def passes_buy_filters(stats: dict) -> Tuple[bool, str]:
+    """The stats-only part of should_buy (no portfolio state)."""
+    # ── Bezpieczeństwo ────────────────────────────────────────────────────────
+    rejection = _safety_rejection(stats)
+    if rejection:
+        return False, rejection
 
-    if change_1h > 300.0:
-        return False, f"pump too big, likely top ({change_1h:+.1f}% 1h)"
+    # ── Momentum ──────────────────────────────────────────────────────────────
+    rejection = _momentum_rejection(stats)
+    if rejection:
+        return False, rejection
 
-    # 6h nie może być ekstremalnie wysoka (>400% = już po pompie)
-    if change_6h > 400.0:
-        return False, f"6h already mooned ({change_6h:+.1f}%)"
+    return True, _buy_reason(stats)
 
-    # 6h musi być pozytywna (trend w górę)
-    if change_6h < -15.0:
-        return False, f"6h trend negative ({change_6h:+.1f}%)"
 
-    reason = (f"1h +{change_1h:.1f}% | "
-              f"6h +{change_6h:.1f}% | "
-              f"vol ${stats['volume_24h']:,.0f} | "
-              f"liq ${stats['liquidity_usd']:,.0f} | "
-              f"mcap ${stats['fdv']:,.0f}")
-    return True, reason
+def should_buy(symbol: str, stats: dict, portfolio: Portfolio) -> Tuple[bool, str]:
+    if symbol in portfolio.positions:
+        return False, "already holding"
+    if len(portfolio.positions) >= MAX_POSITIONS:
+        return False, "max positions reached"
+    if portfolio.balance_sol < POSITION_SIZE_SOL:
+        return False, "insufficient balance"
+    return passes_buy_filters(stats)
 
 
 # ─── Sell Signals ────────────────────────────────────────────────────────────
@@ -96,170 +124,258 @@ def check_sell_signal(pos: Position, current_price_usd: float) -> Tuple[str, flo
     if mult > pos.highest_mult:
         pos.highest_mult = mult
 
+    targets = _params.take_profit_targets
+
     # Stop loss
-    if mult <= (1 - STOP_LOSS_PCT):
+    if mult <= (1 - _params.stop_loss_pct):
         return SellSignal.STOP_LOSS, mult
 
     # Take profit levels
-    if pos.next_tp_index < len(TAKE_PROFIT_TARGETS):
-        target = TAKE_PROFIT_TARGETS[pos.next_tp_index]
+    if pos.next_tp_index < len(targets):
+        target = targets[pos.next_tp_index]
         if mult >= target:
             if not pos.partial_sold and pos.next_tp_index == 0:
                 pos.next_tp_index += 1
                 return SellSignal.PARTIAL, mult
-            if pos.next_tp_index >= len(TAKE_PROFIT_TARGETS) - 1:
+            if pos.next_tp_index >= len(targets) - 1:
                 return SellSignal.FULL_TP, mult
             pos.next_tp_index += 1
             return SellSignal.PARTIAL, mult
 
-    # Stale: open > 24h and still below 1.5x
-    age_hours = (time.time() - pos.timestamp) / 3600
-    if age_hours > 24 and mult < 1.5:
+    # Stale: open > 24h and still below 1.5x (defaults)
+    age_hours = (clock.now() - pos.timestamp) / 3600
+    if age_hours > _params.stale_hours and mult < _params.stale_max_mult:
         return SellSignal.STALE, mult
 
     return SellSignal.NONE, mult
 
 
-# ─── Main scan ───────────────────────────────────────────────────────────────
+# ─── Token universe ──────────────────────────────────────────────────────────
+
+# Tokens discovered in earlier scans, kept between scans (see token_universe.py)
+_universe = TokenUniverse()
+
 
-def scan_and_trade(portfolio: Portfolio, _watchlist_unused: list = None) -> List[dict]:
+def evaluate_universe(universe: TokenUniverse, entries: List, now: float) -> Dict[str, int]:
+    """
+    Run the buy rules over every entry whose stats changed, as one columnar
+    batch. Returns the per-rule rejection histogram.
+    """
+    if not entries:
+        return {}
+    batch  = CandidateBatch.from_stats([e.stats for e in entries])
+    result = evaluate_rules(batch, UNIVERSE_RULES)
+    for i, entry in enumerate(entries):
+        failed = int(result.failed_rule[i])
+        if failed < 0:
+            ok, reason = True, _buy_reason(entry.stats)
+        else:
+            ok, reason = False, result.reason(batch, i)
+        # "hot" = only momentum stands between this token and a buy
+        universe.record_eval(entry, ok, reason, hot=failed < 0 or failed >= _FIRST_MOMENTUM_RULE, now=now)
+    return result.rejections()
+
+
+def refresh_universe(universe: TokenUniverse, snapshot: MarketSnapshot, now: float):
     """
-    1. Check existing positions for sell signals (uses live price per contract).
-    2. Fetch ALL trending Solana tokens from DexScreener.
-    3. Apply buy signal logic to each one.
-    Returns list of event dicts for message generation.
+    Run discovery when it's due, then refresh hot tokens (and cold ones whose
+    interval passed) with batched quote lookups. Open positions come from the
+    scan snapshot for free.
+    """
+    if universe.discovery_due(now):
+        logger.info("Scanning DexScreener for trending Solana tokens…")
+        discovered = scan_trending_solana_tokens(min_volume=SCAN_MIN_VOLUME,
+                                                 min_liquidity=SCAN_MIN_LIQUIDITY,
+                                                 limit=UNIVERSE_MAX_TOKENS)
+        new = universe.ingest(discovered, now)
+        logger.info(f"Discovery: {len(discovered)} tokens, {new} new")
+
+    universe.update(dict(snapshot.quotes), now)
+    due = universe.due_for_refresh(now)
+    if due:
+        universe.update(get_token_stats_many(due, fresh=True, priority=PRIORITY_LOW), now)
+
+    pruned = universe.prune(now, keep=snapshot.quotes.keys())
+    s = universe.summary()
+    logger.info(f"Universe: {s['tokens']} tokens ({s['hot']} hot / {s['cold']} cold) | "
+                f"refreshed {len(due)} | pruned {pruned}")
+
+
+# ─── Position monitor ────────────────────────────────────────────────────────
+
+def monitor_positions(portfolio: Portfolio, snapshot: MarketSnapshot) -> List[dict]:
+    """
+    Sell side of the strategy, cheap enough to run every few seconds:
+    1. Check open positions for TP / SL / STALE / DCA (prices from the snapshot).
+    2. Early jeet a small winner when the portfolio is in the red.
+    Holds portfolio.lock for the whole pass. Returns event dicts.
     """
     events = []
-    sol_price = get_sol_price_usd()
-    logger.info(f"SOL: ${sol_price:.2f} | {portfolio.summary()}")
-
-    # ── 1. Check existing positions ──
-    for symbol, pos in list(portfolio.positions.items()):
-        stats = get_token_stats(pos.contract)
-        if not stats:
-            logger.warning(f"Could not get price for {symbol}")
-            continue
-
-        current_price = stats["price_usd"]
-
-        # Update current price for real-time PnL on dashboard
-        pos.current_price_usd = current_price
-
-        mult          = pos.current_multiplier(current_price)
-        signal, mult  = check_sell_signal(pos, current_price)
-
-        if signal == SellSignal.STOP_LOSS:
-            result = portfolio.full_sell(symbol, current_price, sol_price, reason="SL")
-            if result:
-                events.append({"type": "stop_loss", "symbol": symbol,
-                                "multiplier": mult, "pnl_sol": result["pnl_sol"]})
-
-        elif signal == SellSignal.PARTIAL:
-            result = portfolio.partial_sell(symbol, current_price, sol_price, PARTIAL_SELL_PCT)
-            if result:
-                events.append({"type": "partial_sell", "symbol": symbol,
-                                "multiplier": mult, "pct": PARTIAL_SELL_PCT,
-                                "sol_received": result["sol_received"]})
-
-        elif signal == SellSignal.FULL_TP:
-            result = portfolio.full_sell(symbol, current_price, sol_price, reason="TP")
-            if result:
-                events.append({"type": "full_sell", "symbol": symbol,
-                                "multiplier": mult, "pnl_sol": result["pnl_sol"]})
-
-        elif signal == SellSignal.STALE:
-            result = portfolio.full_sell(symbol, current_price, sol_price, reason="STALE")
-            if result:
-                events.append({"type": "stale_sell", "symbol": symbol,
-                                "multiplier": mult, "pnl_sol": result["pnl_sol"]})
-
-        elif signal == SellSignal.NONE:
-            # ── DCA: position down -20%, no DCA done yet ──
-            if mult <= (1 - DCA_TRIGGER_PCT) and not pos.dca_done:
-                result = portfolio.dca_buy(symbol, current_price, sol_price)
+    sol_price = snapshot.sol_price_usd
+
+    with portfolio.lock:
+        # ── 1. Check existing positions ──
+        for symbol, pos in list(portfolio.positions.items()):
+            stats = snapshot.stats(pos.contract)
+            if not stats:
+                if pos.timestamp < snapshot.created_at:   # not just bought by the buy loop
+                    logger.warning(f"Could not get price for {symbol}")
+                continue
+
+            current_price = stats["price_usd"]
+
+            # Update current price for real-time PnL on dashboard
+            pos.current_price_usd = current_price
+
+            mult          = pos.current_multiplier(current_price)
+            signal, mult  = check_sell_signal(pos, current_price)
+
+            if signal == SellSignal.STOP_LOSS:
+                result = portfolio.full_sell(symbol, current_price, sol_price, reason="SL")
                 if result:
-                    logger.info(f"DCA {symbol}: added {result['sol_added']:.3f} SOL | new avg: ${result['avg_entry']:.8f}")
-                    events.append({
-                        "type":      "dca_buy",
-                        "symbol":    symbol,
-                        "sol_added": result["sol_added"],
-                        "avg_entry": result["avg_entry"],
-                        "current_price": current_price,
-                        "multiplier": mult,
-                    })
+                    events.append({"type": "stop_loss", "symbol": symbol,
+                                    "multiplier": mult, "pnl_sol": result["pnl_sol"]})
 
-    # ── 2. Early jeet: if overall portfolio PnL is negative, sell a small winner ──
-    # Build current prices dict from what we already fetched in position loop
-    current_prices_map = {}
-    for symbol, pos in portfolio.positions.items():
-        stats = get_token_stats(pos.contract)
-        if stats:
-            current_prices_map[symbol] = stats["price_usd"]
+            elif signal == SellSignal.PARTIAL:
+                result = portfolio.partial_sell(symbol, current_price, sol_price, _params.partial_sell_pct)
+                if result:
+                    events.append({"type": "partial_sell", "symbol": symbol,
+                                    "multiplier": mult, "pct": _params.partial_sell_pct,
+                                    "sol_received": result["sol_received"]})
 
-    overall_pnl = portfolio.total_pnl_sol(current_prices_map)
-    if overall_pnl < -0.1:  # in the red by at least 0.1 SOL (including unrealized)
-        for symbol, pos in list(portfolio.positions.items()):
-            if pos.early_jeet_done:
-                continue  # already jeeted this position once
-            current_price = current_prices_map.get(symbol, pos.entry_price_usd)
-            mult = pos.current_multiplier(current_price)
-            gain = mult - 1.0  # e.g. 0.15 = +15%
-
-            if EARLY_JEET_MIN_GAIN <= gain <= EARLY_JEET_MAX_GAIN:
-                # Jeet a random portion between 50-100%
-                jeet_pct = random.choice([0.5, 0.75, 1.0])
-                pos.early_jeet_done = True  # mark before sell to prevent double-trigger
-                if jeet_pct == 1.0:
-                    result = portfolio.full_sell(symbol, current_price, sol_price, reason="JEET")
-                    if result:
-                        events.append({
-                            "type":       "early_jeet",
-                            "symbol":     symbol,
-                            "multiplier": mult,
-                            "pct":        100,
-                            "pnl_sol":    result["pnl_sol"],
-                        })
-                else:
-                    result = portfolio.partial_sell(symbol, current_price, sol_price, jeet_pct)
+            elif signal == SellSignal.FULL_TP:
+                result = portfolio.full_sell(symbol, current_price, sol_price, reason="TP")
+                if result:
+                    events.append({"type": "full_sell", "symbol": symbol,
+                                    "multiplier": mult, "pnl_sol": result["pnl_sol"]})
+
+            elif signal == SellSignal.STALE:
+                result = portfolio.full_sell(symbol, current_price, sol_price, reason="STALE")
+                if result:
+                    events.append({"type": "stale_sell", "symbol": symbol,
+                                    "multiplier": mult, "pnl_sol": result["pnl_sol"]})
+
+            elif signal == SellSignal.NONE:
+                # ── DCA: position down -20%, no DCA done yet ──
+                if mult <= (1 - _params.dca_trigger_pct) and not pos.dca_done:
+                    result = portfolio.dca_buy(symbol, current_price, sol_price)
                     if result:
+                        logger.info(f"DCA {symbol}: added {result['sol_added']:.3f} SOL | new avg: ${result['avg_entry']:.8f}")
                         events.append({
-                            "type":       "early_jeet",
-                            "symbol":     symbol,
+                            "type":      "dca_buy",
+                            "symbol":    symbol,
+                            "sol_added": result["sol_added"],
+                            "avg_entry": result["avg_entry"],
+                            "current_price": current_price,
                             "multiplier": mult,
-                            "pct":        int(jeet_pct * 100),
-                            "pnl_sol":    result["sol_received"] - pos.sol_invested * jeet_pct,
                         })
-                break  # jeet only one position per scan
 
-    # ── 2. Scan live trending tokens from DexScreener ──
-    if len(portfolio.positions) < MAX_POSITIONS:
-        logger.info("Scanning DexScreener for trending Solana tokens…")
-        trending = scan_trending_solana_tokens(min_volume=150_000, min_liquidity=80_000, limit=50)
-        logger.info(f"Evaluating {len(trending)} trending tokens for buy signals")
+        # ── 2. Early jeet: if overall portfolio PnL is negative, sell a small winner ──
+        # Current prices come from the same snapshot the position loop used
+        current_prices_map = snapshot.prices_by_symbol(portfolio.positions)
+
+        overall_pnl = portfolio.total_pnl_sol(current_prices_map, sol_price)
+        if overall_pnl < -0.1:  # in the red by at least 0.1 SOL (including unrealized)
+            for symbol, pos in list(portfolio.positions.items()):
+                if pos.early_jeet_done:
+                    continue  # already jeeted this position once
+                current_price = current_prices_map.get(symbol, pos.entry_price_usd)
+                mult = pos.current_multiplier(current_price)
+                gain = mult - 1.0  # e.g. 0.15 = +15%
+
+                if _params.early_jeet_min_gain <= gain <= _params.early_jeet_max_gain:
+                    # Jeet a random portion between 50-100%
+                    jeet_pct = _rng.choice([0.5, 0.75, 1.0])
+                    pos.early_jeet_done = True  # mark before sell to prevent double-trigger
+                    if jeet_pct == 1.0:
+                        result = portfolio.full_sell(symbol, current_price, sol_price, reason="JEET")
+                        if result:
+                            events.append({
+                                "type":       "early_jeet",
+                                "symbol":     symbol,
+                                "multiplier": mult,
+                                "pct":        100,
+                                "pnl_sol":    result["pnl_sol"],
+                            })
+                    else:
+                        result = portfolio.partial_sell(symbol, current_price, sol_price, jeet_pct)
+                        if result:
+                            events.append({
+                                "type":       "early_jeet",
+                                "symbol":     symbol,
+                                "multiplier": mult,
+                                "pct":        int(jeet_pct * 100),
+                                "pnl_sol":    result["sol_received"] - pos.sol_invested * jeet_pct,
+                            })
+                    break  # jeet only one position per scan
+
+        # persist live prices / TP ladder progress (one small journal record)
+        portfolio.mark_positions()
+
+    return events
 
-        for stats in trending:
-            symbol   = stats.get("symbol", "").upper()
-            contract = stats.get("contract", "")
-            if not symbol or not contract:
+
+# ─── Discovery + buys ────────────────────────────────────────────────────────
+
+def discover_and_buy(
+    portfolio: Portfolio,
+    snapshot: MarketSnapshot,
+    universe: Optional[TokenUniverse] = None,
+) -> List[dict]:
+    """
+    3. Refresh the token universe (discovery when due, hot tokens every scan)
+       and apply the buy rules to tokens whose stats changed. The network
+       work happens outside portfolio.lock; only the buys take it. Only
+       tokens whose stats were refreshed in this scan are bought.
+    If a universe is passed, the caller keeps it up to date (backtests);
+    otherwise the module's live universe is refreshed from DexScreener.
+    """
+    events = []
+    sol_price = snapshot.sol_price_usd
+    if len(portfolio.positions) >= MAX_POSITIONS:
+        logger.info("Max positions reached, skipping buy scan")
+        return events
+
+    now = clock.now()
+    if universe is None:
+        universe = _universe
+        refresh_universe(universe, snapshot, now)
+    candidates = universe.candidates()
+
+    # re-run the buy rules only for tokens whose stats actually changed
+    changed    = [e for e in candidates if e.needs_eval()]
+    rejections = evaluate_universe(universe, changed, now)
+
+    with portfolio.lock:
+        for entry in candidates:
+            if len(portfolio.positions) >= MAX_POSITIONS:
+                break
+            ok, _ = entry.last_verdict
+            if not ok:
+                continue
+            if entry.last_refreshed < now:
+                # refresh failed or a cold token skipped this scan: never buy at an old price
+                logger.debug(f"SKIP {entry.symbol}: stats from {now - entry.last_refreshed:.0f}s ago")
                 continue
+            stats  = entry.stats
+            symbol = entry.symbol
 
             buy_ok, reason = should_buy(symbol, stats, portfolio)
             if buy_ok:
                 pos = portfolio.buy(
                     symbol          = symbol,
-                    contract        = contract,
+                    contract        = entry.contract,
                     token_price_usd = stats["price_usd"],
                     sol_price_usd   = sol_price,
                     sol_amount      = POSITION_SIZE_SOL,
+                    entry_mcap      = stats.get("fdv", 0),
                 )
                 if pos:
-                    pos.entry_mcap = stats.get("fdv", 0)
-                    portfolio.save()
                     logger.info(f"BUY signal: {symbol} | {reason}")
                     events.append({
                         "type":       "buy",
                         "symbol":     symbol,
-                        "contract":   contract,
+                        "contract":   entry.contract,
                         "price_usd":  stats["price_usd"],
                         "sol_amount": POSITION_SIZE_SOL,
                         "reason":     reason,
@@ -267,8 +383,28 @@ def scan_and_trade(portfolio: Portfolio, _watchlist_unused: list = None) -> List
                     })
             else:
                 logger.debug(f"SKIP {symbol}: {reason}")
-    else:
-        logger.info("Max positions reached, skipping buy scan")
 
+    logger.info(f"Universe: {len(candidates)} tokens | evaluated {len(changed)}, "
+                f"{len(candidates) - len(changed)} unchanged since last scan | rejected: {rejections}")
     return events
 
+
+# ─── Main scan ───────────────────────────────────────────────────────────────
+
+def scan_and_trade(
+    portfolio: Portfolio,
+    _watchlist_unused: list = None,
+    snapshot: Optional[MarketSnapshot] = None,
+    universe: Optional[TokenUniverse] = None,
+) -> List[dict]:
+    """
+    One full scan: monitor_positions (steps 1–2) then discover_and_buy
+    (step 3) on the same snapshot. The live bot runs the two on separate
+    schedules (main.py); backtests and the replay bench use this.
+    If no snapshot is passed, one is built for the currently open positions.
+    """
+    if snapshot is None:
+        snapshot = build_market_snapshot(p.contract for p in portfolio.positions.values())
+    logger.info(f"SOL: ${snapshot.sol_price_usd:.2f} | {portfolio.summary()}")
+    events = monitor_positions(portfolio, snapshot)
+    return events + discover_and_buy(portfolio, snapshot, universe)
@@ -0,0 +1,76 @@
+"""
+Strategy parameters – every tunable threshold of strategy.py in one
+immutable object: exits (take-profit ladder, partial size, stop loss, STALE),
+DCA and early-jeet triggers, and the buy-rule bounds (liquidity, volume,
+mcap, 1h/6h momentum).
+
+The live bot runs with the defaults (exits come from config.py); backtests
+and parameter sweeps pass modified copies:
+
+    params = dataclasses.replace(StrategyParams(), stop_loss_pct=0.25)
+"""
+
+from dataclasses import asdict, dataclass, fields, replace
+from typing import List, Tuple
+
+from candidate_batch import Rule
+from config import TAKE_PROFIT_TARGETS, PARTIAL_SELL_PCT, STOP_LOSS_PCT
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    # ─── Exits ───────────────────────────────────────────────────────────────
+    take_profit_targets: Tuple[float, ...] = tuple(TAKE_PROFIT_TARGETS)
+    partial_sell_pct:    float = PARTIAL_SELL_PCT
+    stop_loss_pct:       float = STOP_LOSS_PCT
+    stale_hours:         float = 24.0     # open longer than this …
+    stale_max_mult:      float = 1.5      # … and still below this multiplier = STALE
+
+    # DCA trigger: buy more when position is down this much
+    dca_trigger_pct:     float = 0.20     # -20%
+    # Early jeet: sell a winner to recover losses when portfolio is in the red
+    early_jeet_min_gain: float = 0.10     # position must be at least +10% to jeet
+    early_jeet_max_gain: float = 0.35     # don't jeet positions already above +35% (let them run)
+
+    # ─── Buy rules ───────────────────────────────────────────────────────────
+    min_liquidity_usd:   float = 50_000
+    min_volume_24h:      float = 100_000
+    min_fdv:             float = 150_000
+    max_fdv:             float = 80_000_000
+    min_change_1h:       float = 2.0
+    max_change_1h:       float = 300.0
+    min_change_6h:       float = -15.0
+    max_change_6h:       float = 400.0
+
+    def safety_rules(self) -> List[Rule]:
+        """Liquidity / volume / mcap — slow-moving, decides hot vs cold tokens."""
+        return [
+            Rule("low_liquidity", "liquidity_usd", "<", self.min_liquidity_usd, "low liquidity (${:,.0f})"),
+            Rule("low_volume",    "volume_24h",    "<", self.min_volume_24h,    "low volume (${:,.0f})"),
+            # Zbyt mały mcap = rug risk
+            Rule("mcap_too_low",  "fdv", "<", self.min_fdv, "mcap too low (${:,.0f})"),
+            # Zbyt duży mcap = już po pompie
+            Rule("mcap_too_high", "fdv", ">", self.max_fdv, "mcap too high (${:,.0f})"),
+        ]
+
+    def momentum_rules(self) -> List[Rule]:
+        return [
+            # Musi rosnąć w 1h, ale nie być już po ogromnej pompie (>300% = prawdopodobnie za późno)
+            Rule("not_pumping",  "price_change_1h", "<", self.min_change_1h, "not pumping enough ({:+.1f}% 1h)"),
+            Rule("pump_too_big", "price_change_1h", ">", self.max_change_1h, "pump too big, likely top ({:+.1f}% 1h)"),
+            # 6h nie może być ekstremalnie wysoka (>400% = już po pompie)
+            Rule("6h_mooned",    "price_change_6h", ">", self.max_change_6h, "6h already mooned ({:+.1f}%)"),
+            # 6h musi być pozytywna (trend w górę)
+            Rule("6h_negative",  "price_change_6h", "<", self.min_change_6h, "6h trend negative ({:+.1f}%)"),
+        ]
+
+    def with_overrides(self, **overrides) -> "StrategyParams":
+        """Copy with some fields replaced; lists become tuples, unknown names raise."""
+        known = {f.name for f in fields(self)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise ValueError(f"Unknown strategy parameter(s): {', '.join(sorted(unknown))}")
+        return replace(self, **{k: tuple(v) if isinstance(v, list) else v for k, v in overrides.items()})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,190 @@
+"""
+Parameter sweep – backtests many StrategyParams variants over the same
+historical dataset on all CPU cores and prints them ranked by a metric.
+
+The dataset is converted once into a memory-mapped FrameStore (backtest.py).
+Every worker process maps that same file, so the OS shares its pages between
+workers and the frames are never pickled. Only the parameter overrides go
+to a worker, and only the report dicts come back.
+
+Search space: repeat --param NAME=SPEC, where SPEC is
+  v1,v2,v3      choices (tuples such as take-profit ladders as 2/3/5/10)
+  lo:hi         uniform range (random search only)
+
+    python sweep.py frames.jsonl.gz --param stop_loss_pct=0.2,0.3,0.4 \\
+                                    --param take_profit_targets=2/3/5/10,1.5/2.5/4
+    python sweep.py frames.jsonl.gz --random 64 --param stop_loss_pct=0.15:0.45 \\
+                                    --param min_change_1h=1:10 --workers 8
+"""
+
+import itertools
+import logging
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from backtest import Backtest, FrameStore, frames_from_market_log, load_frames
+from config import STARTING_BALANCE_SOL
+from strategy_params import StrategyParams
+
+logger = logging.getLogger(__name__)
+
+# metrics where lower is better; everything else ranks descending
+ASCENDING_METRICS = {"max_drawdown_sol", "max_drawdown_pct"}
+
+Space = Dict[str, Union[List, Tuple[float, float]]]
+
+
+# ─── Search space ────────────────────────────────────────────────────────────
+
+def _value(text: str):
+    if "/" in text:
+        return tuple(float(v) for v in text.split("/"))
+    return float(text)
+
+
+def parse_space(specs: Sequence[str]) -> Space:
+    """["stop_loss_pct=0.2,0.3", "min_change_1h=1:10"] → {name: choices | (lo, hi)}."""
+    space: Space = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip()
+        if not values:
+            raise ValueError(f"Bad --param {spec!r}, expected NAME=v1,v2 or NAME=lo:hi")
+        if ":" in values:
+            lo, hi = values.split(":", 1)
+            space[name] = (float(lo), float(hi))
+        else:
+            space[name] = [_value(v) for v in values.split(",") if v.strip()]
+    StrategyParams().with_overrides(**{k: v[0] for k, v in space.items()})   # validate names
+    return space
+
+
+def grid(space: Space) -> List[dict]:
+    """Every combination of the choices."""
+    ranges = [k for k, v in space.items() if isinstance(v, tuple)]
+    if ranges:
+        raise ValueError(f"Ranges need --random: {', '.join(ranges)}")
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space: Space, n: int, seed: Optional[int] = 0) -> List[dict]:
+    rng = random.Random(seed)
+    sets = []
+    for _ in range(n):
+        sets.append({
+            name: round(rng.uniform(*spec), 4) if isinstance(spec, tuple) else rng.choice(spec)
+            for name, spec in space.items()
+        })
+    return sets
+
+
+# ─── Workers ─────────────────────────────────────────────────────────────────
+
+_store: Optional[FrameStore] = None
+
+
+def _init_worker(store_path: str, log_level: int):
+    global _store
+    logging.basicConfig(level=log_level)
+    _store = FrameStore(store_path)
+
+
+def _run_one(overrides: dict, seed: Optional[int], balance_sol: float) -> dict:
+    params = StrategyParams().with_overrides(**overrides)
+    report = Backtest(balance_sol=balance_sol, seed=seed, params=params).run(_store.frames())
+    report["params"] = overrides
+    return report
+
+
+def run_sweep(
+    store_path: str,
+    param_sets: Sequence[dict],
+    workers: Optional[int] = None,
+    seed: Optional[int] = 0,
+    balance_sol: float = STARTING_BALANCE_SOL,
+    sort_by: str = "pnl_sol",
+) -> List[dict]:
+    """Backtest every parameter set on a FrameStore; returns reports, best first."""
+    workers   = workers or os.cpu_count() or 1
+    log_level = logging.getLogger().getEffectiveLevel()
+    results   = []
+    t0 = time.perf_counter()
+
+    if workers == 1:
+        _init_worker(store_path, log_level)
+        results = [_run_one(p, seed, balance_sol) for p in param_sets]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(store_path, log_level)) as pool:
+            futures = [pool.submit(_run_one, p, seed, balance_sol) for p in param_sets]
+            for done, future in enumerate(as_completed(futures), 1):
+                results.append(future.result())
+                logger.info(f"Sweep: {done}/{len(futures)} done")
+
+    logger.info(f"Sweep: {len(results)} parameter sets in {time.perf_counter() - t0:.1f}s "
+                f"on {workers} worker(s)")
+    results.sort(key=lambda r: r[sort_by], reverse=sort_by not in ASCENDING_METRICS)
+    return results
+
+
+def format_table(results: Sequence[dict], top: int = 20) -> str:
+    names = list(results[0]["params"]) if results else []
+
+    def show(v):
+        if isinstance(v, tuple):
+            return "/".join(f"{x:g}" for x in v)
+        return f"{v:g}" if isinstance(v, float) else str(v)
+
+    header = ["#"] + names + ["pnl_sol", "win_rate", "trades", "max_dd_%"]
+    rows = [[str(i)] + [show(r["params"][n]) for n in names] +
+            [f"{r['pnl_sol']:+.4f}", f"{r['win_rate']:.1f}", str(r["closed_trades"]),
+             f"{r['max_drawdown_pct']:.2f}"]
+            for i, r in enumerate(results[:top], 1)]
+    widths = [max(len(row[c]) for row in [header] + rows) for c in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(w) for cell, w in zip(row, widths)) for row in [header] + rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multi-core parameter sweep over backtests")
+    parser.add_argument("path", help="frames JSONL(.gz), a capture with --market-log, or a .frames store")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=SPEC")
+    parser.add_argument("--random", type=int, default=0, metavar="N", help="random search with N samples")
+    parser.add_argument("--market-log", action="store_true")
+    parser.add_argument("--interval", type=float, default=60)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--balance", type=float, default=STARTING_BALANCE_SOL)
+    parser.add_argument("--sort", default="pnl_sol")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    space = parse_space(args.param)
+    param_sets = random_search(space, args.random, args.seed) if args.random else grid(space)
+
+    if args.path.endswith(".frames"):
+        store_path, tmp_dir = args.path, None
+    else:
+        tmp_dir    = tempfile.mkdtemp(prefix="sweep-")
+        store_path = os.path.join(tmp_dir, "dataset.frames")
+        frames = (frames_from_market_log(args.path, args.interval) if args.market_log
+                  else load_frames(args.path))
+        n = FrameStore.write(frames, store_path)
+        logger.info(f"Dataset: {n} frames → {store_path}")
+    try:
+        results = run_sweep(store_path, param_sets, args.workers, args.seed, args.balance, args.sort)
+        print(format_table(results, args.top))
+    finally:
+        if tmp_dir:
+            for name in os.listdir(tmp_dir):
+                os.unlink(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
@@ -0,0 +1,269 @@
+"""
+Telegram broadcast engine – delivers one post to every subscriber without
+blocking the trading loop.
+
+broadcast() only queues the message; a fixed pool of TELEGRAM_SEND_WORKERS
+threads delivers it:
+
+  • global limit – every sendMessage goes through the api.telegram.org token
+                   bucket (RATE_LIMITS, ~30 msg/s for a bot) at LOW priority,
+                   so replies from bot_listener go first
+  • per chat     – each chat has its own FIFO, so posts arrive in order, and
+                   is paced to TELEGRAM_CHAT_INTERVAL (private chats) or
+                   TELEGRAM_GROUP_INTERVAL (groups / channels)
+  • 429          – only that chat is retried after Telegram's `retry_after`
+                   (up to TELEGRAM_SEND_RETRIES times). Telegram's 429s are
+                   per chat, so they are not fed back to the host limiter:
+                   other chats, bot replies and getUpdates carry on
+  • stats        – per broadcast: sent / failed / throttled and delivery
+                   latency percentiles, logged when the last chat is done
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import (
+    TELEGRAM_SEND_WORKERS,
+    TELEGRAM_CHAT_INTERVAL,
+    TELEGRAM_GROUP_INTERVAL,
+    TELEGRAM_SEND_RETRIES,
+)
+from rate_limiter import RateLimitedError, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_HISTORY = 50   # finished broadcasts kept for stats()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+class Broadcast:
+    """Delivery progress of one post to all its recipients."""
+
+    def __init__(self, broadcast_id: int, text: str, recipients: int):
+        self.id          = broadcast_id
+        self.text        = text
+        self.recipients  = recipients
+        self.sent        = 0
+        self.failed      = 0
+        self.throttled   = 0       # 429s seen (each one retried or counted as failed)
+        self.created_at  = time.time()
+        self.finished_at: Optional[float] = None
+        self._t0         = time.monotonic()
+        self._latencies: List[float] = []
+        self._done       = threading.Event()
+        if not recipients:
+            self._finish()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _record(self, ok: bool):
+        if ok:
+            self.sent += 1
+            self._latencies.append(time.monotonic() - self._t0)
+        else:
+            self.failed += 1
+        if self.sent + self.failed >= self.recipients:
+            self._finish()
+
+    def _finish(self):
+        self._latencies.sort()
+        self.finished_at = time.time()
+        self._done.set()
+
+    def to_dict(self) -> dict:
+        lat = self._latencies if self.done else sorted(self._latencies)
+        return {
+            "id":         self.id,
+            "recipients": self.recipients,
+            "sent":       self.sent,
+            "failed":     self.failed,
+            "throttled":  self.throttled,
+            "pending":    self.recipients - self.sent - self.failed,
+            "latency_p50": round(_percentile(lat, 50), 3),
+            "latency_p90": round(_percentile(lat, 90), 3),
+            "latency_p99": round(_percentile(lat, 99), 3),
+            "seconds":    round((self.finished_at or time.time()) - self.created_at, 2),
+        }
+
+
+class _Delivery:
+    __slots__ = ("broadcast", "attempts")
+
+    def __init__(self, broadcast: Broadcast):
+        self.broadcast = broadcast
+        self.attempts  = 0
+
+
+class TelegramBroadcaster:
+    """
+    `send(chat_id, text)` performs one sendMessage and returns the response
+    (see TelegramPoster); the broadcaster decides when and how often. It
+    must take a global token without reporting 429s to the host limiter.
+    """
+
+    def __init__(self, send: Callable, workers: int = TELEGRAM_SEND_WORKERS):
+        self._send      = send
+        self._cond      = threading.Condition()
+        self._chats: Dict[str, deque] = {}   # chat → pending deliveries (head may be in flight)
+        self._ready     = []                  # heap of (due, seq, chat): chats with work, none in flight
+        self._seq       = itertools.count()
+        self._ids       = itertools.count(1)
+        self._last_sent: Dict[str, float] = {}
+        self._active: List[Broadcast] = []
+        self.recent     = deque(maxlen=BROADCAST_HISTORY)
+        for i in range(workers):
+            threading.Thread(target=self._work, daemon=True, name=f"tg-send-{i}").start()
+
+    # ─── Queueing ────────────────────────────────────────────────────────────
+    @staticmethod
+    def _interval(chat_id) -> float:
+        # group and channel ids are negative (or @username); private chats positive
+        return TELEGRAM_GROUP_INTERVAL if str(chat_id).startswith(("-", "@")) else TELEGRAM_CHAT_INTERVAL
+
+    def broadcast(self, text: str, chat_ids: Iterable) -> Broadcast:
+        """Queue `text` for every chat and return at once."""
+        chat_ids = list(dict.fromkeys(chat_ids))
+        now = time.monotonic()
+        with self._cond:
+            b = Broadcast(next(self._ids), text, len(chat_ids))
+            for chat_id in chat_ids:
+                pending = self._chats.get(chat_id)
+                if pending is None:
+                    pending = self._chats[chat_id] = deque()
+                    due = self._last_sent.get(chat_id, 0.0) + self._interval(chat_id)
+                    heapq.heappush(self._ready, (max(now, due), next(self._seq), chat_id))
+                pending.append(_Delivery(b))
+            if b.done:
+                self.recent.append(b)
+            else:
+                self._active.append(b)
+            self._cond.notify_all()
+        return b
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message is delivered or failed."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while self._chats:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # ─── Delivery ────────────────────────────────────────────────────────────
+    def _next(self):
+        with self._cond:
+            while True:
+                wait = None
+                if self._ready:
+                    due, _, chat_id = self._ready[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self._ready)
+                        return chat_id, self._chats[chat_id][0]
+                self._cond.wait(wait)
+
+    def _work(self):
+        while True:
+            chat_id, delivery = self._next()
+            retry_after = self._deliver(chat_id, delivery)
+            with self._cond:
+                now     = time.monotonic()
+                pending = self._chats[chat_id]
+                if retry_after is not None:
+                    due = now + retry_after
+                else:
+                    pending.popleft()
+                    self._last_sent[chat_id] = now
+                    due = now + self._interval(chat_id)
+                if pending:
+                    heapq.heappush(self._ready, (due, next(self._seq), chat_id))
+                else:
+                    del self._chats[chat_id]
+                self._cond.notify_all()
+
+    def _deliver(self, chat_id, delivery: _Delivery) -> Optional[float]:
+        """Send the chat's head message. Returns seconds to wait before retrying, or None when done."""
+        b = delivery.broadcast
+        try:
+            r = self._send(chat_id, b.text)
+        except RateLimitedError:
+            return 1.0                      # no global budget yet – not an attempt
+        except Exception as e:
+            logger.error(f"Telegram send failed for {chat_id}: {e}")
+            self._settle(b, ok=False)
+            return None
+
+        if r.status_code == 429:
+            delivery.attempts += 1
+            with self._cond:
+                b.throttled += 1
+            retry_after = self._retry_after(r)
+            if delivery.attempts <= TELEGRAM_SEND_RETRIES:
+                logger.debug(f"Telegram 429 for {chat_id}, retry in {retry_after:.0f}s")
+                return retry_after
+            logger.error(f"Telegram send failed for {chat_id}: still throttled after "
+                         f"{delivery.attempts} attempts")
+            self._settle(b, ok=False)
+            return None
+
+        if not r.ok:
+            try:
+                reason = r.json().get("description", r.status_code)
+            except ValueError:
+                reason = r.status_code
+            logger.error(f"Telegram send failed for {chat_id}: {reason}")
+            self._settle(b, ok=False)
+            return None
+
+        logger.debug(f"Telegram message sent to {chat_id}")
+        self._settle(b, ok=True)
+        return None
+
+    @staticmethod
+    def _retry_after(r) -> float:
+        try:
+            retry_after = (r.json().get("parameters") or {}).get("retry_after")
+        except ValueError:
+            retry_after = None
+        if retry_after is None:
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+        return float(retry_after) if retry_after is not None else 5.0
+
+    def _settle(self, b: Broadcast, ok: bool):
+        with self._cond:
+            b._record(ok)
+            if not b.done:
+                return
+            self._active.remove(b)
+            self.recent.append(b)
+        s = b.to_dict()
+        logger.info(f"Telegram broadcast #{s['id']}: {s['sent']}/{s['recipients']} sent, "
+                    f"{s['failed']} failed, {s['throttled']}×429 | latency p50 {s['latency_p50']}s "
+                    f"p90 {s['latency_p90']}s p99 {s['latency_p99']}s | {s['seconds']}s")
+
+    # ─── Stats ───────────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queued_chats": len(self._chats),
+                "active":       [b.to_dict() for b in self._active],
+                "recent":       [b.to_dict() for b in reversed(self.recent)],
+            }
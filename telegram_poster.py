@@ -1,17 +1,19 @@
 """
 Telegram integration – posts messages to all authorized users.
+Delivery runs in the background (telegram_broadcast.py), so post() returns
+as soon as the message is queued.
 """
 
 import logging
 from typing import Optional
 
+import http_client
+from rate_limiter import PRIORITY_LOW
+from telegram_broadcast import TelegramBroadcaster
+
 logger = logging.getLogger(__name__)
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+TELEGRAM_MAX_CHARS = 4096   # sendMessage text limit
 
 
 class TelegramPoster:
@@ -19,6 +21,7 @@ class TelegramPoster:
         self.bot_token:  Optional[str] = None
         self.channel_id: str           = ""
         self.enabled:    bool          = False
+        self.broadcaster: Optional[TelegramBroadcaster] = None
         self._setup()
 
     def _setup(self):
@@ -28,10 +31,6 @@ class TelegramPoster:
             logger.info("Telegram posting is DISABLED (set TELEGRAM_ENABLED=true in .env to enable)")
             return
 
-        if not REQUESTS_AVAILABLE:
-            logger.error("requests package is required. Run: pip install requests")
-            return
-
         if not TELEGRAM_BOT_TOKEN:
             logger.error("TELEGRAM_BOT_TOKEN must be set in .env")
             return
@@ -39,13 +38,23 @@ class TelegramPoster:
         self.bot_token   = TELEGRAM_BOT_TOKEN
         self.channel_id  = TELEGRAM_CHANNEL_ID.strip() if TELEGRAM_CHANNEL_ID else ""
         self.enabled     = True
+        self.broadcaster = TelegramBroadcaster(self._send_message)
         if self.channel_id:
             logger.info(f"Telegram client ready ✅  (kanał: {self.channel_id})")
         else:
             logger.info("Telegram client ready ✅")
 
+    def _send_message(self, chat_id, text: str):
+        return http_client.post(
+            f"https://api.telegram.org/bot{self.bot_token}/sendMessage",
+            json={"chat_id": chat_id, "text": text},
+            timeout=10,
+            priority=PRIORITY_LOW,   # bot replies to users go first
+            on_response=False,       # a 429 here is per chat; the broadcaster backs that chat off
+        )
+
     def post(self, text: str) -> bool:
-        """Send a message to ALL authorized users AND the channel (if configured)."""
+        """Queue a message for ALL authorized users AND the channel (if configured)."""
         if not self.enabled:
             logger.info(f"[TELEGRAM DISABLED] Would send:\n{text}\n")
             return False
@@ -61,19 +70,13 @@ class TelegramPoster:
             logger.info("No authorized Telegram users yet – nobody to send to")
             return False
 
-        success = False
-        for chat_id in recipients:
-            try:
-                r = requests.post(
-                    f"https://api.telegram.org/bot{self.bot_token}/sendMessage",
-                    json={"chat_id": chat_id, "text": text},
-                    timeout=10,
-                )
-                r.raise_for_status()
-                logger.info(f"Telegram message sent to {chat_id}")
-                success = True
-            except Exception as e:
-                logger.error(f"Telegram send failed for {chat_id}: {e}")
-
-        return success
+        b = self.broadcaster.broadcast(text, recipients)
+        logger.info(f"Telegram broadcast #{b.id} queued for {len(recipients)} chats")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued messages to go out (on shutdown)."""
+        return self.broadcaster.flush(timeout) if self.broadcaster else True
 
+    def stats(self) -> dict:
+        return self.broadcaster.stats() if self.broadcaster else {}
@@ -0,0 +1,72 @@
+"""The NumPy path and the plain-list fallback of candidate_batch must agree."""
+
+import pytest
+
+import candidate_batch
+from candidate_batch import CandidateBatch, evaluate_rules, first_rejection, scan_rules
+
+MIN_VOLUME    = 10_000
+MIN_LIQUIDITY = 5_000
+
+PAIRS = [
+    # passes
+    {"baseToken": {"symbol": "good", "address": "A1"}, "priceUsd": "0.0012",
+     "volume": {"h24": 50_000}, "liquidity": {"usd": 20_000}, "fdv": 1e6,
+     "priceChange": {"h1": 5, "h6": -3, "h24": 40}},
+    # exactly at the minimums – passes (rules reject below, not at)
+    {"baseToken": {"symbol": "edge", "address": "A2"}, "priceUsd": "1",
+     "volume": {"h24": MIN_VOLUME}, "liquidity": {"usd": MIN_LIQUIDITY}},
+    # no price (missing, None and unparsable all become 0)
+    {"baseToken": {"symbol": "noprice", "address": "A3"},
+     "volume": {"h24": 50_000}, "liquidity": {"usd": 20_000}},
+    {"baseToken": {"symbol": "null", "address": "A4"}, "priceUsd": None,
+     "volume": None, "liquidity": None, "priceChange": None},
+    {"baseToken": {"symbol": "junk", "address": "A5"}, "priceUsd": "n/a",
+     "volume": {"h24": "lots"}, "liquidity": {"usd": 20_000}},
+    # low volume (and low liquidity: the first failing rule wins)
+    {"baseToken": {"symbol": "thin", "address": "A6"}, "priceUsd": "0.5",
+     "volume": {"h24": 9_999.99}, "liquidity": {"usd": 100}},
+    # low liquidity only
+    {"baseToken": {"symbol": "shallow", "address": "A7"}, "priceUsd": "2.5",
+     "volume": {"h24": 1e7}, "liquidity": {"usd": 4_999}},
+    # no baseToken at all
+    {"priceUsd": "3", "volume": {"h24": 1e6}, "liquidity": {"usd": 1e6}},
+]
+
+
+def _evaluate(numpy: bool, monkeypatch):
+    monkeypatch.setattr(candidate_batch, "NUMPY_AVAILABLE", numpy)
+    rules  = scan_rules(MIN_VOLUME, MIN_LIQUIDITY)
+    batch  = CandidateBatch.from_pairs(PAIRS)
+    result = evaluate_rules(batch, rules)
+    return {
+        "rows":       [batch.row(i) for i in range(len(batch))],
+        "passed":     result.passed_indices(),
+        "reasons":    [result.reason(batch, i) for i in range(len(batch))],
+        "rejections": result.rejections(),
+    }
+
+
+def test_numpy_path_matches_list_fallback(monkeypatch):
+    pytest.importorskip("numpy")
+    vectorized = _evaluate(True, monkeypatch)
+    fallback   = _evaluate(False, monkeypatch)
+    assert vectorized == fallback
+
+
+def test_fallback_results(monkeypatch):
+    out = _evaluate(False, monkeypatch)
+    assert out["passed"] == [0, 1, 7]
+    assert out["reasons"][2:7] == [
+        "no price", "no price", "no price",
+        "below scan minimums (vol $10,000)",
+        "below scan minimums (liq $4,999)",
+    ]
+    assert out["rejections"] == {"no_price": 3, "below_min_volume": 1, "below_min_liquidity": 1}
+    assert out["rows"][0]["symbol"] == "GOOD" and out["rows"][0]["price_usd"] == 0.0012
+
+
+def test_batch_agrees_with_scalar_path(monkeypatch):
+    out   = _evaluate(False, monkeypatch)
+    rules = scan_rules(MIN_VOLUME, MIN_LIQUIDITY)
+    assert [first_rejection(row, rules) for row in out["rows"]] == out["reasons"]
@@ -0,0 +1,84 @@
+"""Message splitting at Telegram's 4096 and Twitter's 280 UTF-16 unit limits."""
+
+import pytest
+
+from digest import _cut, _fit, headline_digest, split_message, text_length
+
+TELEGRAM = 4096
+TWITTER  = 280
+ROCKET   = "🚀"   # outside the BMP: a surrogate pair, 2 UTF-16 units
+
+
+def test_text_length_counts_utf16_units():
+    assert text_length("abc") == 3
+    assert text_length(ROCKET) == 2
+    assert text_length("é") == 1
+
+
+@pytest.mark.parametrize("limit", [TELEGRAM, TWITTER])
+def test_post_of_exactly_limit_is_one_message(limit):
+    post = "x" * limit
+    assert split_message([post], limit) == [post]
+    assert len(split_message([post + "x"], limit)) == 2
+
+
+@pytest.mark.parametrize("limit", [TELEGRAM, TWITTER])
+def test_posts_joined_to_exactly_limit_share_one_message(limit):
+    first  = "a" * 100
+    second = "b" * (limit - 100 - 2)      # "\n\n" separator
+    assert split_message([first, second], limit) == [f"{first}\n\n{second}"]
+    assert split_message([first, second + "b"], limit) == [first, second + "b"]
+
+
+@pytest.mark.parametrize("limit", [TELEGRAM, TWITTER])
+def test_emoji_at_limit_boundary_is_exact(limit):
+    post = "x" * (limit - 2) + ROCKET
+    assert text_length(post) == limit
+    assert split_message([post], limit) == [post]
+
+
+@pytest.mark.parametrize("limit", [TELEGRAM, TWITTER])
+def test_emoji_straddling_the_cut_moves_to_next_piece(limit):
+    # the pair would occupy units limit and limit + 1: it must not be split
+    line   = "x" * (limit - 1) + ROCKET + "y" * 10
+    pieces = _cut(line, limit)
+    assert pieces == ["x" * (limit - 1), ROCKET + "y" * 10]
+    assert all(text_length(p) <= limit for p in pieces)
+
+
+def test_cut_prefers_spaces():
+    line   = " ".join(["word"] * 100)   # 499 chars
+    pieces = _cut(line, TWITTER)
+    assert all(text_length(p) <= TWITTER for p in pieces)
+    assert " ".join(pieces) == line
+    assert not any(p.startswith(" ") or p.endswith(" ") for p in pieces)
+
+
+def test_fit_splits_between_lines():
+    lines = [f"{i:03d} " + ROCKET * 60 for i in range(5)]   # 124 units per line
+    pieces = _fit("\n".join(lines), TWITTER)
+    assert pieces == ["\n".join(lines[0:2]), "\n".join(lines[2:4]), lines[4]]
+
+
+def test_long_emoji_post_never_exceeds_limit():
+    post     = "\n".join((ROCKET + " pump ") * 40 for _ in range(30))
+    messages = split_message([post, "short one"], TELEGRAM)
+    assert all(text_length(m) <= TELEGRAM for m in messages)
+    assert "".join(messages).count(ROCKET) == 40 * 30
+
+
+def test_headline_digest_fits_tweets():
+    posts  = [f"just ape'd into $T{i} {ROCKET}\nsecond line" for i in range(40)]
+    tweets = headline_digest(posts, TWITTER)
+    assert tweets[0].startswith("📋 40 moves")
+    assert all(text_length(t) <= TWITTER for t in tweets)
+    assert sum(t.count("• ") for t in tweets) == 40
+    assert not any("second line" in t for t in tweets)
+
+
+def test_headline_digest_cuts_overlong_headline_to_one_line():
+    tweets = headline_digest(["x" * 500 + "\nrest", "short"], TWITTER)
+    assert len(tweets[0].split("\n")) == 2
+    assert tweets[0].startswith("📋 2 moves\n• xxx")
+    assert text_length(tweets[0]) <= TWITTER
+    assert tweets[1:] == ["• short"]
@@ -0,0 +1,68 @@
+"""FeedLog cursors across ring-buffer wraparound and log compaction."""
+
+import pytest
+
+from feed_log import FeedLog
+
+
+def _ids(entries):
+    return [e["id"] for e in entries]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "feed.jsonl")
+
+
+def _feed(path, n, memory, max_entries=1000):
+    feed = FeedLog(path, memory=memory, max_entries=max_entries)
+    for i in range(1, n + 1):
+        feed.append(f"post {i}", timestamp=i)
+    return feed
+
+
+def test_ring_buffer_wraparound(path):
+    feed = _feed(path, 5, memory=3)
+    assert _ids(feed.latest()) == [5, 4, 3]
+    assert _ids(feed.since(3)) == [5, 4]
+    assert _ids(feed.since(0)) == [5, 4, 3]          # older than memory: not in a cursor read
+    assert _ids(feed.since(5)) == []
+    assert _ids(feed.since(2, limit=1)) == [5]
+    assert _ids(feed.before(5, limit=2)) == [4, 3]   # from memory
+    assert _ids(feed.before(4, limit=2)) == [3, 2]   # reaches past memory: from the log
+    assert _ids(feed.before(99, limit=2)) == [5, 4]
+    assert _ids(feed.before(1)) == []
+
+
+def test_cursors_across_compaction(path):
+    # compaction at 2 × 4 = 8 lines keeps ids 5..8; then 9 and 10 are appended
+    feed = _feed(path, 10, memory=5, max_entries=4)
+    with open(path) as f:
+        assert len(f.readlines()) == 6
+    assert feed.last_id == 10
+    assert _ids(feed.since(7)) == [10, 9, 8]
+    assert _ids(feed.before(8, limit=2)) == [7, 6]
+    assert _ids(feed.before(7, limit=5)) == [6, 5]   # 1..4 were compacted away
+    assert feed.append("post 11")["id"] == 11
+    feed.close()
+
+
+def test_reader_follows_writer_through_compaction(path):
+    writer = _feed(path, 6, memory=5, max_entries=4)
+    reader = FeedLog(path, memory=5, max_entries=4)
+    assert _ids(reader.latest()) == [6, 5, 4, 3, 2]
+    for i in range(7, 10):                           # 8th line triggers compaction
+        writer.append(f"post {i}", timestamp=i)
+    reader.refresh()
+    assert reader.last_id == 9
+    assert _ids(reader.since(6)) == [9, 8, 7]
+    assert _ids(reader.before(7, limit=5)) == [6, 5]
+    writer.close()
+
+
+def test_restart_continues_ids(path):
+    _feed(path, 3, memory=5).close()
+    feed = FeedLog(path, memory=5)
+    assert feed.append("again")["id"] == 4
+    assert _ids(feed.latest()) == [4, 3, 2, 1]
+    feed.close()
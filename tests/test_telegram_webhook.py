@@ -0,0 +1,126 @@
+"""Webhook mode end to end: Flask route → update queue → dispatcher → offset file."""
+
+import json
+import queue
+import threading
+import time
+
+import pytest
+
+import bot_listener
+import web_server
+
+HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class _Stop(BaseException):
+    pass
+
+
+class _Updates(queue.Queue):
+    """The listener's update queue, with a way to stop the dispatcher thread."""
+    stopped = False
+
+    def get(self, *args, **kwargs):
+        if self.stopped:
+            raise _Stop
+        return super().get(*args, **kwargs)
+
+
+def _run_dispatcher():
+    try:
+        bot_listener._dispatch_updates()
+    except _Stop:
+        pass
+
+
+def _update(update_id, chat_id=100, text="/start"):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text, "from": {"first_name": "t"}}}
+
+
+@pytest.fixture
+def listener(tmp_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(bot_listener, "TELEGRAM_LISTENER_MODE", "webhook")
+    monkeypatch.setattr(bot_listener, "TELEGRAM_OFFSET_FILE", str(tmp_path / "telegram_offset.json"))
+    monkeypatch.setattr(bot_listener, "OFFSET_SAVE_SECONDS", 0.05)
+    monkeypatch.setattr(bot_listener, "_updates", _Updates(maxsize=bot_listener.WEBHOOK_QUEUE_MAX))
+    monkeypatch.setattr(bot_listener, "_waiting_for_key", set())
+    monkeypatch.setattr(bot_listener, "is_authorized", lambda chat_id: False)
+    monkeypatch.setattr(bot_listener, "_send", lambda chat_id, text: sent.append((chat_id, text)))
+    monkeypatch.setattr(bot_listener, "_last_update_id", 0)    # restored afterwards
+    monkeypatch.setattr(bot_listener, "_saved_update_id", 0)
+    bot_listener._load_offset()
+    return sent
+
+
+@pytest.fixture
+def client():
+    return web_server.app.test_client()
+
+
+def _post(client, body, secret=True):
+    headers = {HEADER: bot_listener.webhook_secret()} if secret else {}
+    data    = body if isinstance(body, str) else json.dumps(body)
+    return client.post(bot_listener.WEBHOOK_PATH, data=data, headers=headers, content_type="application/json")
+
+
+def _dispatch():
+    """Run the dispatcher until the queue is drained and the offset saved."""
+    t = threading.Thread(target=_run_dispatcher, daemon=True)
+    t.start()
+    deadline = time.monotonic() + 5
+    while not bot_listener._updates.empty() or bot_listener._saved_update_id != bot_listener._last_update_id:
+        assert time.monotonic() < deadline, "dispatcher did not catch up"
+        time.sleep(0.01)
+    bot_listener._updates.stopped = True
+    t.join(timeout=2)
+    assert not t.is_alive()
+    bot_listener._updates.stopped = False
+
+
+def _offset():
+    with open(bot_listener.TELEGRAM_OFFSET_FILE) as f:
+        return json.load(f)["last_update_id"]
+
+
+def test_404_when_webhook_mode_is_off(listener, client, monkeypatch):
+    monkeypatch.setattr(bot_listener, "TELEGRAM_LISTENER_MODE", "polling")
+    assert _post(client, _update(1)).status_code == 404
+    assert bot_listener._updates.empty()
+
+
+def test_403_without_or_with_wrong_secret(listener, client):
+    assert _post(client, _update(1), secret=False).status_code == 403
+    r = client.post(bot_listener.WEBHOOK_PATH, json=_update(1), headers={HEADER: "nope"})
+    assert r.status_code == 403
+    assert bot_listener._updates.empty()
+
+
+@pytest.mark.parametrize("body", ["{not json", "[1, 2]", json.dumps({"message": {}})])
+def test_400_on_bad_body(listener, client, body):
+    assert _post(client, body).status_code == 400
+    assert bot_listener._updates.empty()
+
+
+def test_503_when_queue_is_full(listener, client, monkeypatch):
+    monkeypatch.setattr(bot_listener, "_updates", _Updates(maxsize=2))
+    assert [_post(client, _update(i)).status_code for i in (1, 2, 3)] == [200, 200, 503]
+
+
+def test_updates_handled_once_and_offset_persisted(listener, client):
+    sent = listener
+    for update_id, chat_id in ((1, 100), (2, 200), (2, 200), (3, 300)):   # Telegram retried 2
+        assert _post(client, _update(update_id, chat_id)).status_code == 200
+    _dispatch()
+    assert sent == [(100, "🔐 enter key:"), (200, "🔐 enter key:"), (300, "🔐 enter key:")]
+    assert _offset() == 3
+
+    # a restart picks up the offset: already handled ids are ignored, new ones are not
+    bot_listener._load_offset()
+    assert bot_listener._last_update_id == 3
+    assert _post(client, _update(3, 300)).status_code == 200
+    assert _post(client, _update(4, 400)).status_code == 200
+    _dispatch()
+    assert sent[3:] == [(400, "🔐 enter key:")]
+    assert _offset() == 4
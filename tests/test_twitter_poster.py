@@ -0,0 +1,27 @@
+"""The catch-up tweet built from posts held back by the rate limit."""
+
+from digest import text_length
+from twitter_poster import TWEET_MAX_CHARS, coalesce
+
+
+def test_coalesce_fits_all_headlines():
+    tweet = coalesce(["just ape'd into $COK 🦍\nsmall bag", "took profit on $WIF 🚀\n2.1x"])
+    assert tweet == "📋 2 moves\n• just ape'd into $COK 🦍\n• took profit on $WIF 🚀"
+
+
+def test_coalesce_overflow_ends_with_remaining_count():
+    posts = [f"just ape'd into $TOK{i} 🚀🚀\nsmall bag" for i in range(60)]
+    tweet = coalesce(posts)
+    lines = tweet.split("\n")
+    shown = sum(1 for line in lines if line.startswith("• "))
+    assert text_length(tweet) <= TWEET_MAX_CHARS
+    assert lines[0] == "📋 60 moves"
+    assert lines[-1] == f"+{60 - shown} more"
+    assert 0 < shown < 60
+
+
+def test_coalesce_overlong_headline():
+    tweet = coalesce(["x" * 400, "second"])
+    assert text_length(tweet) <= TWEET_MAX_CHARS
+    assert tweet.split("\n")[1].startswith("• xxx")
+    assert tweet.endswith("\n+1 more")
@@ -0,0 +1,43 @@
+"""Admission to /api/stream: the client cap holds under concurrent connects."""
+
+import threading
+
+import web_server
+from web_server import _Broadcaster
+
+
+def test_connect_is_capped_under_concurrency():
+    broadcaster = _Broadcaster()
+    broadcaster.publish([], None, None)
+    barrier = threading.Barrier(32)
+    results = []
+
+    def connect():
+        barrier.wait()
+        results.append(broadcaster.connect(5))
+
+    threads = [threading.Thread(target=connect) for _ in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(r is not None for r in results) == 5
+    assert broadcaster.clients == 5
+    broadcaster.disconnect()
+    assert broadcaster.connect(5) is not None
+
+
+def test_stream_route_rejects_past_cap_and_frees_slot_on_close(monkeypatch):
+    monkeypatch.setattr(web_server, "WEB_STREAM_MAX_CLIENTS", web_server._broadcaster.clients + 1)
+    client = web_server.app.test_client()
+    first  = client.get("/api/stream", buffered=False)
+    assert first.status_code == 200
+    assert client.get("/api/stream").status_code == 503
+    first.close()                                    # never read: the slot must still be freed
+    second = client.get("/api/stream", buffered=False)
+    assert second.status_code == 200
+    assert next(second.response).startswith(b"retry: 3000")
+    second.close()
+    third = client.get("/api/stream", buffered=False)
+    assert third.status_code == 200
+    third.close()
@@ -0,0 +1,159 @@
+"""
+Persistent in-memory token universe.
+
+Instead of rediscovering everything every scan, tokens found by the trending
+scanner are kept here keyed by contract (pair address, symbol, last stats,
+last seen, rejection history) and refreshed on a schedule:
+
+  • hot tokens  (close to the buy rules, or just discovered) – every scan
+  • cold tokens (far from the buy rules)                    – every UNIVERSE_COLD_REFRESH_SECONDS
+  • discovery   (the expensive search fan-out)              – every UNIVERSE_DISCOVERY_INTERVAL
+
+Each entry remembers the stats fingerprint its last buy-rule verdict was
+computed for, so tokens whose stats haven't changed are not re-evaluated.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    UNIVERSE_MAX_TOKENS,
+    UNIVERSE_DISCOVERY_INTERVAL,
+    UNIVERSE_COLD_REFRESH_SECONDS,
+    UNIVERSE_TOKEN_TTL_SECONDS,
+    UNIVERSE_REJECTION_HISTORY,
+)
+
+logger = logging.getLogger(__name__)
+
+_FINGERPRINT_FIELDS = (
+    "price_usd", "volume_24h", "liquidity_usd", "fdv",
+    "price_change_1h", "price_change_6h", "price_change_24h",
+)
+
+
+def stats_fingerprint(stats: dict) -> tuple:
+    return tuple(stats.get(k) for k in _FINGERPRINT_FIELDS)
+
+
+class TokenEntry:
+    def __init__(self, contract: str, symbol: str, now: float):
+        self.contract       = contract
+        self.symbol         = symbol
+        self.pair_address   = ""
+        self.stats: Optional[dict] = None
+        self.first_seen     = now     # first discovered
+        self.last_seen      = now     # last returned by discovery
+        self.last_refreshed = 0.0     # last time stats were updated
+        self.hot            = True    # new tokens start hot until evaluated
+        self.eval_fingerprint: Optional[tuple] = None
+        self.last_verdict: Tuple[bool, str] = (False, "")
+        self.rejections: Deque[Tuple[float, str]] = deque(maxlen=UNIVERSE_REJECTION_HISTORY)
+
+    def update_stats(self, stats: dict, now: float):
+        self.stats          = stats
+        self.last_refreshed = now
+        if stats.get("pair_address"):
+            self.pair_address = stats["pair_address"]
+
+    def needs_eval(self) -> bool:
+        return self.stats is not None and stats_fingerprint(self.stats) != self.eval_fingerprint
+
+    def to_dict(self) -> dict:
+        return {
+            "contract":       self.contract,
+            "symbol":         self.symbol,
+            "pair_address":   self.pair_address,
+            "hot":            self.hot,
+            "first_seen":     self.first_seen,
+            "last_seen":      self.last_seen,
+            "last_refreshed": self.last_refreshed,
+            "last_verdict":   list(self.last_verdict),
+            "rejections":     list(self.rejections),
+        }
+
+
+class TokenUniverse:
+    def __init__(self):
+        self.tokens: Dict[str, TokenEntry] = {}
+        self.last_discovery = 0.0
+        self._lock = threading.Lock()
+
+    # ─── Discovery / refresh ─────────────────────────────────────────────────
+    def discovery_due(self, now: float) -> bool:
+        return now - self.last_discovery >= UNIVERSE_DISCOVERY_INTERVAL
+
+    def ingest(self, discovered: Iterable[dict], now: float) -> int:
+        """Add / update tokens returned by the trending scanner. Returns # new."""
+        new = 0
+        with self._lock:
+            for stats in discovered:
+                contract = stats.get("contract", "")
+                symbol   = stats.get("symbol", "").upper()
+                if not contract or not symbol:
+                    continue
+                entry = self.tokens.get(contract)
+                if entry is None:
+                    entry = TokenEntry(contract, symbol, now)
+                    self.tokens[contract] = entry
+                    new += 1
+                entry.last_seen = now
+                entry.update_stats(stats, now)
+            self.last_discovery = now
+        return new
+
+    def update(self, stats_by_contract: Dict[str, dict], now: float):
+        """Apply refreshed stats (batched quote lookups, scan snapshot)."""
+        with self._lock:
+            for contract, stats in stats_by_contract.items():
+                entry = self.tokens.get(contract)
+                if entry:
+                    entry.update_stats(stats, now)
+
+    def due_for_refresh(self, now: float, exclude: Iterable[str] = ()) -> List[str]:
+        """Hot tokens every call, cold ones once their refresh interval passed."""
+        skip = set(exclude)
+        with self._lock:
+            return [
+                c for c, e in self.tokens.items()
+                if c not in skip
+                and e.last_refreshed < now      # not already updated this scan
+                and (e.hot or now - e.last_refreshed >= UNIVERSE_COLD_REFRESH_SECONDS)
+            ]
+
+    def prune(self, now: float, keep: Iterable[str] = ()) -> int:
+        """Drop tokens discovery hasn't returned for a while, then the oldest over the cap."""
+        keep = set(keep)
+        with self._lock:
+            before = len(self.tokens)
+            for c in [c for c, e in self.tokens.items()
+                      if c not in keep and now - e.last_seen > UNIVERSE_TOKEN_TTL_SECONDS]:
+                del self.tokens[c]
+            if len(self.tokens) > UNIVERSE_MAX_TOKENS:
+                by_age = sorted((e.last_seen, c) for c, e in self.tokens.items() if c not in keep)
+                for _, c in by_age[:len(self.tokens) - UNIVERSE_MAX_TOKENS]:
+                    del self.tokens[c]
+            return before - len(self.tokens)
+
+    # ─── Evaluation ──────────────────────────────────────────────────────────
+    def candidates(self) -> List[TokenEntry]:
+        """Entries with stats, most recently discovered first."""
+        with self._lock:
+            entries = [e for e in self.tokens.values() if e.stats is not None]
+        entries.sort(key=lambda e: e.last_seen, reverse=True)
+        return entries
+
+    def record_eval(self, entry: TokenEntry, ok: bool, reason: str, hot: bool, now: float):
+        with self._lock:
+            entry.eval_fingerprint = stats_fingerprint(entry.stats)
+            entry.last_verdict     = (ok, reason)
+            entry.hot              = hot
+            if not ok:
+                entry.rejections.append((now, reason))
+
+    def summary(self) -> dict:
+        with self._lock:
+            hot = sum(1 for e in self.tokens.values() if e.hot)
+            return {"tokens": len(self.tokens), "hot": hot, "cold": len(self.tokens) - hot}
@@ -0,0 +1,155 @@
+"""
+Write-ahead trade journal + snapshots for the portfolio.
+
+Every portfolio change is appended to JOURNAL_FILE as one small JSON line
+(constant cost per trade, however long the trade history is):
+
+  open    – new position             {position, balance_sol}
+  update  – DCA / partial sell       {position, balance_sol}
+  close   – full sell                {symbol, trade, balance_sol}
+  mark    – live fields of open positions (current price, ATH multiplier,
+            TP ladder index, jeet flag) {positions: {symbol: {…}}}
+
+Lines are flushed immediately and fsync'ed at most every
+JOURNAL_FSYNC_SECONDS. A snapshot (POSITIONS_FILE, same format as before
+plus `journal_seq` and `trade_stats`) is written atomically (temp file +
+fsync + rename) on a schedule or after JOURNAL_COMPACT_RECORDS records, and
+the journal is then truncated. Recovery = load the snapshot, replay journal records with a
+higher seq; a torn last line from a crash is ignored.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Iterator
+
+from config import STARTING_BALANCE_SOL, JOURNAL_FSYNC_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def empty_state() -> dict:
+    return {"balance_sol": STARTING_BALANCE_SOL, "positions": {}, "closed_trades": [], "journal_seq": 0}
+
+
+def write_snapshot_atomic(path: str, data: dict):
+    """Write compact JSON to a temp file in the same directory, fsync, then rename over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".positions-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    try:   # make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def apply_record(state: dict, rec: dict):
+    op = rec.get("op")
+    if op in ("open", "update"):
+        pos = rec["position"]
+        state["positions"][pos["symbol"]] = pos
+    elif op == "close":
+        state["positions"].pop(rec["symbol"], None)
+        state["closed_trades"].append(rec["trade"])
+    elif op == "mark":
+        for sym, fields in rec["positions"].items():
+            if sym in state["positions"]:
+                state["positions"][sym].update(fields)
+    if "balance_sol" in rec:
+        state["balance_sol"] = rec["balance_sol"]
+    state["journal_seq"] = rec["seq"]
+
+
+def read_records(path: str, after_seq: int = 0) -> Iterator[dict]:
+    """Journal records with seq > after_seq, in order; stops at a torn tail."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                logger.warning(f"Journal {path}: ignoring torn record at the tail")
+                return
+            if rec.get("seq", 0) > after_seq:
+                yield rec
+
+
+def load_state(snapshot_path: str, journal_path: str) -> dict:
+    """Snapshot + journal tail → positions.json-style dict (balance, positions, closed trades)."""
+    state = empty_state()
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "r") as f:
+            state.update(json.load(f))
+        state.setdefault("journal_seq", 0)
+    replayed = 0
+    for rec in read_records(journal_path, state["journal_seq"]):
+        apply_record(state, rec)
+        replayed += 1
+    state["replayed"] = replayed
+    return state
+
+
+class TradeJournal:
+    """Append-only JSONL journal. Callers serialize access (Portfolio.lock)."""
+
+    def __init__(self, path: str, fsync_interval: float = JOURNAL_FSYNC_SECONDS):
+        self.path           = path
+        self.fsync_interval = fsync_interval
+        self.seq            = 0       # last seq written (or recovered)
+        self.records        = 0       # records since the last snapshot
+        self._file          = None    # opened on first append (readers never create it)
+        self._dirty         = False
+        self._last_sync     = 0.0
+
+    def append(self, op: str, **fields) -> int:
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self.seq += 1
+        line = json.dumps({"seq": self.seq, "ts": time.time(), "op": op, **fields}, separators=(",", ":"))
+        self._file.write(line + "\n")
+        self._file.flush()            # survives a process crash right away
+        self.records += 1
+        self._dirty   = True
+        if time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()               # … and an OS crash after at most fsync_interval
+        return self.seq
+
+    def sync(self):
+        if self._file is not None and self._dirty:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def truncate(self):
+        """Drop every record (they are all in the snapshot just written)."""
+        if self._file is None:
+            if os.path.exists(self.path):
+                open(self.path, "w").close()
+        else:
+            self._file.seek(0)
+            self._file.truncate()
+            self._dirty = True
+            self.sync()
+        self.records = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
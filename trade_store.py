@@ -0,0 +1,327 @@
+"""
+Trade history storage.
+
+Closed trades are queried through one small API (count, pnl_sum, wins,
+best, recent, since) so the portfolio, dashboard and daily summary never
+scan the whole history themselves; the headline numbers come from
+TradeStats, running aggregates updated on every close:
+
+  TradeList    – in-memory list (STORAGE_BACKEND=json, the default, and
+                 backtests); persisted by trade_journal.py
+  SQLiteStore  – STORAGE_BACKEND=sqlite: closed trades, open positions and
+                 the balance in SQLITE_FILE (stdlib sqlite3, WAL mode), with
+                 indexes on timestamp, symbol, reason and pnl. Portfolio
+                 changes use the same record ops as the journal (open /
+                 update / close / mark), each in one transaction.
+
+On first start with the SQLite backend an existing positions.json (+ journal)
+is imported.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRADE_COLUMNS = ("symbol", "entry_price", "exit_price", "multiplier",
+                 "pnl_sol", "sol_received", "reason", "timestamp")
+
+
+class TradeList(list):
+    """Closed trades in memory, oldest first."""
+
+    def add_trade(self, record: dict):
+        self.append(record)
+
+    def count(self) -> int:
+        return len(self)
+
+    def pnl_sum(self) -> float:
+        return sum(t.get("pnl_sol", 0) for t in self)
+
+    def wins(self) -> int:
+        return sum(1 for t in self if t.get("pnl_sol", 0) > 0)
+
+    def best(self) -> Optional[dict]:
+        return max(self, key=lambda t: t.get("pnl_sol", 0)) if self else None
+
+    def recent(self, n: int) -> List[dict]:
+        """Last n trades, newest first."""
+        return list(reversed(self[-n:])) if n > 0 else []
+
+    def since(self, ts: float) -> List[dict]:
+        return [t for t in self if t.get("timestamp", 0) >= ts]
+
+    def all(self) -> List[dict]:
+        return list(self)
+
+
+class TradeStats:
+    """
+    Running aggregates over closed trades, O(1) per close and per read:
+    count, wins, realized PnL, best trade (by PnL), per-reason breakdown and
+    a rolling 24h window. Saved with the portfolio state; on load only the
+    trades closed after the save are added (a full rebuild if it doesn't match).
+    """
+
+    WINDOW_SECONDS = 24 * 3600
+
+    def __init__(self):
+        self.count     = 0
+        self.wins      = 0
+        self.pnl_sol   = 0.0
+        self.best: Optional[dict] = None
+        self.by_reason: Dict[str, dict] = {}    # reason → {count, wins, pnl_sol}
+        self._window   = deque()                # (timestamp, pnl_sol) inside the 24h window
+        self._window_pnl  = 0.0
+        self._window_wins = 0
+
+    def add(self, trade: dict):
+        pnl, ts = trade.get("pnl_sol", 0), trade.get("timestamp", 0)
+        win = pnl > 0
+        self.count   += 1
+        self.wins    += win
+        self.pnl_sol += pnl
+        if self.best is None or pnl > self.best.get("pnl_sol", 0):
+            self.best = dict(trade)
+        reason = self.by_reason.setdefault(trade.get("reason", ""), {"count": 0, "wins": 0, "pnl_sol": 0.0})
+        reason["count"]   += 1
+        reason["wins"]    += win
+        reason["pnl_sol"] += pnl
+        self._window.append((ts, pnl))
+        self._window_pnl  += pnl
+        self._window_wins += win
+        self._expire(ts)
+
+    def _expire(self, now: float):
+        cutoff = now - self.WINDOW_SECONDS
+        while self._window and self._window[0][0] < cutoff:
+            _, pnl = self._window.popleft()
+            self._window_pnl  -= pnl
+            self._window_wins -= pnl > 0
+
+    def win_rate(self) -> float:
+        return self.wins / self.count * 100 if self.count else 0.0
+
+    @property
+    def best_multiplier(self) -> float:
+        return self.best.get("multiplier", 1) if self.best else 0
+
+    def last_24h(self, now: float) -> dict:
+        self._expire(now)
+        return {"count": len(self._window), "wins": self._window_wins,
+                "pnl_sol": self._window_pnl if self._window else 0.0}
+
+    def window(self) -> tuple:
+        """(timestamp, pnl_sol) of the trades in the 24h window, oldest first."""
+        return tuple(self._window)
+
+    def to_dict(self) -> dict:
+        return {
+            "count":     self.count,
+            "wins":      self.wins,
+            "pnl_sol":   self.pnl_sol,
+            "best":      self.best,
+            "by_reason": {r: dict(v) for r, v in self.by_reason.items()},
+            "window":    list(self._window),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "TradeStats":
+        stats = cls()
+        stats.count     = d["count"]
+        stats.wins      = d["wins"]
+        stats.pnl_sol   = d["pnl_sol"]
+        stats.best      = d.get("best")
+        stats.by_reason = d.get("by_reason", {})
+        for ts, pnl in d.get("window", []):
+            stats._window.append((ts, pnl))
+            stats._window_pnl  += pnl
+            stats._window_wins += pnl > 0
+        return stats
+
+    @classmethod
+    def load(cls, saved: Optional[dict], history) -> "TradeStats":
+        """Saved aggregates + the trades closed since; rebuilt from the history if they don't fit."""
+        total = history.count()
+        if saved and saved.get("count", 0) <= total:
+            stats = cls.from_dict(saved)
+            for trade in reversed(history.recent(total - stats.count)):
+                stats.add(trade)
+            return stats
+        stats = cls()
+        for trade in history.all():
+            stats.add(trade)
+        if saved is not None or total:
+            logger.info(f"Trade stats rebuilt from {total} closed trades")
+        return stats
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS closed_trades (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol       TEXT NOT NULL,
+    entry_price  REAL,
+    exit_price   REAL,
+    multiplier   REAL,
+    pnl_sol      REAL NOT NULL,
+    sol_received REAL,
+    reason       TEXT,
+    timestamp    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON closed_trades(timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol    ON closed_trades(symbol);
+CREATE INDEX IF NOT EXISTS idx_trades_reason    ON closed_trades(reason);
+CREATE INDEX IF NOT EXISTS idx_trades_pnl       ON closed_trades(pnl_sol);
+
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    data   TEXT NOT NULL          -- Position.to_dict() as JSON
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """One connection per store; the bot writes through one, readers open their own."""
+
+    def __init__(self, path: str):
+        self.path  = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")   # durable at WAL checkpoints, never corrupt
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # ─── State ───────────────────────────────────────────────────────────────
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM meta) + (SELECT COUNT(*) FROM positions) "
+                "+ (SELECT COUNT(*) FROM (SELECT 1 FROM closed_trades LIMIT 1))"
+            ).fetchone()
+        return row[0] == 0
+
+    def load_state(self, default_balance: float) -> dict:
+        """Balance + open positions + saved TradeStats (closed trades stay in the database)."""
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            positions = {r["symbol"]: json.loads(r["data"])
+                         for r in self._conn.execute("SELECT symbol, data FROM positions")}
+        return {
+            "balance_sol": float(meta["balance_sol"]) if "balance_sol" in meta else default_balance,
+            "positions":   positions,
+            "trade_stats": json.loads(meta["trade_stats"]) if "trade_stats" in meta else None,
+        }
+
+    def import_state(self, state: dict):
+        """One-off migration of a positions.json-style state."""
+        with self._lock, self._conn:
+            self._set_balance(state["balance_sol"])
+            for sym, pos in state.get("positions", {}).items():
+                self._put_position(pos)
+            self._conn.executemany(
+                f"INSERT INTO closed_trades ({', '.join(TRADE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(TRADE_COLUMNS))})",
+                [tuple(t.get(c) for c in TRADE_COLUMNS) for t in state.get("closed_trades", [])],
+            )
+
+    def apply(self, op: str, balance_sol: float, trade_stats: Optional[dict] = None, **fields):
+        """Apply one portfolio record (see trade_journal.py) atomically."""
+        with self._lock, self._conn:
+            if op in ("open", "update"):
+                self._put_position(fields["position"])
+            elif op == "close":
+                self._conn.execute("DELETE FROM positions WHERE symbol = ?", (fields["symbol"],))
+                self._insert_trade(fields["trade"])
+            elif op == "mark":
+                for sym, live in fields["positions"].items():
+                    row = self._conn.execute("SELECT data FROM positions WHERE symbol = ?", (sym,)).fetchone()
+                    if row:
+                        pos = json.loads(row[0])
+                        pos.update(live)
+                        self._put_position(pos)
+            self._set_balance(balance_sol)
+            if trade_stats is not None:
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('trade_stats', ?)",
+                                   (json.dumps(trade_stats),))
+
+    def checkpoint(self):
+        """Fold the WAL back into the main database file (scheduled snapshot)."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _set_balance(self, balance_sol: float):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('balance_sol', ?)",
+                           (repr(float(balance_sol)),))
+
+    def _put_position(self, pos: dict):
+        self._conn.execute("INSERT OR REPLACE INTO positions (symbol, data) VALUES (?, ?)",
+                           (pos["symbol"], json.dumps(pos)))
+
+    def _insert_trade(self, record: dict):
+        self._conn.execute(
+            f"INSERT INTO closed_trades ({', '.join(TRADE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(TRADE_COLUMNS))})",
+            tuple(record.get(c) for c in TRADE_COLUMNS),
+        )
+
+    # ─── Trade history queries ───────────────────────────────────────────────
+    def _query(self, sql: str, params: tuple = ()) -> List[dict]:
+        with self._lock:
+            return [{c: r[c] for c in TRADE_COLUMNS}
+                    for r in self._conn.execute(sql, params)]
+
+    def _scalar(self, sql: str):
+        with self._lock:
+            return self._conn.execute(sql).fetchone()[0]
+
+    def count(self) -> int:
+        return self._scalar("SELECT COUNT(*) FROM closed_trades")
+
+    def pnl_sum(self) -> float:
+        return self._scalar("SELECT COALESCE(SUM(pnl_sol), 0) FROM closed_trades")
+
+    def wins(self) -> int:
+        return self._scalar("SELECT COUNT(*) FROM closed_trades WHERE pnl_sol > 0")
+
+    def best(self) -> Optional[dict]:
+        rows = self._query(f"SELECT {', '.join(TRADE_COLUMNS)} FROM closed_trades "
+                           f"ORDER BY pnl_sol DESC, id ASC LIMIT 1")
+        return rows[0] if rows else None
+
+    def recent(self, n: int) -> List[dict]:
+        """Last n trades, newest first."""
+        return self._query(f"SELECT {', '.join(TRADE_COLUMNS)} FROM closed_trades "
+                           f"ORDER BY id DESC LIMIT ?", (n,))
+
+    def since(self, ts: float) -> List[dict]:
+        return self._query(f"SELECT {', '.join(TRADE_COLUMNS)} FROM closed_trades "
+                           f"WHERE timestamp >= ? ORDER BY id", (ts,))
+
+    def by_symbol(self, symbol: str) -> List[dict]:
+        return self._query(f"SELECT {', '.join(TRADE_COLUMNS)} FROM closed_trades "
+                           f"WHERE symbol = ? ORDER BY id", (symbol,))
+
+    def by_reason(self) -> Dict[str, int]:
+        with self._lock:
+            return {r[0]: r[1] for r in self._conn.execute(
+                "SELECT reason, COUNT(*) FROM closed_trades GROUP BY reason")}
+
+    def all(self) -> List[dict]:
+        return self._query(f"SELECT {', '.join(TRADE_COLUMNS)} FROM closed_trades ORDER BY id")
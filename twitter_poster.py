@@ -1,13 +1,26 @@
 """
 Twitter (X) integration using Tweepy v4 (API v2).
+
+post() only queues the tweet. An outbox worker sends it and tracks the
+remaining quota from the x-rate-limit-* / x-user-limit-24hour-* response
+headers. When the quota is exhausted, posts wait in the outbox until the
+window resets, and the backlog goes out as one digest tweet. Hitting the
+limit never blocks the caller.
 """
 
 import logging
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from config import TWITTER_OUTBOX_MAX, TWITTER_RATE_LIMIT_BACKOFF
+from digest import headline_digest, split_message, text_length
 
 logger = logging.getLogger(__name__)
 
 try:
+    import requests
     import tweepy
     TWEEPY_AVAILABLE = True
 except ImportError:
@@ -15,10 +28,35 @@ except ImportError:
     logger.warning("tweepy not installed – Twitter posting disabled")
 
 
+TWEET_MAX_CHARS = 280
+
+
+def coalesce(texts: List[str]) -> str:
+    """One tweet listing the first line of every backed-up post (see digest.headline_digest)."""
+    tweets = headline_digest(texts, TWEET_MAX_CHARS)
+    if len(tweets) == 1:
+        return tweets[0]
+    # doesn't fit: keep room for a "+N more" tail
+    total = sum(1 for t in texts if t.strip())
+    tweet = headline_digest(texts, TWEET_MAX_CHARS - text_length(f"\n+{total} more"))[0]
+    shown = tweet.count("\n• ")
+    return f"{tweet}\n+{total - shown} more"
+
+
 class TwitterPoster:
     def __init__(self):
         self.client: Optional[object] = None
+        self.remaining: Optional[int] = None   # tweets left in the current window (None = unknown)
+        self.reset_at   = 0.0                   # epoch seconds when the window resets
+        self.sent       = 0
+        self.failed     = 0
+        self.coalesced  = 0                     # posts folded into digest tweets
+        self.dropped    = 0                     # posts pushed out of a full outbox
+        self._outbox    = deque()
+        self._cond      = threading.Condition()
         self._setup()
+        if self.client:
+            threading.Thread(target=self._work, daemon=True, name="twitter-outbox").start()
 
     def _setup(self):
         from config import (
@@ -49,27 +87,108 @@ class TwitterPoster:
                 consumer_secret     = TWITTER_API_SECRET,
                 access_token        = TWITTER_ACCESS_TOKEN,
                 access_token_secret = TWITTER_ACCESS_SECRET,
-                wait_on_rate_limit  = True,
+                wait_on_rate_limit  = False,               # the outbox waits, not the caller
+                return_type         = requests.Response,   # keeps the rate-limit headers
             )
             logger.info("Twitter client ready ✅")
         except Exception as e:
             logger.error(f"Twitter setup failed: {e}")
 
     def post(self, text: str) -> bool:
-        """Post a tweet. Returns True on success."""
+        """Queue a tweet (never blocks). Returns True if it was queued."""
         if not self.client:
             logger.info(f"[TWITTER DISABLED] Would tweet:\n{text}\n")
             return False
 
-        # Twitter has a 280-char limit
-        if len(text) > 280:
-            text = text[:277] + "..."
+        with self._cond:
+            if len(self._outbox) >= TWITTER_OUTBOX_MAX:
+                self._outbox.popleft()
+                self.dropped += 1
+                logger.warning(f"Twitter outbox full – dropped the oldest post ({self.dropped} so far)")
+            self._outbox.append(text)
+            self._cond.notify()
+        return True
 
+    # ─── Outbox ──────────────────────────────────────────────────────────────
+    def _quota_wait(self) -> float:
+        """Seconds until a tweet may be sent (0 = now)."""
+        if self.remaining is None or self.remaining > 0:
+            return 0.0
+        return max(0.0, self.reset_at - time.time())
+
+    def _work(self):
+        deferred = False
+        while True:
+            with self._cond:
+                while not self._outbox:
+                    self._cond.wait()
+                wait = self._quota_wait()
+                if wait > 0:
+                    if not deferred:
+                        logger.warning(f"Twitter quota exhausted – holding posts for {wait:.0f}s")
+                    deferred = True
+                    self._cond.wait(wait)
+                    continue
+                if deferred and len(self._outbox) > 1:
+                    batch = list(self._outbox)
+                    self._outbox.clear()
+                    text = coalesce(batch)
+                else:
+                    batch = [self._outbox.popleft()]
+                    text  = batch[0]
+                deferred = False
+            if not self._send(text, len(batch)):
+                with self._cond:
+                    if self._quota_wait() > 0:          # throttled: retry after the reset
+                        self._outbox.extendleft(reversed(batch))
+                        deferred = True
+
+    def _send(self, text: str, posts: int) -> bool:
+        if text_length(text) > TWEET_MAX_CHARS:
+            text = split_message([text], TWEET_MAX_CHARS - 3)[0] + "..."
         try:
-            response = self.client.create_tweet(text=text)
-            tweet_id = response.data["id"]
-            logger.info(f"Tweet posted: https://x.com/i/web/status/{tweet_id}")
-            return True
+            r = self.client.create_tweet(text=text)
+        except tweepy.TooManyRequests as e:
+            self._update_quota(e.response)
+            if self._quota_wait() <= 0:                  # no usable reset header
+                self.remaining = 0
+                self.reset_at  = time.time() + TWITTER_RATE_LIMIT_BACKOFF
+            logger.warning(f"Twitter rate limit hit – next try in {self._quota_wait():.0f}s")
+            return False
         except Exception as e:
+            self.failed += 1
             logger.error(f"Failed to post tweet: {e}")
             return False
+
+        self._update_quota(r)
+        self.sent += 1
+        if posts > 1:
+            self.coalesced += posts
+        tweet_id = r.json()["data"]["id"]
+        logger.info(f"Tweet posted: https://x.com/i/web/status/{tweet_id}"
+                    + (f" (digest of {posts} posts)" if posts > 1 else ""))
+        return True
+
+    def _update_quota(self, response):
+        """Take the tightest of the 15-minute and 24-hour limits from the headers."""
+        headers = getattr(response, "headers", None) or {}
+        windows = []
+        for prefix in ("x-rate-limit", "x-user-limit-24hour", "x-app-limit-24hour"):
+            try:
+                windows.append((int(headers[f"{prefix}-remaining"]), float(headers[f"{prefix}-reset"])))
+            except (KeyError, ValueError):
+                continue
+        if windows:
+            self.remaining, self.reset_at = min(windows, key=lambda w: (w[0], -w[1]))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queued":    len(self._outbox),
+                "sent":      self.sent,
+                "failed":    self.failed,
+                "coalesced": self.coalesced,
+                "dropped":   self.dropped,
+                "remaining": self.remaining,
+                "reset_in":  round(max(0.0, self.reset_at - time.time())),
+            }
@@ -1,66 +1,77 @@
 """
 SoLARP – Web Dashboard Server
 Serves the landing page and provides API endpoints for live bot data.
-Run standalone:  python web_server.py
-Or import and call start_server_thread() from main.py.
+Run standalone:  python web_server.py [--mode threaded|dev]
+Or import and call start_dashboard() from main.py (WEB_SERVER_MODE).
 """
 
+import atexit
+import gzip
+import hashlib
 import json
 import os
+import queue
+import subprocess
+import sys
 import time
 import logging
 import threading
-from flask import Flask, jsonify, send_from_directory
-
-from config import STARTING_BALANCE_SOL, POSITIONS_FILE, WEB_SERVER_HOST, WEB_SERVER_PORT
+from collections import deque
+from flask import Flask, Response, jsonify, request, send_from_directory
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+try:
+    import waitress
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+import portfolio_state
+from config import (
+    STARTING_BALANCE_SOL, MONITOR_INTERVAL_SECONDS, WEB_SERVER_HOST, WEB_SERVER_PORT,
+    WEB_SERVER_MODE, WEB_SERVER_THREADS, WEB_KEEPALIVE_SECONDS, WEB_STREAM_MAX_CLIENTS,
+)
+from feed_log import FeedLog
+from portfolio import Portfolio
 
 logger = logging.getLogger(__name__)
 
-FEED_FILE = os.path.join(os.path.dirname(POSITIONS_FILE), "feed.json")
-_feed_lock = threading.Lock()
+FEED_PAGE     = 50    # entries per /api/feed response by default
+FEED_PAGE_MAX = 500
+
+feed_log = FeedLog()
 
 
 def append_to_feed(text: str, kind: str = "trade"):
-    """Append a message to feed.json (max 50 entries)."""
-    entry = {"text": text, "kind": kind, "timestamp": int(time.time())}
-    with _feed_lock:
-        try:
-            with open(FEED_FILE, "r") as f:
-                feed = json.load(f)
-        except Exception:
-            feed = []
-        feed.insert(0, entry)
-        feed = feed[:50]  # keep last 50
-        with open(FEED_FILE, "w") as f:
-            json.dump(feed, f)
+    """Add a post to the dashboard feed (ring buffer + append-only log, see feed_log.py)."""
+    feed_log.append(text, kind)
+    _stream_wake.set()
 
 app = Flask(__name__, static_folder="static", static_url_path="")
 
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
-def _load_portfolio_data() -> dict:
-    """Read positions.json and compute stats."""
-    data = {
-        "balance_sol": STARTING_BALANCE_SOL,
-        "positions": {},
-        "closed_trades": [],
-    }
-    if os.path.exists(POSITIONS_FILE):
-        try:
-            with open(POSITIONS_FILE, "r") as f:
-                data = json.load(f)
-        except Exception:
-            pass
+def _read_view() -> portfolio_state.PortfolioView:
+    try:
+        return portfolio_state.read()
+    except Exception as e:
+        logger.warning(f"Could not read portfolio: {e}")
+        return portfolio_state.build_view(Portfolio(persist=False))
+
 
-    balance = data.get("balance_sol", STARTING_BALANCE_SOL)
-    positions = data.get("positions", {})
-    closed = data.get("closed_trades", [])
+def _load_portfolio_data(view: portfolio_state.PortfolioView = None) -> dict:
+    """Dashboard stats from the live PortfolioView (no disk reads while the bot runs in-process)."""
+    view = view or _read_view()
+
+    balance   = view.balance_sol
+    positions = view.positions
 
     # Compute stats
-    total_closed_pnl = sum(t.get("pnl_sol", 0) for t in closed)
-    wins = sum(1 for t in closed if t.get("pnl_sol", 0) > 0)
-    win_rate = (wins / len(closed) * 100) if closed else 0
+    trade_count = view.trade_count
+    total_closed_pnl = view.closed_pnl_sol
+    win_rate = view.win_rate
+    last_24h = view.last_24h(time.time())
 
     # Real-time value of open positions
     # current_price_usd is updated by the trading loop on each scan
@@ -85,8 +96,7 @@ def _load_portfolio_data() -> dict:
     overall_pnl_pct = (overall_pnl_sol / STARTING_BALANCE_SOL) * 100
 
     # Best trade
-    best_trade = max(closed, key=lambda t: t.get("pnl_sol", 0)) if closed else None
-    best_mult = best_trade.get("multiplier", 1) if best_trade else 0
+    best_mult = view.best_multiplier
 
     # Open positions details with real-time PnL
     open_positions = []
@@ -125,7 +135,7 @@ def _load_portfolio_data() -> dict:
 
     # Recent closed trades (last 20)
     recent_trades = []
-    for t in reversed(closed[-20:]):
+    for t in view.recent_trades:
         recent_trades.append({
             "symbol": t.get("symbol", "?"),
             "multiplier": round(t.get("multiplier", 1), 2),
@@ -141,15 +151,200 @@ def _load_portfolio_data() -> dict:
         "overall_pnl_sol": round(overall_pnl_sol, 4),
         "overall_pnl_pct": round(overall_pnl_pct, 2),
         "closed_pnl_sol": round(total_closed_pnl, 4),
-        "total_trades": len(closed),
+        "total_trades": trade_count,
         "open_positions_count": len(positions),
         "win_rate": round(win_rate, 1),
         "best_multiplier": round(best_mult, 2),
+        "trades_24h": last_24h["count"],
+        "pnl_24h_sol": round(last_24h["pnl_sol"], 4),
+        "reasons": dict(view.by_reason),
         "open_positions": open_positions,
         "recent_trades": recent_trades,
     }
 
 
+# ─── Pre-serialized responses ────────────────────────────────────────────────
+# Every poll from every open dashboard hits /api/stats and /api/feed. Their
+# bodies are built once per change, kept as JSON bytes + gzip with a content
+# ETag, and a client that already has them gets a bodyless 304.
+
+class _Payload:
+    def __init__(self, key, data):
+        self.key     = key
+        self.data    = data
+        self.body    = json.dumps(data, separators=(",", ":")).encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=6)
+        self.etag    = hashlib.sha1(self.body).hexdigest()[:20]
+
+
+_payloads: dict = {}
+_payload_lock = threading.Lock()
+
+
+def _cached_payload(name: str, key, build) -> _Payload:
+    """The payload for `name`, rebuilt (by one thread) only when `key` changes."""
+    payload = _payloads.get(name)
+    if payload is None or payload.key != key:
+        with _payload_lock:
+            payload = _payloads.get(name)
+            if payload is None or payload.key != key:
+                payload = _Payload(key, build())
+                _payloads[name] = payload
+    return payload
+
+
+def _payload_response(payload: _Payload) -> Response:
+    if request.if_none_match.contains_weak(payload.etag):
+        resp = Response(status=304)
+    elif request.accept_encodings["gzip"]:
+        resp = Response(payload.gzipped, mimetype="application/json")
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(payload.body, mimetype="application/json")
+    resp.set_etag(payload.etag, weak=True)   # weak: same ETag for the gzip and plain bodies
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def _stats_payload() -> _Payload:
+    view = _read_view()
+    # new portfolio version, or the next monitor tick (position ages, 24h window)
+    key = (view.version, int(time.time() // MONITOR_INTERVAL_SECONDS))
+    return _cached_payload("stats", key, lambda: _load_portfolio_data(view))
+
+
+def _feed_payload() -> _Payload:
+    feed_log.refresh()
+    return _cached_payload("feed", feed_log.last_id, lambda: feed_log.latest(FEED_PAGE))
+
+
+# ─── Server-Sent Events ──────────────────────────────────────────────────────
+# One pump thread turns portfolio / feed changes into events (a stats delta
+# with the changed keys, new feed entries), encoded once; every /api/stream
+# client just writes the same bytes. Portfolio changes and append_to_feed wake
+# the pump at once; it also re-checks every STREAM_POLL_SECONDS (position
+# ages, or a bot writing from another process).
+
+STREAM_POLL_SECONDS      = 1.0
+STREAM_HEARTBEAT_SECONDS = 15.0   # comment line so proxies keep idle streams open
+STREAM_BACKLOG           = 256    # events kept for clients that fell behind
+
+_stream_wake = threading.Event()
+
+
+class _Broadcaster:
+    def __init__(self, backlog: int = STREAM_BACKLOG):
+        self._cond    = threading.Condition()
+        self._events  = deque(maxlen=backlog)   # (seq, encoded event)
+        self.seq      = 0
+        self.clients  = 0
+        self.stats: _Payload = None             # state the events so far lead up to
+        self.feed: _Payload  = None
+
+    def publish(self, events: list, stats: _Payload, feed: _Payload):
+        with self._cond:
+            for name, data in events:
+                self.seq += 1
+                msg = f"id: {self.seq}\nevent: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+                self._events.append((self.seq, msg.encode()))
+            self.stats, self.feed = stats, feed
+            self._cond.notify_all()
+
+    def connect(self, max_clients: int):
+        """
+        Register a client; returns (seq, stats, feed), a consistent starting
+        point, or None if max_clients are already connected.
+        """
+        with self._cond:
+            if self.clients >= max_clients:
+                return None
+            self.clients += 1
+            return self.seq, self.stats, self.feed
+
+    def disconnect(self):
+        with self._cond:
+            self.clients -= 1
+
+    def snapshot(self):
+        with self._cond:
+            return self.seq, self.stats, self.feed
+
+    def wait(self, after: int, timeout: float):
+        """Encoded events after `after` ([] on timeout), or None if they already left the backlog."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after, timeout)
+            if self.seq == after:
+                return []
+            if self._events[0][0] > after + 1:
+                return None
+            return [msg for seq, msg in self._events if seq > after]
+
+
+_broadcaster = _Broadcaster()
+_pump_lock   = threading.Lock()
+_pump_thread = None
+
+
+def _feed_events(old: _Payload, new: _Payload) -> dict:
+    """Entries newer than the old head (newest first), or the whole page after a gap / reset."""
+    old_head = old.data[0]["id"] if old.data else 0
+    fresh = [e for e in new.data if e["id"] > old_head]
+    if (new.data and new.data[0]["id"] < old_head) or (fresh and fresh[-1]["id"] > old_head + 1):
+        return {"entries": new.data, "reset": True}
+    return {"entries": fresh, "reset": False}
+
+
+def _pump():
+    while True:
+        _stream_wake.wait(STREAM_POLL_SECONDS)
+        _stream_wake.clear()
+        if not _broadcaster.clients:
+            continue
+        try:
+            _, stats, feed = _broadcaster.snapshot()
+            new_stats, new_feed = _stats_payload(), _feed_payload()
+            events = []
+            if new_stats.etag != stats.etag:
+                events.append(("delta", {k: v for k, v in new_stats.data.items()
+                                         if stats.data.get(k) != v}))
+            if new_feed.key != feed.key:
+                events.append(("feed", _feed_events(feed, new_feed)))
+            if events:
+                _broadcaster.publish(events, new_stats, new_feed)
+        except Exception as e:
+            logger.warning(f"SSE pump: {e}")
+
+
+def _ensure_pump():
+    global _pump_thread
+    with _pump_lock:
+        if _pump_thread is None:
+            _broadcaster.publish([], _stats_payload(), _feed_payload())
+            portfolio_state.subscribe(lambda view: _stream_wake.set())
+            _pump_thread = threading.Thread(target=_pump, daemon=True, name="sse-pump")
+            _pump_thread.start()
+
+
+def _full_state(stats: _Payload, feed: _Payload) -> bytes:
+    return (b"event: stats\ndata: " + stats.body + b"\n\n" +
+            f"event: feed\ndata: {json.dumps({'entries': feed.data, 'reset': True})}\n\n".encode())
+
+
+def _event_stream(seq: int, stats: _Payload, feed: _Payload):
+    yield b"retry: 3000\n\n" + _full_state(stats, feed)
+    while True:
+        events = _broadcaster.wait(seq, STREAM_HEARTBEAT_SECONDS)
+        if events is None:                     # fell behind the backlog: start over
+            seq, stats, feed = _broadcaster.snapshot()
+            yield _full_state(stats, feed)
+        elif events:
+            seq += len(events)
+            yield b"".join(events)
+        else:
+            yield b": ping\n\n"
+
+
 # ─── Routes ──────────────────────────────────────────────────────────────────
 
 @app.route("/")
@@ -159,41 +354,219 @@ def index():
 
 @app.route("/api/stats")
 def api_stats():
-    return jsonify(_load_portfolio_data())
+    return _payload_response(_stats_payload())
 
 
 @app.route("/api/feed")
 def api_feed():
-    try:
-        with _feed_lock:
-            with open(FEED_FILE, "r") as f:
-                feed = json.load(f)
-    except Exception:
-        feed = []
-    return jsonify(feed)
+    """Newest first. ?since=<id>: only newer entries; ?before=<id>: page back; ?limit=N."""
+    since  = request.args.get("since", type=int)
+    before = request.args.get("before", type=int)
+    limit  = request.args.get("limit", type=int)
+    if since is None and before is None and limit is None:
+        return _payload_response(_feed_payload())
+    feed_log.refresh()
+    limit = max(1, min(limit or FEED_PAGE, FEED_PAGE_MAX))
+    if since is not None:
+        return jsonify(feed_log.since(since, limit))
+    if before is not None:
+        return jsonify(feed_log.before(before, limit))
+    return jsonify(feed_log.latest(limit))
+
+
+@app.route("/api/stream")
+def api_stream():
+    """SSE: `stats` (full), then `delta` (changed keys) and `feed` ({entries, reset}) events."""
+    _ensure_pump()
+    start = _broadcaster.connect(WEB_STREAM_MAX_CLIENTS)   # check and count in one step
+    if start is None:
+        # every stream holds a worker; past the cap clients poll /api/stats instead
+        return jsonify({"error": "too many live streams"}), 503
+    resp = Response(_event_stream(*start), mimetype="text/event-stream")
+    # on close, even if the stream never started (a generator's finally wouldn't run)
+    resp.call_on_close(_broadcaster.disconnect)
+    resp.headers["Cache-Control"]     = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"    # nginx: don't buffer the stream
+    return resp
+
+
+@app.route("/telegram/webhook", methods=["POST"])
+def telegram_webhook():
+    import bot_listener
+    if not bot_listener.webhook_enabled():
+        return Response(status=404)
+    if request.headers.get("X-Telegram-Bot-Api-Secret-Token") != bot_listener.webhook_secret():
+        return Response(status=403)
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict) or "update_id" not in update:
+        return Response(status=400)
+    # answered at once; the update is handled on the listener's dispatcher thread
+    return Response(status=200 if bot_listener.enqueue_update(update) else 503)
 
 
 @app.route("/api/health")
 def api_health():
-    return jsonify({"status": "ok", "timestamp": time.time()})
-
-
-# ─── Start ───────────────────────────────────────────────────────────────────
-
-def start_server_thread():
-    """Start Flask web server in a background daemon thread."""
-    def _run():
-        logger.info(f"🌐 SoLARP Dashboard starting on http://localhost:{WEB_SERVER_PORT}")
+    from price_fetcher import cache_stats
+    from rate_limiter import limiter_stats
+    return jsonify({"status": "ok", "timestamp": time.time(),
+                    "cache": cache_stats(), "rate_limits": limiter_stats(),
+                    "web": {"mode": _serving_mode, "live_state": portfolio_state.current() is not None,
+                            "stream_clients": _broadcaster.clients}})
+
+
+# ─── Static compression ──────────────────────────────────────────────────────
+# API payloads are pre-gzipped above; static files are gzipped once per
+# version (ETag) and served from memory afterwards.
+
+_GZIP_TYPES = {"text/html", "text/css", "text/javascript", "application/javascript", "image/svg+xml"}
+_gzip_cache: dict = {}   # path → (etag, gzipped bytes); a new version replaces the old one
+
+
+@app.after_request
+def _gzip_static(resp):
+    if (resp.status_code != 200 or resp.mimetype not in _GZIP_TYPES
+            or "Content-Encoding" in resp.headers or not request.accept_encodings["gzip"]):
+        return resp
+    etag, _ = resp.get_etag()
+    cached_etag, body = _gzip_cache.get(request.path, (None, None))
+    if body is None or cached_etag != etag:
+        resp.direct_passthrough = False
+        body = gzip.compress(resp.get_data(), compresslevel=6)
+        if etag:
+            _gzip_cache[request.path] = (etag, body)
+    elif hasattr(resp.response, "close"):
+        resp.response.close()            # the file wrapper we won't read
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = "gzip"
+    if etag:
+        resp.set_etag(etag, weak=True)
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+# ─── Serving ─────────────────────────────────────────────────────────────────
+
+class _QuietHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"          # chunked SSE streams
+    timeout          = WEB_KEEPALIVE_SECONDS
+
+    def log_request(self, code="-", size="-"):
+        pass                               # one line per poll from every viewer is just noise
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    werkzeug's server with a fixed pool of worker threads – the fallback when
+    waitress isn't installed. When every worker is busy it stops accepting,
+    so a traffic spike queues in the kernel backlog instead of spawning a
+    thread per connection. Workers are daemon threads: an open SSE stream
+    never holds up the bot's shutdown. werkzeug closes the connection after
+    every response (no keep-alive).
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, host: str, port: int, wsgi_app, threads: int = WEB_SERVER_THREADS):
+        super().__init__(host, port, wsgi_app, handler=_QuietHandler)
+        self._slots    = threading.BoundedSemaphore(threads)
+        self._requests = queue.SimpleQueue()
+        for i in range(threads):
+            threading.Thread(target=self._work, daemon=True, name=f"web-{i}").start()
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        self._requests.put((request, client_address))
+
+    def _work(self):
+        while True:
+            request, client_address = self._requests.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self._slots.release()
+
+
+_serving_mode = "off"
+
+
+def serve(mode: str = "threaded"):
+    """Run the dashboard in this thread (blocks)."""
+    global _serving_mode
+    _serving_mode = mode if mode == "dev" else ("waitress" if WAITRESS_AVAILABLE else "pooled")
+    logger.info(f"🌐 SoLARP Dashboard starting on http://localhost:{WEB_SERVER_PORT} ({_serving_mode})")
+    if mode == "dev":
         # use_reloader=False is critical — reloader forks a child process
         # which conflicts with the main bot loop and scheduler.
         app.run(host=WEB_SERVER_HOST, port=WEB_SERVER_PORT, debug=False, use_reloader=False)
+    elif WAITRESS_AVAILABLE:
+        # keep-alive connections wait in waitress' I/O loop, not in a worker;
+        # a burst of viewers shouldn't flood the bot's log with queue warnings
+        logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+        waitress.serve(app, host=WEB_SERVER_HOST, port=WEB_SERVER_PORT, threads=WEB_SERVER_THREADS,
+                       channel_timeout=WEB_KEEPALIVE_SECONDS, ident="SoLARP")
+    else:
+        PooledWSGIServer(WEB_SERVER_HOST, WEB_SERVER_PORT, app, WEB_SERVER_THREADS).serve_forever()
+
+
+def start_server_thread(mode: str = "threaded"):
+    """Start the web server in a background daemon thread."""
+    t = threading.Thread(target=serve, args=(mode,), daemon=True, name="web-server")
+    t.start()
+    return t
+
 
-    t = threading.Thread(target=_run, daemon=True, name="web-server")
+def start_server_process():
+    """
+    Run the dashboard as `python web_server.py` in its own process (restarted
+    if it dies). It reads the persisted portfolio state and tails the feed
+    log, so it sees changes within about a second.
+    """
+    cmd = [sys.executable, os.path.abspath(__file__), "--mode", "threaded", "--parent-pid", str(os.getpid())]
+    procs = []
+
+    def _supervise():
+        while True:
+            proc = subprocess.Popen(cmd)
+            procs[:] = [proc]
+            code = proc.wait()
+            logger.warning(f"Dashboard process exited with {code}, restarting in 5s")
+            time.sleep(5)
+
+    atexit.register(lambda: [p.terminate() for p in procs if p.poll() is None])
+    t = threading.Thread(target=_supervise, daemon=True, name="web-supervisor")
     t.start()
     return t
 
 
+def start_dashboard(mode: str = WEB_SERVER_MODE):
+    """Start the dashboard as configured by WEB_SERVER_MODE (dev / threaded / process / off)."""
+    if mode == "off":
+        return None
+    if mode == "process":
+        return start_server_process()
+    return start_server_thread(mode)
+
+
+def _exit_with_parent(parent_pid: int):
+    while os.getppid() == parent_pid:
+        time.sleep(2)
+    logger.info("Bot process is gone, stopping the dashboard")
+    os._exit(0)
+
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SoLARP dashboard")
+    parser.add_argument("--mode", choices=("threaded", "dev"),
+                        default="dev" if WEB_SERVER_MODE == "dev" else "threaded")
+    parser.add_argument("--parent-pid", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO)
-    logger.info(f"🌐 SoLARP Dashboard starting on http://localhost:{WEB_SERVER_PORT}")
-    app.run(host=WEB_SERVER_HOST, port=WEB_SERVER_PORT, debug=True)
+    if args.parent_pid:
+        threading.Thread(target=_exit_with_parent, args=(args.parent_pid,), daemon=True).start()
+    serve(args.mode)